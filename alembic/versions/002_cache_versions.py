@@ -0,0 +1,35 @@
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "002_cache_versions"
+down_revision = "001_initial"
+branch_labels = None
+depends_on = None
+
+NAMESPACES = ["category", "customer", "inventory", "product", "sale"]
+
+
+def upgrade() -> None:
+    # Databases set up with create_all may already have the table.
+    bind = op.get_bind()
+    if sa.inspect(bind).has_table("cache_versions"):
+        table = sa.table("cache_versions", sa.column("namespace"))
+    else:
+        table = op.create_table(
+            "cache_versions",
+            sa.Column("namespace", sa.String(50), primary_key=True),
+            sa.Column("version", sa.Integer, nullable=False, default=0),
+            sa.Column(
+                "updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()
+            ),
+        )
+    existing = {row[0] for row in bind.execute(sa.select(table.c.namespace))}
+    op.bulk_insert(
+        sa.table("cache_versions", sa.column("namespace"), sa.column("version")),
+        [{"namespace": n, "version": 0} for n in NAMESPACES if n not in existing],
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("cache_versions")
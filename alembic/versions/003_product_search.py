@@ -0,0 +1,38 @@
+import sqlalchemy as sa
+from alembic import op
+
+from app.db.search import SQLITE_FTS_DDL, SQLITE_FTS_DROP
+
+# revision identifiers, used by Alembic.
+revision = "003_product_search"
+down_revision = "002_cache_versions"
+branch_labels = None
+depends_on = None
+
+FULLTEXT_INDEX = "ft_products_name_description"
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == "sqlite":
+        # IF NOT EXISTS throughout, then a rebuild of the existing rows.
+        for statement in SQLITE_FTS_DDL:
+            op.execute(statement)
+    elif bind.dialect.name == "mysql":
+        indexes = {i["name"] for i in sa.inspect(bind).get_indexes("products")}
+        if FULLTEXT_INDEX not in indexes:
+            op.create_index(
+                FULLTEXT_INDEX,
+                "products",
+                ["name", "description"],
+                mysql_prefix="FULLTEXT",
+            )
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == "sqlite":
+        for statement in SQLITE_FTS_DROP:
+            op.execute(statement)
+    elif bind.dialect.name == "mysql":
+        op.drop_index(FULLTEXT_INDEX, table_name="products")
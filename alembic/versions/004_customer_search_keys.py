@@ -0,0 +1,67 @@
+import sqlalchemy as sa
+from alembic import op
+
+from app.db.search import customer_search_keys
+
+# revision identifiers, used by Alembic.
+revision = "004_customer_search_keys"
+down_revision = "003_product_search"
+branch_labels = None
+depends_on = None
+
+COLUMNS = {
+    "name_normalized": sa.String(100),
+    "email_normalized": sa.String(100),
+    "phone_digits": sa.String(20),
+}
+BATCH_SIZE = 10_000
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    existing = {c["name"] for c in inspector.get_columns("customers")}
+    for name, type_ in COLUMNS.items():
+        if name not in existing:
+            op.add_column("customers", sa.Column(name, type_, nullable=True))
+
+    customers = sa.table(
+        "customers",
+        *(sa.column(c) for c in ("id", "name", "email", "phone", *COLUMNS)),
+    )
+    update = (
+        customers.update()
+        .where(customers.c.id == sa.bindparam("_id"))
+        .values({c: sa.bindparam(c) for c in COLUMNS})
+    )
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(
+                customers.c.id, customers.c.name, customers.c.email, customers.c.phone
+            )
+            .where(customers.c.id > last_id)
+            .order_by(customers.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        bind.execute(
+            update,
+            [
+                {"_id": row.id, **customer_search_keys(row.name, row.email, row.phone)}
+                for row in rows
+            ],
+        )
+        last_id = rows[-1].id
+
+    indexes = {i["name"] for i in inspector.get_indexes("customers")}
+    for name in COLUMNS:
+        if f"ix_customers_{name}" not in indexes:
+            op.create_index(f"ix_customers_{name}", "customers", [name])
+
+
+def downgrade() -> None:
+    for name in COLUMNS:
+        op.drop_index(f"ix_customers_{name}", table_name="customers")
+        op.drop_column("customers", name)
@@ -0,0 +1,57 @@
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "005_customer_stats"
+down_revision = "004_customer_search_keys"
+branch_labels = None
+depends_on = None
+
+BACKFILL = """
+INSERT INTO customer_stats
+    (customer_id, order_count, total_revenue, first_order_date, last_order_date)
+SELECT c.id, COUNT(s.id), COALESCE(SUM(s.total_amount), 0),
+       MIN(s.order_date), MAX(s.order_date)
+FROM customers c LEFT JOIN sales s ON s.customer_id = c.id
+GROUP BY c.id
+"""
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if "ix_sales_customer_id" not in {
+        i["name"] for i in inspector.get_indexes("sales")
+    }:
+        op.create_index("ix_sales_customer_id", "sales", ["customer_id"])
+
+    if not inspector.has_table("customer_stats"):
+        op.create_table(
+            "customer_stats",
+            sa.Column(
+                "customer_id",
+                sa.Integer,
+                sa.ForeignKey("customers.id"),
+                primary_key=True,
+            ),
+            sa.Column("order_count", sa.Integer, nullable=False),
+            sa.Column("total_revenue", sa.Float, nullable=False),
+            sa.Column("first_order_date", sa.DateTime(timezone=True)),
+            sa.Column("last_order_date", sa.DateTime(timezone=True)),
+            sa.Column(
+                "updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()
+            ),
+        )
+        op.create_index(
+            "ix_customer_stats_total_revenue", "customer_stats", ["total_revenue"]
+        )
+        op.create_index(
+            "ix_customer_stats_order_count", "customer_stats", ["order_count"]
+        )
+    if not bind.execute(sa.text("SELECT 1 FROM customer_stats LIMIT 1")).first():
+        op.execute(BACKFILL)
+
+
+def downgrade() -> None:
+    op.drop_table("customer_stats")
+    op.drop_index("ix_sales_customer_id", table_name="sales")
@@ -0,0 +1,46 @@
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "006_customer_analytics"
+down_revision = "005_customer_stats"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table("customer_rfm"):
+        op.create_table(
+            "customer_rfm",
+            sa.Column(
+                "customer_id",
+                sa.Integer,
+                sa.ForeignKey("customers.id"),
+                primary_key=True,
+            ),
+            sa.Column("recency_days", sa.Integer, nullable=False),
+            sa.Column("frequency", sa.Integer, nullable=False),
+            sa.Column("monetary", sa.Float, nullable=False),
+            sa.Column("r_score", sa.Integer, nullable=False),
+            sa.Column("f_score", sa.Integer, nullable=False),
+            sa.Column("m_score", sa.Integer, nullable=False),
+            sa.Column("segment", sa.String(30), nullable=False),
+            sa.Column("as_of", sa.Date, nullable=False),
+            sa.Column("computed_at", sa.DateTime(timezone=True), nullable=False),
+        )
+        op.create_index("ix_customer_rfm_segment", "customer_rfm", ["segment"])
+    if not inspector.has_table("cohort_retention"):
+        op.create_table(
+            "cohort_retention",
+            sa.Column("cohort_month", sa.String(7), primary_key=True),
+            sa.Column("months_since", sa.Integer, primary_key=True),
+            sa.Column("customers", sa.Integer, nullable=False),
+            sa.Column("retention", sa.Float, nullable=False),
+            sa.Column("computed_at", sa.DateTime(timezone=True), nullable=False),
+        )
+
+
+def downgrade() -> None:
+    op.drop_table("cohort_retention")
+    op.drop_table("customer_rfm")
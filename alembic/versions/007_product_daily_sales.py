@@ -0,0 +1,40 @@
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "007_product_daily_sales"
+down_revision = "006_customer_analytics"
+branch_labels = None
+depends_on = None
+
+BACKFILL = """
+INSERT INTO product_daily_sales (day, product_id, platform, units, revenue)
+SELECT DATE(s.order_date), i.product_id, s.platform, SUM(i.quantity),
+       SUM(i.unit_price * i.quantity - i.discount)
+FROM sale_items i JOIN sales s ON s.id = i.sale_id
+GROUP BY DATE(s.order_date), i.product_id, s.platform
+"""
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if not sa.inspect(bind).has_table("product_daily_sales"):
+        op.create_table(
+            "product_daily_sales",
+            sa.Column("day", sa.Date, primary_key=True),
+            sa.Column(
+                "product_id",
+                sa.Integer,
+                sa.ForeignKey("products.id"),
+                primary_key=True,
+            ),
+            sa.Column("platform", sa.String(50), primary_key=True),
+            sa.Column("units", sa.Integer, nullable=False),
+            sa.Column("revenue", sa.Float, nullable=False),
+        )
+    if not bind.execute(sa.text("SELECT 1 FROM product_daily_sales LIMIT 1")).first():
+        op.execute(BACKFILL)
+
+
+def downgrade() -> None:
+    op.drop_table("product_daily_sales")
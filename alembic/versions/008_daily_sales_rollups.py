@@ -0,0 +1,69 @@
+from datetime import date
+
+import sqlalchemy as sa
+from alembic import op
+
+from app.analytics.sketches import HyperLogLog
+
+# revision identifiers, used by Alembic.
+revision = "008_daily_sales_rollups"
+down_revision = "007_product_daily_sales"
+branch_labels = None
+depends_on = None
+
+
+def _as_date(value):
+    return value if isinstance(value, date) else date.fromisoformat(value)
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if sa.inspect(bind).has_table("daily_sales_rollups"):
+        return
+    rollups = op.create_table(
+        "daily_sales_rollups",
+        sa.Column("day", sa.Date, primary_key=True),
+        sa.Column("platform", sa.String(50), primary_key=True),
+        sa.Column("orders", sa.Integer, nullable=False),
+        sa.Column("revenue", sa.Float, nullable=False),
+        sa.Column("customer_sketch", sa.LargeBinary, nullable=True),
+    )
+
+    sales = sa.table(
+        "sales",
+        sa.column("id"),
+        sa.column("order_date"),
+        sa.column("platform"),
+        sa.column("customer_id"),
+        sa.column("total_amount"),
+    )
+    day = sa.func.date(sales.c.order_date)
+    rows = {}
+    for row_day, platform, orders, revenue in bind.execute(
+        sa.select(
+            day, sales.c.platform, sa.func.count(), sa.func.sum(sales.c.total_amount)
+        ).group_by(day, sales.c.platform)
+    ):
+        rows[(_as_date(row_day), platform)] = (orders, revenue, HyperLogLog())
+    for row_day, platform, customer_id in bind.execute(
+        sa.select(day, sales.c.platform, sales.c.customer_id).distinct()
+    ):
+        rows[(_as_date(row_day), platform)][2].add(customer_id)
+    if rows:
+        op.bulk_insert(
+            rollups,
+            [
+                {
+                    "day": row_day,
+                    "platform": platform,
+                    "orders": orders,
+                    "revenue": revenue,
+                    "customer_sketch": sketch.to_bytes(),
+                }
+                for (row_day, platform), (orders, revenue, sketch) in rows.items()
+            ],
+        )
+
+
+def downgrade() -> None:
+    op.drop_table("daily_sales_rollups")
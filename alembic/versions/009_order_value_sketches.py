@@ -0,0 +1,68 @@
+from datetime import date
+
+import sqlalchemy as sa
+from alembic import op
+
+from app.analytics.sketches import TDigest
+
+# revision identifiers, used by Alembic.
+revision = "009_order_value_sketches"
+down_revision = "008_daily_sales_rollups"
+branch_labels = None
+depends_on = None
+
+
+def _as_date(value):
+    return value if isinstance(value, date) else date.fromisoformat(value)
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    existing = {c["name"] for c in sa.inspect(bind).get_columns("daily_sales_rollups")}
+    if "order_value_sketch" in existing:
+        return
+    op.add_column(
+        "daily_sales_rollups",
+        sa.Column("order_value_sketch", sa.LargeBinary, nullable=True),
+    )
+
+    sales = sa.table(
+        "sales",
+        sa.column("order_date"),
+        sa.column("platform"),
+        sa.column("total_amount"),
+    )
+    rollups = sa.table(
+        "daily_sales_rollups",
+        sa.column("day"),
+        sa.column("platform"),
+        sa.column("order_value_sketch"),
+    )
+    digests = {}
+    for row_day, platform, total_amount in bind.execute(
+        sa.select(
+            sa.func.date(sales.c.order_date), sales.c.platform, sales.c.total_amount
+        )
+    ):
+        digests.setdefault((_as_date(row_day), platform), TDigest()).add(total_amount)
+    if digests:
+        bind.execute(
+            rollups.update()
+            .where(
+                rollups.c.day == sa.bindparam("_day"),
+                rollups.c.platform == sa.bindparam("_platform"),
+            )
+            .values(order_value_sketch=sa.bindparam("order_value_sketch")),
+            [
+                {
+                    "_day": row_day,
+                    "_platform": platform,
+                    "order_value_sketch": digest.to_bytes(),
+                }
+                for (row_day, platform), digest in digests.items()
+            ],
+        )
+
+
+def downgrade() -> None:
+    op.drop_column("daily_sales_rollups", "order_value_sketch")
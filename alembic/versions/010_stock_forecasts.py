@@ -0,0 +1,32 @@
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "010_stock_forecasts"
+down_revision = "009_order_value_sketches"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    if sa.inspect(op.get_bind()).has_table("stock_forecasts"):
+        return
+    op.create_table(
+        "stock_forecasts",
+        sa.Column(
+            "product_id", sa.Integer, sa.ForeignKey("products.id"), primary_key=True
+        ),
+        sa.Column("quantity", sa.Integer, nullable=False),
+        sa.Column("daily_velocity", sa.Float, nullable=False),
+        sa.Column("days_of_cover", sa.Float, nullable=True),
+        sa.Column("stockout_date", sa.Date, nullable=True),
+        sa.Column("as_of", sa.Date, nullable=False),
+        sa.Column("computed_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index(
+        "ix_stock_forecasts_days_of_cover", "stock_forecasts", ["days_of_cover"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("stock_forecasts")
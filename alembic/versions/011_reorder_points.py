@@ -0,0 +1,28 @@
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "011_reorder_points"
+down_revision = "010_stock_forecasts"
+branch_labels = None
+depends_on = None
+
+COLUMNS = {
+    "inventory": ["reorder_quantity"],
+    "inventory_history": ["previous_threshold", "new_threshold"],
+}
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    for table, columns in COLUMNS.items():
+        existing = {c["name"] for c in inspector.get_columns(table)}
+        for name in columns:
+            if name not in existing:
+                op.add_column(table, sa.Column(name, sa.Integer, nullable=True))
+
+
+def downgrade() -> None:
+    for table, columns in COLUMNS.items():
+        for name in columns:
+            op.drop_column(table, name)
@@ -0,0 +1,27 @@
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "012_scheduled_jobs"
+down_revision = "011_reorder_points"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    if sa.inspect(op.get_bind()).has_table("scheduled_jobs"):
+        return
+    op.create_table(
+        "scheduled_jobs",
+        sa.Column("name", sa.String(100), primary_key=True),
+        sa.Column("next_run_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("owner", sa.String(100), nullable=True),
+        sa.Column("locked_until", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("last_started_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("last_duration_seconds", sa.Float, nullable=True),
+        sa.Column("last_error", sa.String(500), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("scheduled_jobs")
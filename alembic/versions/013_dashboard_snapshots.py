@@ -0,0 +1,24 @@
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "013_dashboard_snapshots"
+down_revision = "012_scheduled_jobs"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    if sa.inspect(op.get_bind()).has_table("dashboard_snapshots"):
+        return
+    op.create_table(
+        "dashboard_snapshots",
+        sa.Column("period_days", sa.Integer, primary_key=True),
+        sa.Column("end_date", sa.Date, nullable=False),
+        sa.Column("payload", sa.Text, nullable=False),
+        sa.Column("computed_at", sa.DateTime(timezone=True), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("dashboard_snapshots")
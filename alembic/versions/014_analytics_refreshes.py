@@ -0,0 +1,39 @@
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "014_analytics_refreshes"
+down_revision = "013_dashboard_snapshots"
+branch_labels = None
+depends_on = None
+
+# Name of each cached result and the table it was previously read from.
+CACHED_TABLES = {
+    "customer-analytics": "customer_rfm",
+    "stock-forecasts": "stock_forecasts",
+    "dashboard-snapshots": "dashboard_snapshots",
+}
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if sa.inspect(bind).has_table("analytics_refreshes"):
+        return
+    refreshes = op.create_table(
+        "analytics_refreshes",
+        sa.Column("name", sa.String(100), primary_key=True),
+        sa.Column("computed_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    # Keep existing results instead of recomputing them on the next read.
+    for name, table in CACHED_TABLES.items():
+        latest = sa.func.max(sa.table(table, sa.column("computed_at")).c.computed_at)
+        bind.execute(
+            refreshes.insert().from_select(
+                ["name", "computed_at"],
+                sa.select(sa.literal(name), latest).having(latest.is_not(None)),
+            )
+        )
+
+
+def downgrade() -> None:
+    op.drop_table("analytics_refreshes")
@@ -0,0 +1,29 @@
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "015_pending_sale_sketches"
+down_revision = "014_analytics_refreshes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    if sa.inspect(op.get_bind()).has_table("pending_sale_sketches"):
+        return
+    op.create_table(
+        "pending_sale_sketches",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("day", sa.Date, nullable=False),
+        sa.Column("platform", sa.String(50), nullable=False),
+        sa.Column("customer_id", sa.Integer, nullable=False),
+        sa.Column("total_amount", sa.Float, nullable=False),
+    )
+    op.create_index("ix_pending_sale_sketches_day", "pending_sale_sketches", ["day"])
+
+
+def downgrade() -> None:
+    # Sales still pending are missing from the sketches afterwards until
+    # crud.rebuild_daily_sales_rollups is run.
+    op.drop_index("ix_pending_sale_sketches_day", table_name="pending_sale_sketches")
+    op.drop_table("pending_sale_sketches")
@@ -0,0 +1,250 @@
+"""RFM segmentation and monthly cohort retention, computed in batch.
+
+The job streams only ``(customer_id, order_date, total_amount)`` from ``sales``
+in chunks of ``CUSTOMER_ANALYTICS_CHUNK_SIZE`` rows and folds each chunk into
+per-customer NumPy arrays (last order day, order count, revenue, first order
+month) plus the distinct (customer, month) pairs it saw. Scoring and the cohort
+matrix are then a handful of vectorized operations over those arrays.
+
+Results are written to ``customer_rfm`` and ``cohort_retention`` with a
+``computed_at`` timestamp, replacing the previous run in one transaction. The
+endpoints read those tables; when they are older than
+``CUSTOMER_ANALYTICS_MAX_AGE_SECONDS`` a daemon thread recomputes them while the
+old results keep being served.
+
+This module imports NumPy at the top, so it is only imported where it is used.
+"""
+
+import time
+from datetime import date, datetime, timezone
+from functools import partial
+from typing import Any, Dict, List, NamedTuple, Optional
+
+import numpy as np
+from sqlalchemy import delete, insert, select
+from sqlalchemy.engine import Connection, Engine
+
+from app.analytics.refresh import CachedAnalytics, mark_computed
+from app.core.config import settings
+from app.db.session import engine
+from app.models.models import CohortRetention, CustomerRFM, Sale
+
+# (name, condition on r and fm scores); the first match wins.
+SEGMENT_RULES = (
+    ("champions", lambda r, fm: (r >= 4) & (fm >= 4)),
+    ("loyal", lambda r, fm: (r >= 3) & (fm >= 3)),
+    ("new", lambda r, fm: (r >= 4) & (fm <= 2)),
+    ("at_risk", lambda r, fm: (r <= 2) & (fm >= 3)),
+    ("hibernating", lambda r, fm: (r <= 2) & (fm <= 2)),
+)
+OTHER_SEGMENT = "needs_attention"
+SEGMENTS = tuple(name for name, _ in SEGMENT_RULES) + (OTHER_SEGMENT,)
+
+CUSTOMER_ANALYTICS = "customer-analytics"
+
+# (customer_id << MONTH_BITS) | month packs an activity pair into one int64.
+MONTH_BITS = 20
+
+
+class OrderAggregates(NamedTuple):
+    """Per-customer arrays indexed by customer id; ids without orders hold 0."""
+
+    orders: np.ndarray
+    revenue: np.ndarray
+    last_day: np.ndarray
+    first_month: np.ndarray
+    # Sorted distinct (customer_id << MONTH_BITS) | month of every order.
+    active_months: np.ndarray
+
+
+def _grow(array: np.ndarray, size: int, fill) -> np.ndarray:
+    if size <= len(array):
+        return array
+    grown = np.full(max(size, 2 * len(array)), fill, dtype=array.dtype)
+    grown[: len(array)] = array
+    return grown
+
+
+def load_order_aggregates(
+    conn: Connection, chunk_size: int = 100_000
+) -> OrderAggregates:
+    """Stream the sales table once and reduce it to per-customer arrays."""
+    no_month = np.iinfo(np.int64).max
+    orders = np.zeros(0, dtype=np.int64)
+    revenue = np.zeros(0, dtype=np.float64)
+    last_day = np.zeros(0, dtype=np.int64)
+    first_month = np.full(0, no_month, dtype=np.int64)
+    active: List[np.ndarray] = []
+    size = 0
+
+    result = conn.execution_options(
+        stream_results=True, yield_per=chunk_size, slow_query_log=False
+    ).execute(select(Sale.customer_id, Sale.order_date, Sale.total_amount))
+    for rows in result.partitions(chunk_size):
+        ids_, dates_, amounts_ = zip(*rows)
+        ids = np.array(ids_, dtype=np.int64)
+        if dates_[0].tzinfo is not None:
+            dates_ = [d.astimezone(timezone.utc).replace(tzinfo=None) for d in dates_]
+        stamps = np.array(dates_, dtype="datetime64[s]")
+        days = stamps.astype("datetime64[D]").astype(np.int64)
+        months = stamps.astype("datetime64[M]").astype(np.int64)
+        amounts = np.array(amounts_, dtype=np.float64)
+
+        size = max(size, int(ids.max()) + 1)
+        orders = _grow(orders, size, 0)
+        revenue = _grow(revenue, size, 0.0)
+        last_day = _grow(last_day, size, 0)
+        first_month = _grow(first_month, size, no_month)
+
+        orders[:size] += np.bincount(ids, minlength=size)
+        revenue[:size] += np.bincount(ids, weights=amounts, minlength=size)
+        np.maximum.at(last_day, ids, days)
+        np.minimum.at(first_month, ids, months)
+        active.append(np.unique((ids << MONTH_BITS) | months))
+
+    return OrderAggregates(
+        orders=orders[:size],
+        revenue=revenue[:size],
+        last_day=last_day[:size],
+        first_month=first_month[:size],
+        active_months=(
+            np.unique(np.concatenate(active)) if active else np.zeros(0, np.int64)
+        ),
+    )
+
+
+def quintile_scores(values: np.ndarray) -> np.ndarray:
+    """1-5 by quintile of ``values``; equal values always get the same score."""
+    if not len(values):
+        return np.zeros(0, dtype=np.int64)
+    edges = np.quantile(values, [0.2, 0.4, 0.6, 0.8])
+    return np.searchsorted(edges, values, side="left") + 1
+
+
+def rfm_scores(aggregates: OrderAggregates, as_of: date) -> Dict[str, np.ndarray]:
+    """RFM values, 1-5 scores and segment of every customer with orders."""
+    customer_ids = np.flatnonzero(aggregates.orders)
+    as_of_day = np.datetime64(as_of, "D").astype(np.int64)
+    recency = np.maximum(as_of_day - aggregates.last_day[customer_ids], 0)
+    frequency = aggregates.orders[customer_ids]
+    monetary = aggregates.revenue[customer_ids]
+
+    # Fewer days since the last order is better.
+    r = 6 - quintile_scores(recency)
+    f = quintile_scores(frequency)
+    m = quintile_scores(monetary)
+    fm = (f + m) // 2
+    segment = np.select(
+        [rule(r, fm) for _, rule in SEGMENT_RULES],
+        [name for name, _ in SEGMENT_RULES],
+        default=OTHER_SEGMENT,
+    )
+    return {
+        "customer_id": customer_ids,
+        "recency_days": recency,
+        "frequency": frequency,
+        "monetary": monetary,
+        "r_score": r,
+        "f_score": f,
+        "m_score": m,
+        "segment": segment,
+    }
+
+
+def cohort_matrix(aggregates: OrderAggregates) -> Dict[str, np.ndarray]:
+    """Customers of each first-order month still ordering N months later.
+
+    Returns parallel arrays ``cohort`` (months since 1970), ``months_since``,
+    ``customers`` and ``retention`` (``customers`` over the cohort's size).
+    """
+    if not len(aggregates.active_months):
+        empty = np.zeros(0, dtype=np.int64)
+        return {
+            "cohort": empty,
+            "months_since": empty,
+            "customers": empty,
+            "retention": empty.astype(np.float64),
+        }
+    ids = aggregates.active_months >> MONTH_BITS
+    months = aggregates.active_months & ((1 << MONTH_BITS) - 1)
+    cohorts = aggregates.first_month[ids]
+    offsets = months - cohorts
+
+    first = int(cohorts.min())
+    width = int(offsets.max()) + 1
+    counts = np.bincount((cohorts - first) * width + offsets)
+    cells = np.flatnonzero(counts)
+    cohort, months_since = cells // width + first, cells % width
+    sizes = counts[(cohort - first) * width]
+    return {
+        "cohort": cohort,
+        "months_since": months_since,
+        "customers": counts[cells],
+        "retention": counts[cells] / sizes,
+    }
+
+
+def _month_label(month: int) -> str:
+    return str(np.datetime64(int(month), "M"))
+
+
+def refresh_customer_analytics(
+    engine: Engine, as_of: Optional[date] = None, chunk_size: int = 100_000
+) -> Dict[str, Any]:
+    """Recompute RFM scores and cohort retention and replace the cached rows."""
+    started = time.perf_counter()
+    as_of = as_of or datetime.now(timezone.utc).date()
+    computed_at = datetime.now(timezone.utc)
+    with engine.connect() as conn:
+        aggregates = load_order_aggregates(conn, chunk_size)
+    rfm = rfm_scores(aggregates, as_of)
+    cohorts = cohort_matrix(aggregates)
+
+    rfm_rows = [
+        {
+            "customer_id": int(row[0]),
+            "recency_days": int(row[1]),
+            "frequency": int(row[2]),
+            "monetary": float(row[3]),
+            "r_score": int(row[4]),
+            "f_score": int(row[5]),
+            "m_score": int(row[6]),
+            "segment": str(row[7]),
+            "as_of": as_of,
+            "computed_at": computed_at,
+        }
+        for row in zip(*rfm.values())
+    ]
+    cohort_rows = [
+        {
+            "cohort_month": _month_label(cohort),
+            "months_since": int(months_since),
+            "customers": int(customers),
+            "retention": float(retention),
+            "computed_at": computed_at,
+        }
+        for cohort, months_since, customers, retention in zip(*cohorts.values())
+    ]
+    with engine.begin() as conn:
+        conn.execute(delete(CustomerRFM))
+        conn.execute(delete(CohortRetention))
+        for start in range(0, len(rfm_rows), chunk_size):
+            conn.execute(insert(CustomerRFM), rfm_rows[start : start + chunk_size])
+        if cohort_rows:
+            conn.execute(insert(CohortRetention), cohort_rows)
+        mark_computed(conn, CUSTOMER_ANALYTICS, computed_at)
+    return {
+        "customers": len(rfm_rows),
+        "cohort_cells": len(cohort_rows),
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+customer_analytics = CachedAnalytics(
+    CUSTOMER_ANALYTICS,
+    partial(
+        refresh_customer_analytics, chunk_size=settings.CUSTOMER_ANALYTICS_CHUNK_SIZE
+    ),
+    engine,
+    max_age_seconds=settings.CUSTOMER_ANALYTICS_MAX_AGE_SECONDS,
+)
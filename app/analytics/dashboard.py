@@ -0,0 +1,128 @@
+"""Precomputed ``/dashboard/summary`` for the common periods.
+
+The summaries for ``DASHBOARD_SNAPSHOT_PERIODS`` are computed by the
+``dashboard_snapshots`` background job and stored as JSON in
+``dashboard_snapshots``, one row per period, so every worker can serve them
+with one primary-key read.
+
+The job's interval is just under ``DASHBOARD_SNAPSHOT_TTL_SECONDS``, so a
+snapshot older than that is only seen while the job is behind. It is still
+returned, reported as stale, and the read makes the job due at once; the run is
+still claimed by one worker across the fleet. Without a scheduler the worker
+refreshes the snapshots in a background thread instead.
+
+A snapshot older than ``DASHBOARD_SNAPSHOT_MAX_AGE_SECONDS`` or computed on an
+earlier day is not served, nor is a missing one or a period that is not
+precomputed: the summary is computed in the request. Missing and too old
+snapshots are refreshed as stale ones are.
+"""
+
+import json
+import time
+from datetime import date, datetime, timezone
+from functools import partial
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from sqlalchemy import delete, insert
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.analytics.refresh import CachedAnalytics, mark_computed
+from app.core.config import settings
+from app.core.scheduler import DASHBOARD_SNAPSHOTS_JOB, scheduler
+from app.crud import crud
+from app.db.session import engine
+from app.models.models import DashboardSnapshot
+
+DASHBOARD_SNAPSHOTS = "dashboard-snapshots"
+
+
+def refresh_dashboard_snapshots(
+    engine: Engine, periods: Sequence[int], today: Optional[date] = None
+) -> Dict[str, Any]:
+    """Recompute the summary of every period and replace the stored snapshots."""
+    started = time.perf_counter()
+    today = today or datetime.now().date()
+    computed_at = datetime.now(timezone.utc)
+    with Session(engine) as db:
+        rows = [
+            {
+                "period_days": period_days,
+                "end_date": today,
+                "payload": json.dumps(
+                    crud.get_dashboard_summary(db, period_days, today)
+                ),
+                "computed_at": computed_at,
+            }
+            for period_days in periods
+        ]
+    with engine.begin() as conn:
+        conn.execute(delete(DashboardSnapshot))
+        conn.execute(insert(DashboardSnapshot), rows)
+        mark_computed(conn, DASHBOARD_SNAPSHOTS, computed_at)
+    return {
+        "periods": len(rows),
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+class DashboardSnapshots(CachedAnalytics):
+    def __init__(
+        self,
+        engine: Engine,
+        periods: Sequence[int],
+        ttl_seconds: float,
+        max_stale_seconds: float,
+        scheduled: bool = True,
+    ):
+        super().__init__(
+            DASHBOARD_SNAPSHOTS,
+            partial(refresh_dashboard_snapshots, periods=periods),
+            engine,
+            max_age_seconds=ttl_seconds,
+        )
+        self.periods = tuple(periods)
+        self.max_stale_seconds = max_stale_seconds
+        self.scheduled = scheduled
+
+    def request_refresh(self, engine: Engine) -> None:
+        """Have the scheduled job run now, or refresh here without a scheduler."""
+        if self.scheduled:
+            scheduler.run_soon(DASHBOARD_SNAPSHOTS_JOB)
+        else:
+            self.refresh_in_background(engine)
+
+    def serve(
+        self, db: Session, period_days: int
+    ) -> Tuple[Dict[str, Any], Optional[float], str]:
+        """``(summary, age_seconds, state)``; state is fresh, stale, miss or live.
+
+        Age is None when the summary was computed for this request.
+        """
+        if period_days not in self.periods:
+            return crud.get_dashboard_summary(db, period_days), None, "live"
+        snapshot = db.get(DashboardSnapshot, period_days)
+        if snapshot is None:
+            self.request_refresh(db.get_bind())
+            return crud.get_dashboard_summary(db, period_days), None, "miss"
+
+        computed_at = snapshot.computed_at
+        if computed_at.tzinfo is None:
+            computed_at = computed_at.replace(tzinfo=timezone.utc)
+        age = max((datetime.now(timezone.utc) - computed_at).total_seconds(), 0.0)
+        if age <= self.max_age_seconds and snapshot.end_date == datetime.now().date():
+            return json.loads(snapshot.payload), age, "fresh"
+
+        self.request_refresh(db.get_bind())
+        if age > self.max_stale_seconds or snapshot.end_date != datetime.now().date():
+            return crud.get_dashboard_summary(db, period_days), None, "live"
+        return json.loads(snapshot.payload), age, "stale"
+
+
+dashboard_snapshots = DashboardSnapshots(
+    engine,
+    periods=[int(p) for p in settings.DASHBOARD_SNAPSHOT_PERIODS.split(",")],
+    ttl_seconds=settings.DASHBOARD_SNAPSHOT_TTL_SECONDS,
+    max_stale_seconds=settings.DASHBOARD_SNAPSHOT_MAX_AGE_SECONDS,
+    scheduled=settings.SCHEDULER_ENABLED,
+)
@@ -0,0 +1,345 @@
+"""Incremental Parquet snapshots of the sales tables.
+
+Each table is exported to ``<output>/<table>/`` as Parquet files. Fact tables
+are partitioned by month (``month=YYYY-MM``, Hive style) so readers can prune
+by date. Every run is numbered; a run only reads rows past the table's
+watermark and writes one ``part-<run>.parquet`` file per partition it touches.
+
+* Append-only tables (``sale_items``, ``inventory_history``) use an ``id``
+  watermark.
+* Mutable tables (``sales``, ``products``, ``inventory``) also export rows
+  whose ``updated_at``/``created_at`` is past a time watermark.
+* Deletes, which no watermark can see, are tracked for ``products`` and
+  ``inventory``: every run also reads their ids, an index-only scan, and keeps
+  them in ``_ids/<table>/ids-<run>.parquet``. Ids gone since the previous run
+  are written to ``_deleted/<table>/part-<run>.parquet``; readers drop those
+  rows after applying the run's other files.
+
+Ids and timestamps are assigned when a row is written, not when it commits, so
+a row can become visible after a later one was exported. Watermarks therefore
+trail the database clock by ``rescan_seconds``: the id watermark is the highest
+id created before that, and the time watermark is that moment itself. Rows
+newer than that are read again by the next run, so only transactions that take
+longer than ``rescan_seconds`` to commit can be missed. Rows can thus appear in
+several runs; readers keep the row with the highest ``_export_run`` per ``id``.
+
+Watermarks are written to ``_watermarks.json`` only after all files of a run
+are complete, and files from an unfinished run are removed at the start of the
+next one, so an interrupted export never leaves duplicates behind.
+"""
+
+import os
+import json
+import glob
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import Boolean, Date, DateTime, Float, Integer, func, or_, select
+from sqlalchemy.engine import Engine
+
+from app.models.models import Inventory, InventoryHistory, Product, Sale, SaleItem
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - optional dependency
+    pa = pc = pq = None
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+WATERMARK_FILE = "_watermarks.json"
+LOCK_FILE = ".lock"
+RUN_COLUMN = "_export_run"
+IDS_DIR = "_ids"
+DELETED_DIR = "_deleted"
+
+
+class ExportTable:
+    def __init__(
+        self, model, mutable: bool, month_column=None, join=None, deletes: bool = False
+    ):
+        self.model = model
+        self.table = model.__table__
+        self.name = self.table.name
+        self.mutable = mutable
+        self.month_column = month_column
+        self.join = join
+        self.deletes = deletes
+
+    @property
+    def changed_at(self):
+        return func.coalesce(self.table.c.updated_at, self.table.c.created_at)
+
+
+EXPORT_TABLES: Dict[str, ExportTable] = {
+    table.name: table
+    for table in (
+        ExportTable(Sale, mutable=True, month_column=Sale.order_date),
+        # Items are partitioned by their sale's order month, not insert time.
+        ExportTable(
+            SaleItem,
+            mutable=False,
+            month_column=Sale.order_date,
+            join=(Sale, SaleItem.sale_id == Sale.id),
+        ),
+        ExportTable(Product, mutable=True, deletes=True),
+        ExportTable(Inventory, mutable=True, deletes=True),
+        ExportTable(
+            InventoryHistory, mutable=False, month_column=InventoryHistory.created_at
+        ),
+    )
+}
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise RuntimeError(
+            "Parquet export requires pyarrow: pip install -r requirements-analytics.txt"
+        )
+
+
+def _arrow_type(column):
+    if isinstance(column.type, Integer):
+        return pa.int64()
+    if isinstance(column.type, Float):
+        return pa.float64()
+    if isinstance(column.type, Boolean):
+        return pa.bool_()
+    if isinstance(column.type, DateTime):
+        return pa.timestamp("us")
+    if isinstance(column.type, Date):
+        return pa.date32()
+    return pa.string()
+
+
+def arrow_schema(spec: ExportTable) -> "pa.Schema":
+    fields = [pa.field(c.name, _arrow_type(c)) for c in spec.table.columns]
+    return pa.schema(fields + [pa.field(RUN_COLUMN, pa.int64())])
+
+
+def part_files(output_dir: str, table: str = "*") -> List[str]:
+    pattern = os.path.join(output_dir, table, "**", "part-*.parquet")
+    return glob.glob(pattern, recursive=True)
+
+
+def part_run(path: str) -> int:
+    """The export run that wrote a ``part-<run>.parquet`` file."""
+    return int(os.path.basename(path)[len("part-") :].split(".")[0])
+
+
+def deleted_files(output_dir: str, table: str) -> List[str]:
+    """Tombstone files listing the ids of ``table`` deleted in each run."""
+    return part_files(os.path.join(output_dir, DELETED_DIR), table)
+
+
+def _ids_path(output_dir: str, table: str, run: int) -> str:
+    return os.path.join(output_dir, IDS_DIR, table, f"ids-{run:06d}.parquet")
+
+
+def _parse_datetime(value: Any) -> Optional[datetime]:
+    if value is None or isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(str(value))
+
+
+class ParquetExporter:
+
+    def __init__(
+        self,
+        engine: Engine,
+        output_dir: str,
+        chunk_size: int = 100_000,
+        rescan_seconds: float = 300,
+    ):
+        _require_pyarrow()
+        if fcntl is None:
+            raise RuntimeError("ParquetExporter requires fcntl (POSIX only)")
+        self.engine = engine
+        self.output_dir = output_dir
+        self.chunk_size = chunk_size
+        self.rescan_seconds = rescan_seconds
+        self.state_path = os.path.join(output_dir, WATERMARK_FILE)
+        self.lock_path = os.path.join(output_dir, LOCK_FILE)
+
+    def load_state(self) -> Dict[str, Any]:
+        if not os.path.exists(self.state_path):
+            return {"run": 0, "tables": {}}
+        with open(self.state_path) as f:
+            return json.load(f)
+
+    def _save_state(self, state: Dict[str, Any]) -> None:
+        tmp_path = self.state_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(state, f, indent=2, default=str)
+        os.replace(tmp_path, self.state_path)
+
+    def _remove_stale(self, state: Dict[str, Any]) -> None:
+        """Remove files of unfinished runs and id lists no longer needed."""
+        for path in part_files(self.output_dir):
+            if part_run(path) > state["run"]:
+                os.remove(path)
+        for name in EXPORT_TABLES:
+            ids_run = state["tables"].get(name, {}).get("ids_run")
+            keep = ids_run and _ids_path(self.output_dir, name, ids_run)
+            pattern = os.path.join(self.output_dir, IDS_DIR, name, "ids-*.parquet")
+            for path in glob.glob(pattern):
+                if path != keep:
+                    os.remove(path)
+
+    def export(
+        self, tables: Optional[Iterable[str]] = None, blocking: bool = True
+    ) -> Optional[Dict[str, int]]:
+        """Export rows changed since the last run; returns rows written per table.
+
+        Only one process exports into a directory at a time. With
+        ``blocking=False`` this returns ``None`` when another export is running.
+        """
+        os.makedirs(self.output_dir, exist_ok=True)
+        with open(self.lock_path, "a") as lock:
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+            except BlockingIOError:
+                return None
+            try:
+                return self._export(tables)
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _export(self, tables: Optional[Iterable[str]]) -> Dict[str, int]:
+        state = self.load_state()
+        self._remove_stale(state)
+        run = state["run"] + 1
+
+        written = {}
+        for name in tables or EXPORT_TABLES:
+            spec = EXPORT_TABLES[name]
+            watermark = state["tables"].get(name, {})
+            written[name], state["tables"][name] = self._export_table(
+                spec, watermark, run
+            )
+
+        state["run"] = run
+        state["finished_at"] = datetime.now().isoformat()
+        self._save_state(state)
+        # The previous id lists are superseded now that this run is committed.
+        self._remove_stale(state)
+        return written
+
+    def _query(self, spec: ExportTable, watermark: Dict[str, Any]):
+        columns = list(spec.table.columns)
+        if spec.month_column is not None:
+            columns.append(spec.month_column.label("_month_source"))
+        query = select(*columns)
+        if spec.join is not None:
+            query = query.join(*spec.join)
+
+        safe_id = watermark.get("safe_id")
+        changed_since = _parse_datetime(watermark.get("changed_since"))
+        if safe_id is not None:
+            condition = spec.table.c.id > safe_id
+            if spec.mutable and changed_since is not None:
+                condition = or_(condition, spec.changed_at >= changed_since)
+            query = query.where(condition)
+        return query.order_by(spec.table.c.id)
+
+    def _watermarks(self, conn, spec: ExportTable, watermark: Dict[str, Any]):
+        """``(safe_id, changed_since)`` for the next run, in this run's snapshot."""
+        now = _parse_datetime(conn.execute(select(func.now())).scalar())
+        cutoff = now - timedelta(seconds=self.rescan_seconds)
+        safe_id = watermark.get("safe_id")
+        query = select(func.max(spec.table.c.id)).where(
+            spec.table.c.created_at < cutoff
+        )
+        if safe_id is not None:
+            query = query.where(spec.table.c.id > safe_id)
+        return conn.execute(query).scalar() or safe_id, cutoff
+
+    def _export_table(self, spec: ExportTable, watermark: Dict[str, Any], run: int):
+        schema = arrow_schema(spec)
+        column_names = [c.name for c in spec.table.columns]
+        writers: Dict[str, "pq.ParquetWriter"] = {}
+        max_id = watermark.get("max_id")
+        rows_written = 0
+
+        def open_writer(partition: str) -> "pq.ParquetWriter":
+            directory = os.path.join(self.output_dir, spec.name, partition)
+            os.makedirs(directory, exist_ok=True)
+            writers[partition] = pq.ParquetWriter(
+                os.path.join(directory, f"part-{run:06d}.parquet"), schema
+            )
+            return writers[partition]
+
+        try:
+            with self.engine.connect() as conn:
+                # Read first, so rows committed during the scan are rescanned.
+                safe_id, changed_since = self._watermarks(conn, spec, watermark)
+                result = conn.execution_options(
+                    stream_results=True, yield_per=self.chunk_size
+                ).execute(self._query(spec, watermark))
+                for rows in result.partitions(self.chunk_size):
+                    by_partition: Dict[str, List[Any]] = {}
+                    for row in rows:
+                        if spec.month_column is None:
+                            partition = ""
+                        else:
+                            month = _parse_datetime(row._month_source)
+                            partition = f"month={month:%Y-%m}"
+                        by_partition.setdefault(partition, []).append(row)
+
+                        if max_id is None or row.id > max_id:
+                            max_id = row.id
+
+                    for partition, partition_rows in by_partition.items():
+                        writer = writers.get(partition) or open_writer(partition)
+                        data = {
+                            name: [getattr(row, name) for row in partition_rows]
+                            for name in column_names
+                        }
+                        data[RUN_COLUMN] = [run] * len(partition_rows)
+                        writer.write_table(pa.Table.from_pydict(data, schema=schema))
+                    rows_written += len(rows)
+                if spec.deletes:
+                    deleted = self._export_deletes(conn, spec, watermark, run)
+        finally:
+            for writer in writers.values():
+                writer.close()
+
+        new_watermark = {
+            "max_id": max_id,
+            "safe_id": safe_id,
+            "last_run_rows": rows_written,
+        }
+        if spec.mutable:
+            new_watermark["changed_since"] = changed_since
+        if spec.deletes:
+            new_watermark.update(ids_run=run, last_run_deleted=deleted)
+        return rows_written, new_watermark
+
+    def _export_deletes(
+        self, conn, spec: ExportTable, watermark: Dict[str, Any], run: int
+    ) -> int:
+        """Keep the table's ids; write those gone since the last run as tombstones."""
+        ids = pa.array(
+            conn.execute(select(spec.table.c.id)).scalars().all(), pa.int64()
+        )
+        deleted = pa.array([], pa.int64())
+        ids_run = watermark.get("ids_run")
+        if ids_run is not None:
+            previous = pq.read_table(_ids_path(self.output_dir, spec.name, ids_run))
+            previous = previous.column("id").combine_chunks()
+            deleted = previous.filter(pc.invert(pc.is_in(previous, value_set=ids)))
+        if len(deleted):
+            directory = os.path.join(self.output_dir, DELETED_DIR, spec.name)
+            os.makedirs(directory, exist_ok=True)
+            pq.write_table(
+                pa.table({"id": deleted, RUN_COLUMN: pa.array([run] * len(deleted))}),
+                os.path.join(directory, f"part-{run:06d}.parquet"),
+            )
+        path = _ids_path(self.output_dir, spec.name, run)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        pq.write_table(pa.table({"id": ids}), path)
+        return len(deleted)
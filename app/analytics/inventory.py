@@ -0,0 +1,291 @@
+"""Stock-out forecasts for the whole catalog, computed in batch.
+
+The daily sales velocity of every product is its units sold over the trailing
+``STOCK_FORECAST_WINDOW_DAYS`` days, read from ``product_daily_sales`` with one
+grouped query and reduced with ``np.bincount``. Days of cover is the quantity
+on hand divided by that velocity, and the projected stock-out date is that many
+whole days after the forecast date. Products that sold nothing in the window
+have no projected stock-out.
+
+Results are written to ``stock_forecasts`` with a ``computed_at`` timestamp,
+replacing the previous run in one transaction, and are refreshed in the
+background once older than ``STOCK_FORECAST_MAX_AGE_SECONDS``.
+
+``recompute_reorder_points`` is the nightly counterpart: it sets every stocked
+product's ``low_stock_threshold`` to its reorder point, the expected demand
+over the supplier lead time plus safety stock for the daily demand variance,
+
+    mean * lead_time + z(service_level) * std * sqrt(lead_time)
+
+and its ``reorder_quantity`` to the expected demand over one review period.
+Mean and variance come from one grouped query over ``product_daily_sales``
+(days without sales count as zero). Inventory rows are then walked in id order
+in chunks, each in its own transaction that locks only that chunk; the changed
+rows of a chunk are written with one ``UPDATE ... CASE id`` and one history
+``INSERT``. Products that sold nothing in the window keep their thresholds.
+
+This module imports NumPy at the top, so it is only imported where it is used.
+"""
+
+import time
+from datetime import date, datetime, timedelta, timezone
+from functools import partial
+from statistics import NormalDist
+from typing import Any, Dict, Optional
+
+import numpy as np
+from sqlalchemy import case, delete, func, insert, select, update
+from sqlalchemy.engine import Connection, Engine
+
+from app.analytics.refresh import CachedAnalytics, mark_computed
+from app.core.config import settings
+from app.db.session import engine
+from app.models.models import (
+    Inventory,
+    InventoryHistory,
+    ProductDailySales,
+    StockForecast,
+)
+
+STOCK_FORECASTS = "stock-forecasts"
+
+
+def forecast_stockouts(
+    quantity: np.ndarray, units_sold: np.ndarray, window_days: int
+) -> Dict[str, np.ndarray]:
+    """Velocity, days of cover and days until stock-out for parallel arrays.
+
+    ``days_until_stockout`` is -1 where nothing was sold; days of cover is
+    ``inf`` there.
+    """
+    velocity = units_sold / window_days
+    on_hand = np.maximum(quantity, 0).astype(np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cover = np.where(velocity > 0, on_hand / velocity, np.inf)
+    days = np.where(np.isfinite(cover), np.floor(cover), -1).astype(np.int64)
+    return {
+        "daily_velocity": velocity,
+        "days_of_cover": cover,
+        "days_until_stockout": days,
+    }
+
+
+def load_stock_and_sales(
+    conn: Connection, as_of: date, window_days: int
+) -> Dict[str, np.ndarray]:
+    """Quantity on hand and units sold in the window, indexed like ``product_id``."""
+    stock = conn.execute(
+        select(Inventory.product_id, func.sum(Inventory.quantity))
+        .group_by(Inventory.product_id)
+        .order_by(Inventory.product_id)
+    ).all()
+    product_ids = np.array([row[0] for row in stock], dtype=np.int64)
+    quantity = np.array([row[1] for row in stock], dtype=np.int64)
+
+    sold = conn.execute(
+        select(ProductDailySales.product_id, func.sum(ProductDailySales.units))
+        .where(
+            ProductDailySales.day > as_of - timedelta(days=window_days),
+            ProductDailySales.day <= as_of,
+        )
+        .group_by(ProductDailySales.product_id)
+    ).all()
+    sold_ids = np.array([row[0] for row in sold], dtype=np.int64)
+    sold_units = np.array([row[1] for row in sold], dtype=np.float64)
+    # Units by product id, then picked out for the stocked products.
+    size = int(max(product_ids.max(initial=0), sold_ids.max(initial=0))) + 1
+    units = np.bincount(sold_ids, weights=sold_units, minlength=size)[product_ids]
+    return {"product_id": product_ids, "quantity": quantity, "units_sold": units}
+
+
+def refresh_stock_forecasts(
+    engine: Engine, as_of: Optional[date] = None, window_days: int = 28
+) -> Dict[str, Any]:
+    """Recompute every product's stock-out forecast and replace the cached rows."""
+    started = time.perf_counter()
+    as_of = as_of or datetime.now(timezone.utc).date()
+    computed_at = datetime.now(timezone.utc)
+    with engine.connect() as conn:
+        data = load_stock_and_sales(conn, as_of, window_days)
+    forecast = forecast_stockouts(data["quantity"], data["units_sold"], window_days)
+
+    rows = [
+        {
+            "product_id": int(product_id),
+            "quantity": int(quantity),
+            "daily_velocity": float(velocity),
+            "days_of_cover": float(cover) if days >= 0 else None,
+            "stockout_date": as_of + timedelta(days=int(days)) if days >= 0 else None,
+            "as_of": as_of,
+            "computed_at": computed_at,
+        }
+        for product_id, quantity, velocity, cover, days in zip(
+            data["product_id"],
+            data["quantity"],
+            forecast["daily_velocity"],
+            forecast["days_of_cover"],
+            forecast["days_until_stockout"],
+        )
+    ]
+    with engine.begin() as conn:
+        conn.execute(delete(StockForecast))
+        if rows:
+            conn.execute(insert(StockForecast), rows)
+        mark_computed(conn, STOCK_FORECASTS, computed_at)
+    return {
+        "products": len(rows),
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+stock_forecasts = CachedAnalytics(
+    STOCK_FORECASTS,
+    partial(refresh_stock_forecasts, window_days=settings.STOCK_FORECAST_WINDOW_DAYS),
+    engine,
+    max_age_seconds=settings.STOCK_FORECAST_MAX_AGE_SECONDS,
+)
+
+
+def reorder_points(
+    mean: np.ndarray,
+    std: np.ndarray,
+    lead_time_days: float,
+    service_level: float,
+    review_days: float,
+) -> Dict[str, np.ndarray]:
+    """Reorder point and reorder quantity from daily demand mean and deviation."""
+    z = NormalDist().inv_cdf(service_level)
+    safety_stock = z * std * np.sqrt(lead_time_days)
+    return {
+        "reorder_point": np.ceil(mean * lead_time_days + safety_stock).astype(np.int64),
+        "reorder_quantity": np.ceil(mean * review_days).astype(np.int64),
+    }
+
+
+def load_daily_demand(
+    conn: Connection, as_of: date, window_days: int
+) -> Dict[str, np.ndarray]:
+    """Mean and standard deviation of daily units per product over the window."""
+    daily = (
+        select(
+            ProductDailySales.product_id,
+            func.sum(ProductDailySales.units).label("units"),
+        )
+        .where(
+            ProductDailySales.day > as_of - timedelta(days=window_days),
+            ProductDailySales.day <= as_of,
+        )
+        .group_by(ProductDailySales.product_id, ProductDailySales.day)
+        .subquery()
+    )
+    rows = conn.execute(
+        select(
+            daily.c.product_id,
+            func.sum(daily.c.units),
+            func.sum(daily.c.units * daily.c.units),
+        ).group_by(daily.c.product_id)
+    ).all()
+    product_ids = np.array([row[0] for row in rows], dtype=np.int64)
+    total = np.array([row[1] for row in rows], dtype=np.float64)
+    squares = np.array([row[2] for row in rows], dtype=np.float64)
+    mean = total / window_days
+    # Sample variance over every day of the window, zero-sale days included.
+    variance = (squares - window_days * mean**2) / max(window_days - 1, 1)
+    return {
+        "product_id": product_ids,
+        "mean": mean,
+        "std": np.sqrt(np.maximum(variance, 0)),
+    }
+
+
+def recompute_reorder_points(
+    engine: Engine,
+    as_of: Optional[date] = None,
+    window_days: int = 90,
+    lead_time_days: float = 7,
+    service_level: float = 0.95,
+    review_days: float = 14,
+    chunk_size: int = 1000,
+) -> Dict[str, Any]:
+    """Set ``low_stock_threshold`` and ``reorder_quantity`` from recent demand."""
+    started = time.perf_counter()
+    as_of = as_of or datetime.now(timezone.utc).date()
+    with engine.connect() as conn:
+        demand = load_daily_demand(conn, as_of, window_days)
+    points = reorder_points(
+        demand["mean"], demand["std"], lead_time_days, service_level, review_days
+    )
+    targets = {
+        int(product_id): (int(point), int(quantity))
+        for product_id, point, quantity in zip(
+            demand["product_id"], points["reorder_point"], points["reorder_quantity"]
+        )
+    }
+
+    inventory_rows = updated = 0
+    last_id = 0
+    while True:
+        # One short transaction per chunk of ids, so sales that write to other
+        # inventory rows are never blocked for the whole run.
+        with engine.begin() as conn:
+            stocked = conn.execute(
+                select(
+                    Inventory.id,
+                    Inventory.product_id,
+                    Inventory.quantity,
+                    Inventory.low_stock_threshold,
+                    Inventory.reorder_quantity,
+                )
+                .where(Inventory.id > last_id)
+                .order_by(Inventory.id)
+                .limit(chunk_size)
+                .with_for_update()
+            ).all()
+            if not stocked:
+                break
+            last_id = stocked[-1].id
+            inventory_rows += len(stocked)
+            changes = [
+                (row, targets[row.product_id])
+                for row in stocked
+                if row.product_id in targets
+                and targets[row.product_id]
+                != (row.low_stock_threshold, row.reorder_quantity)
+            ]
+            if changes:
+                _apply_reorder_points(conn, changes)
+                updated += len(changes)
+    return {
+        "inventory_rows": inventory_rows,
+        "updated": updated,
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+def _apply_reorder_points(conn: Connection, changes) -> None:
+    """One set-based ``UPDATE`` and one history ``INSERT`` for a chunk."""
+    ids = [row.id for row, _ in changes]
+    points = {row.id: point for row, (point, _) in changes}
+    quantities = {row.id: quantity for row, (_, quantity) in changes}
+    conn.execute(
+        update(Inventory)
+        .where(Inventory.id.in_(ids))
+        .values(
+            low_stock_threshold=case(points, value=Inventory.id),
+            reorder_quantity=case(quantities, value=Inventory.id),
+        )
+    )
+    conn.execute(
+        insert(InventoryHistory),
+        [
+            {
+                "inventory_id": row.id,
+                "previous_quantity": row.quantity,
+                "new_quantity": row.quantity,
+                "change_reason": "reorder point recomputed",
+                "previous_threshold": row.low_stock_threshold,
+                "new_threshold": point,
+            }
+            for row, (point, _) in changes
+        ],
+    )
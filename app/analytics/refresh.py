@@ -0,0 +1,105 @@
+"""Batch results cached in tables and refreshed once they get old.
+
+Each batch job rewrites its tables and, in the same transaction, records its
+``computed_at`` in ``analytics_refreshes`` with ``mark_computed``, so a run
+that produced no rows still counts as computed. Readers call ``ensure_fresh``
+first: the very first read computes the results in the request, later reads of
+results older than ``max_age_seconds`` start a daemon thread to recompute them
+while the old rows keep being served.
+"""
+
+import logging
+import threading
+from datetime import datetime, timezone
+from typing import Any, Callable, Optional
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.engine import Connection, Engine
+
+from app.models.models import AnalyticsRefresh
+
+logger = logging.getLogger("analytics")
+
+
+def mark_computed(conn: Connection, name: str, computed_at: datetime) -> None:
+    """Record a run of ``name`` in the transaction that wrote its results."""
+    conn.execute(delete(AnalyticsRefresh).where(AnalyticsRefresh.name == name))
+    conn.execute(insert(AnalyticsRefresh).values(name=name, computed_at=computed_at))
+
+
+class CachedAnalytics:
+    """Runs ``compute(engine)`` when the results recorded as ``name`` are old."""
+
+    def __init__(
+        self,
+        name: str,
+        compute: Callable[[Engine], Any],
+        engine: Engine,
+        max_age_seconds: float,
+    ):
+        self.name = name
+        self.compute = compute
+        self.engine = engine
+        self.max_age_seconds = max_age_seconds
+        self._lock = threading.Lock()
+
+    def computed_at(self, engine: Engine) -> Optional[datetime]:
+        with engine.connect() as conn:
+            return conn.execute(
+                select(AnalyticsRefresh.computed_at).where(
+                    AnalyticsRefresh.name == self.name
+                )
+            ).scalar()
+
+    def refresh(self, engine: Optional[Engine] = None) -> Optional[Any]:
+        """Recompute now; returns None if another refresh is already running."""
+        if not self._lock.acquire(blocking=False):
+            return None
+        try:
+            return self.compute(engine or self.engine)
+        finally:
+            self._lock.release()
+
+    def ensure_fresh(self, engine: Engine) -> None:
+        """Compute on first use; afterwards refresh stale results in the background.
+
+        Call it before the request's session reads anything: under MySQL's
+        REPEATABLE READ a transaction that has already read cannot see results
+        committed by the first computation. It uses connections of its own.
+        """
+        computed_at = self.computed_at(engine)
+        if computed_at is None:
+            with self._lock:
+                if self.computed_at(engine) is None:
+                    self.compute(engine)
+            return
+        if computed_at.tzinfo is None:
+            computed_at = computed_at.replace(tzinfo=timezone.utc)
+        age = (datetime.now(timezone.utc) - computed_at).total_seconds()
+        if age > self.max_age_seconds:
+            self.refresh_in_background(engine)
+
+    @property
+    def refreshing(self) -> bool:
+        return self._lock.locked()
+
+    def refresh_in_background(self, engine: Optional[Engine] = None) -> bool:
+        """Start a refresh in a daemon thread unless one is already running."""
+        # Taken here, not in the thread, so concurrent callers start one refresh.
+        if not self._lock.acquire(blocking=False):
+            return False
+        threading.Thread(
+            target=self._refresh_locked,
+            args=(engine or self.engine,),
+            name=self.name,
+            daemon=True,
+        ).start()
+        return True
+
+    def _refresh_locked(self, engine: Engine) -> None:
+        try:
+            self.compute(engine)
+        except Exception:
+            logger.exception("%s refresh failed", self.name)
+        finally:
+            self._lock.release()
@@ -0,0 +1,262 @@
+"""Analytics queries served by DuckDB from the Parquet snapshots.
+
+With ``ANALYTICS_BACKEND=snapshot`` the sales, revenue and revenue-comparison
+analytics read from an embedded DuckDB database instead of the OLTP database.
+A daemon thread runs the incremental Parquet export (``app/analytics/export.py``)
+every ``ANALYTICS_SNAPSHOT_REFRESH_SECONDS``, merges the new part files into
+DuckDB and drops the rows deleted since. Results lag the database by at most
+one refresh interval, for writes that commit within
+``ANALYTICS_EXPORT_RESCAN_SECONDS``.
+
+The backend only selects the matching sales, in the same order as the SQL path;
+aggregation is shared with the SQL path in ``app/crud/crud.py`` so both return
+identical results. Until the first load completes, or when the snapshot is
+older than ``ANALYTICS_SNAPSHOT_MAX_AGE_SECONDS``, queries fall back to SQL.
+
+duckdb and pyarrow are imported on first refresh, so they cost nothing at
+startup when the backend is disabled.
+"""
+
+import time
+import logging
+import threading
+import importlib.util
+from datetime import date, datetime
+from typing import Any, Iterable, List, Optional, Tuple
+
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+from app.db.session import engine
+from app.schemas import schemas
+
+logger = logging.getLogger("analytics")
+
+SNAPSHOT_TABLES = ("sales", "sale_items", "products")
+SNAPSHOT_QUERIES = (
+    "sales_analytics",
+    "revenue_analytics",
+    "compare_revenue_periods",
+)
+
+
+def _midnight(day: date) -> datetime:
+    # The SQL path compares order_date with a bare date, i.e. with midnight.
+    return datetime(day.year, day.month, day.day)
+
+
+class SnapshotBackend:
+    def __init__(
+        self,
+        engine: Engine,
+        snapshot_dir: str,
+        enabled: bool = True,
+        queries: Iterable[str] = SNAPSHOT_QUERIES,
+        database: str = ":memory:",
+        refresh_seconds: float = 60.0,
+        max_age_seconds: float = 600.0,
+        rescan_seconds: float = 300.0,
+    ):
+        self.engine = engine
+        self.snapshot_dir = snapshot_dir
+        self.enabled = enabled
+        self.queries = frozenset(queries)
+        self.database = database
+        self.refresh_seconds = refresh_seconds
+        self.max_age_seconds = max_age_seconds
+        self.rescan_seconds = rescan_seconds
+        self.loaded_run = 0
+        self.refreshed_at: Optional[float] = None
+        self._conn = None
+        self._refresh_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+
+        if enabled and not all(
+            importlib.util.find_spec(module) for module in ("duckdb", "pyarrow")
+        ):
+            logger.warning(
+                "ANALYTICS_BACKEND=snapshot requires duckdb and pyarrow; "
+                "serving analytics from the database"
+            )
+            self.enabled = False
+
+    def serves(self, query: str) -> bool:
+        """Whether ``query`` should be answered from the snapshot right now."""
+        if not self.enabled or query not in self.queries:
+            return False
+        self._ensure_worker()
+        refreshed_at = self.refreshed_at
+        return (
+            refreshed_at is not None
+            and time.time() - refreshed_at <= self.max_age_seconds
+        )
+
+    def _ensure_worker(self) -> None:
+        if self._worker is not None:
+            return
+        with self._start_lock:
+            if self._worker is None:
+                self._worker = threading.Thread(
+                    target=self._run, name="analytics-snapshot", daemon=True
+                )
+                self._worker.start()
+
+    def _run(self) -> None:
+        while True:
+            try:
+                self.refresh()
+            except Exception:
+                logger.exception("analytics snapshot refresh failed")
+            time.sleep(self.refresh_seconds)
+
+    def _connection(self):
+        if self._conn is None:
+            import duckdb
+
+            self._conn = duckdb.connect(self.database)
+            self._create_tables(self._conn)
+        return self._conn
+
+    def _create_tables(self, conn) -> None:
+        from app.analytics.export import EXPORT_TABLES, RUN_COLUMN, arrow_schema
+
+        for name in SNAPSHOT_TABLES:
+            empty = arrow_schema(EXPORT_TABLES[name]).empty_table()
+            conn.register("snapshot_schema", empty)
+            conn.execute(
+                f"CREATE OR REPLACE TABLE {name} AS "
+                f"SELECT * EXCLUDE ({RUN_COLUMN}) FROM snapshot_schema"
+            )
+            conn.unregister("snapshot_schema")
+
+    def refresh(self) -> int:
+        """Export new rows and merge them into DuckDB; returns the loaded run."""
+        from app.analytics.export import ParquetExporter, deleted_files, part_files
+
+        with self._refresh_lock:
+            exporter = ParquetExporter(
+                self.engine, self.snapshot_dir, rescan_seconds=self.rescan_seconds
+            )
+            # Another worker process may be exporting; then load what it committed.
+            exporter.export(SNAPSHOT_TABLES, blocking=False)
+            committed = exporter.load_state()["run"]
+
+            conn = self._connection()
+            if committed < self.loaded_run:
+                # The snapshot directory was rebuilt from scratch.
+                self._create_tables(conn)
+                self.loaded_run = 0
+            if committed > self.loaded_run:
+                conn.begin()
+                try:
+                    for name in SNAPSHOT_TABLES:
+                        files = self._new_files(
+                            part_files(self.snapshot_dir, name), committed
+                        )
+                        if files:
+                            self._merge(conn, name, files)
+                        # Deleted ids are never reused: drop them after the merge.
+                        deleted = self._new_files(
+                            deleted_files(self.snapshot_dir, name), committed
+                        )
+                        if deleted:
+                            conn.execute(
+                                f"DELETE FROM {name} WHERE id IN (SELECT id FROM "
+                                "read_parquet(?, hive_partitioning = false))",
+                                [deleted],
+                            )
+                    conn.commit()
+                except Exception:
+                    conn.rollback()
+                    raise
+                self.loaded_run = committed
+            self.refreshed_at = time.time()
+            return self.loaded_run
+
+    def _new_files(self, paths: List[str], committed: int) -> List[str]:
+        from app.analytics.export import part_run
+
+        return sorted(
+            path for path in paths if self.loaded_run < part_run(path) <= committed
+        )
+
+    def _merge(self, conn, name: str, files: List[str]) -> None:
+        from app.analytics.export import RUN_COLUMN
+
+        # Rows exported again after an update replace the earlier version.
+        conn.execute(
+            "CREATE OR REPLACE TEMP TABLE incoming AS "
+            f"SELECT * EXCLUDE ({RUN_COLUMN}) "
+            "FROM read_parquet(?, hive_partitioning = false) "
+            f"QUALIFY row_number() OVER (PARTITION BY id ORDER BY {RUN_COLUMN} DESC) = 1",
+            [files],
+        )
+        conn.execute(f"DELETE FROM {name} WHERE id IN (SELECT id FROM incoming)")
+        conn.execute(f"INSERT INTO {name} BY NAME SELECT * FROM incoming")
+        conn.execute("DROP TABLE incoming")
+
+    def _select_sales(self, params, item_filters_match_one_item: bool):
+        clauses = ["s.order_date >= ?", "s.order_date <= ?"]
+        args: List[Any] = [_midnight(params.start_date), _midnight(params.end_date)]
+        if params.platform:
+            clauses.append("s.platform = ?")
+            args.append(params.platform)
+
+        item_filters = []
+        if params.product_id:
+            item_filters.append(("i.product_id = ?", params.product_id))
+        if params.category_id:
+            item_filters.append(("p.category_id = ?", params.category_id))
+        if item_filters:
+            groups = (
+                [item_filters]
+                if item_filters_match_one_item
+                else [[item_filter] for item_filter in item_filters]
+            )
+            exists = []
+            for group in groups:
+                join = (
+                    " JOIN products p ON p.id = i.product_id"
+                    if any(condition.startswith("p.") for condition, _ in group)
+                    else ""
+                )
+                conditions = " AND ".join(condition for condition, _ in group)
+                exists.append(
+                    f"EXISTS (SELECT 1 FROM sale_items i{join} "
+                    f"WHERE i.sale_id = s.id AND {conditions})"
+                )
+                args.extend(value for _, value in group)
+            clauses.append("(" + " OR ".join(exists) + ")")
+
+        cursor = self._connection().cursor()
+        return cursor.execute(
+            "SELECT s.order_date, s.total_amount FROM sales s WHERE "
+            + " AND ".join(clauses)
+            + " ORDER BY s.id",
+            args,
+        )
+
+    def sales(
+        self, params: schemas.SalesAnalyticsParams
+    ) -> List[Tuple[datetime, float]]:
+        """``(order_date, total_amount)`` of sales with any matching item."""
+        return self._select_sales(params, item_filters_match_one_item=False).fetchall()
+
+    def revenue(self, params: schemas.RevenueAnalyticsParams):
+        """Sales as a DataFrame; one item must match both product and category."""
+        return self._select_sales(params, item_filters_match_one_item=True).df()
+
+
+_queries = settings.ANALYTICS_SNAPSHOT_QUERIES
+
+snapshot_backend = SnapshotBackend(
+    engine,
+    snapshot_dir=settings.ANALYTICS_SNAPSHOT_DIR,
+    enabled=settings.ANALYTICS_BACKEND.lower() == "snapshot",
+    queries=[q.strip() for q in _queries.split(",")] if _queries else SNAPSHOT_QUERIES,
+    database=settings.ANALYTICS_DUCKDB_PATH,
+    refresh_seconds=settings.ANALYTICS_SNAPSHOT_REFRESH_SECONDS,
+    max_age_seconds=settings.ANALYTICS_SNAPSHOT_MAX_AGE_SECONDS,
+    rescan_seconds=settings.ANALYTICS_EXPORT_RESCAN_SECONDS,
+)
@@ -1,7 +1,8 @@
 from fastapi import APIRouter
 from app.api import endpoints
 from app.api.dashboard import router as dashboard_router
+from app.core.rate_limit import rate_limit
 
-api_router = APIRouter()
+api_router = APIRouter(dependencies=[rate_limit()])
 api_router.include_router(endpoints.router, tags=["ecommerce"])
 api_router.include_router(dashboard_router, tags=["dashboard"])
@@ -7,7 +7,6 @@ from app.db.session import get_db
 from app.schemas import schemas
 from app.crud import crud
 
-
 router = APIRouter()
 
 
@@ -81,6 +80,15 @@ def read_products(
     return products
 
 
+@router.get("/products/search", response_model=List[schemas.Product])
+def search_products(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+):
+    return crud.search_products(db, q=q, limit=limit)
+
+
 @router.get("/products/{product_id}", response_model=schemas.Product)
 def read_product(
     product_id: int = Path(..., title="The ID of the product to get"),
@@ -152,6 +160,33 @@ def read_inventories(
     return inventories
 
 
+@router.get("/inventory/low-stock", response_model=List[schemas.LowStockAlert])
+def get_low_stock_alerts(
+    threshold_override: Optional[int] = Query(
+        None, description="Override the default low stock threshold"
+    ),
+    db: Session = Depends(get_db),
+):
+    alerts = crud.get_low_stock_alerts(db, threshold_override=threshold_override)
+    return alerts
+
+
+@router.get("/inventory/forecast", response_model=schemas.StockForecastResponse)
+def get_stock_forecast(
+    horizon_days: Optional[int] = Query(
+        None,
+        ge=0,
+        description="Only products projected to run out within this many days",
+    ),
+    skip: int = 0,
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_db),
+):
+    return crud.get_stock_forecast(
+        db, horizon_days=horizon_days, skip=skip, limit=limit
+    )
+
+
 @router.get("/inventory/{inventory_id}", response_model=schemas.Inventory)
 def read_inventory(
     inventory_id: int = Path(..., title="The ID of the inventory to get"),
@@ -215,19 +250,25 @@ def read_inventory_history(
     return history
 
 
-@router.get("/inventory/low-stock", response_model=List[schemas.LowStockAlert])
-def get_low_stock_alerts(
-    threshold_override: Optional[int] = Query(
-        None, description="Override the default low stock threshold"
-    ),
+@router.post("/customers/", response_model=schemas.Customer, status_code=201)
+def create_customer(
+    customer: schemas.CustomerCreate,
+    force: bool = Query(False, description="Create even if it looks like a duplicate"),
     db: Session = Depends(get_db),
 ):
-    alerts = crud.get_low_stock_alerts(db, threshold_override=threshold_override)
-    return alerts
-
+    if customer.email and crud.get_customer_by_email(db, email=customer.email):
+        raise HTTPException(status_code=400, detail="Email already registered")
 
-@router.post("/customers/", response_model=schemas.Customer, status_code=201)
-def create_customer(customer: schemas.CustomerCreate, db: Session = Depends(get_db)):
+    if not force:
+        duplicates = crud.find_duplicate_customers(db, customer)
+        if duplicates:
+            raise HTTPException(
+                status_code=409,
+                detail={
+                    "message": "Possible duplicate customer",
+                    "duplicate_ids": [c.id for c in duplicates],
+                },
+            )
     return crud.create_customer(db=db, customer=customer)
 
 
@@ -237,6 +278,26 @@ def read_customers(skip: int = 0, limit: int = 100, db: Session = Depends(get_db
     return customers
 
 
+@router.get("/customers/search", response_model=List[schemas.Customer])
+def search_customers(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+):
+    return crud.search_customers(db, q=q, limit=limit)
+
+
+@router.get("/customers/top", response_model=List[schemas.TopCustomer])
+def read_top_customers(
+    by: str = Query("revenue", description="revenue or orders"),
+    limit: int = Query(10, ge=1, le=100),
+    db: Session = Depends(get_db),
+):
+    if by not in ("revenue", "orders"):
+        raise HTTPException(status_code=400, detail="by must be revenue or orders")
+    return crud.get_top_customers(db, by=by, limit=limit)
+
+
 @router.get("/customers/{customer_id}", response_model=schemas.Customer)
 def read_customer(
     customer_id: int = Path(..., title="The ID of the customer to get"),
@@ -248,6 +309,16 @@ def read_customer(
     return db_customer
 
 
+@router.get("/customers/{customer_id}/stats", response_model=schemas.CustomerStats)
+def read_customer_stats(
+    customer_id: int = Path(..., title="The ID of the customer"),
+    db: Session = Depends(get_db),
+):
+    if crud.get_customer(db, customer_id=customer_id) is None:
+        raise HTTPException(status_code=404, detail="Customer not found")
+    return crud.get_customer_stats(db, customer_id=customer_id)
+
+
 @router.put("/customers/{customer_id}", response_model=schemas.Customer)
 def update_customer(
     customer_id: int = Path(..., title="The ID of the customer to update"),
@@ -364,6 +435,108 @@ def get_inventory_analytics(
     return crud.get_inventory_analytics(db=db, params=params)
 
 
+@router.get("/analytics/top-products", response_model=List[schemas.TopProduct])
+def get_top_products(
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    by: str = Query("units", description="units or revenue"),
+    k: int = Query(10, ge=1, le=100),
+    platform: Optional[str] = None,
+    category_id: Optional[int] = None,
+    db: Session = Depends(get_db),
+):
+    if by not in ("units", "revenue"):
+        raise HTTPException(status_code=400, detail="by must be units or revenue")
+    end_date = end_date or date.today()
+    start_date = start_date or end_date - timedelta(days=29)
+    return crud.get_top_products(
+        db,
+        start_date=start_date,
+        end_date=end_date,
+        by=by,
+        k=k,
+        platform=platform,
+        category_id=category_id,
+    )
+
+
+@router.get(
+    "/analytics/unique-customers", response_model=schemas.UniqueCustomersResponse
+)
+def get_unique_customers(
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    group_by: str = Query("day", description="day, week, month or year"),
+    platform: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    if group_by not in ("day", "week", "month", "year"):
+        raise HTTPException(
+            status_code=400, detail="group_by must be day, week, month or year"
+        )
+    end_date = end_date or date.today()
+    start_date = start_date or end_date - timedelta(days=29)
+    return crud.get_unique_customers(
+        db,
+        start_date=start_date,
+        end_date=end_date,
+        group_by=group_by,
+        platform=platform,
+    )
+
+
+@router.get(
+    "/analytics/order-values", response_model=schemas.OrderValuePercentilesResponse
+)
+def get_order_value_percentiles(
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    group_by: str = Query("day", description="day, week, month or year"),
+    platform: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    if group_by not in ("day", "week", "month", "year"):
+        raise HTTPException(
+            status_code=400, detail="group_by must be day, week, month or year"
+        )
+    end_date = end_date or date.today()
+    start_date = start_date or end_date - timedelta(days=29)
+    return crud.get_order_value_percentiles(
+        db,
+        start_date=start_date,
+        end_date=end_date,
+        group_by=group_by,
+        platform=platform,
+    )
+
+
+@router.get("/analytics/customers/rfm", response_model=schemas.RFMSummaryResponse)
+def get_rfm_summary(db: Session = Depends(get_db)):
+    return crud.get_rfm_summary(db)
+
+
+@router.get(
+    "/analytics/customers/rfm/{segment}", response_model=List[schemas.CustomerRFM]
+)
+def get_rfm_segment(
+    segment: str = Path(..., title="champions, loyal, new, at_risk, ..."),
+    skip: int = 0,
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_db),
+):
+    return crud.get_rfm_segment(db, segment=segment, skip=skip, limit=limit)
+
+
+@router.get(
+    "/analytics/customers/cohorts", response_model=schemas.CohortRetentionResponse
+)
+def get_cohort_retention(
+    cohorts: int = Query(12, ge=1, le=120, description="Latest N monthly cohorts"),
+    db: Session = Depends(get_db),
+):
+    return crud.get_cohort_retention(db, cohorts=cohorts)
+
+
 @router.post("/analytics/revenue/compare")
 def compare_revenue(
     current_start: date,
@@ -0,0 +1,90 @@
+"""Bounded in-process cache for rarely changing rows.
+
+Entries are grouped in namespaces (``"product"``, ``"category"``, ...), each an
+LRU holding at most ``max_entries`` keys (0 disables caching). Writers
+invalidate a whole namespace; every invalidation bumps the namespace's
+generation, and a reader only stores what it loaded if the generation did not
+change meanwhile, so a lookup racing with an update cannot put the old row back
+into the cache.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+from app.core.config import settings
+from app.core.metrics import registry
+
+entity_cache_requests_total = registry.counter(
+    "entity_cache_requests_total",
+    "Entity cache lookups by namespace and result (hit or miss).",
+    ("namespace", "result"),
+)
+
+
+class EntityCache:
+    def __init__(self, max_entries: int = 10_000):
+        self.max_entries = max_entries
+        self._entries: Dict[str, "OrderedDict[Hashable, Any]"] = {}
+        self._generations: Dict[str, int] = {}
+        self._hits: Dict[str, int] = {}
+        self._misses: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def generation(self, namespace: str) -> int:
+        return self._generations.get(namespace, 0)
+
+    def get(self, namespace: str, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entries = self._entries.get(namespace)
+            value = entries.get(key) if entries is not None else None
+            if value is None:
+                self._misses[namespace] = self._misses.get(namespace, 0) + 1
+            else:
+                entries.move_to_end(key)
+                self._hits[namespace] = self._hits.get(namespace, 0) + 1
+        entity_cache_requests_total.inc((namespace, "miss" if value is None else "hit"))
+        return value
+
+    def set(self, namespace: str, key: Hashable, value: Any, generation: int) -> bool:
+        """Store ``value`` unless ``namespace`` was invalidated since ``generation``."""
+        with self._lock:
+            if self._generations.get(namespace, 0) != generation:
+                return False
+            entries = self._entries.setdefault(namespace, OrderedDict())
+            entries[key] = value
+            entries.move_to_end(key)
+            while len(entries) > self.max_entries:
+                entries.popitem(last=False)
+            return True
+
+    def invalidate(self, *namespaces: str) -> None:
+        with self._lock:
+            for namespace in namespaces:
+                self._entries.pop(namespace, None)
+                self._generations[namespace] = self._generations.get(namespace, 0) + 1
+
+    def clear(self) -> None:
+        with self._lock:
+            namespaces = set(self._entries) | set(self._generations)
+        self.invalidate(*namespaces)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            namespaces = set(self._hits) | set(self._misses) | set(self._entries)
+            result = {}
+            for namespace in sorted(namespaces):
+                hits = self._hits.get(namespace, 0)
+                misses = self._misses.get(namespace, 0)
+                result[namespace] = {
+                    "entries": len(self._entries.get(namespace, ())),
+                    "hits": hits,
+                    "misses": misses,
+                    "hit_rate": (
+                        round(hits / (hits + misses), 4) if hits + misses else None
+                    ),
+                }
+            return result
+
+
+entity_cache = EntityCache(max_entries=settings.ENTITY_CACHE_MAX_ENTRIES)
@@ -1,19 +1,90 @@
-import os
-from typing import Optional, Dict, Any
-from pydantic import BaseSettings, validator
-from dotenv import load_dotenv
+from typing import List, Optional
 
-load_dotenv()
+from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
 class Settings(BaseSettings):
+    """Application settings, read once from the environment and ``.env``."""
+
+    model_config = SettingsConfigDict(
+        env_file=".env", case_sensitive=True, extra="ignore"
+    )
+
     API_V1_STR: str = "/api"
     PROJECT_NAME: str = "E-commerce Admin Dashboard API"
     DATABASE_URL: str
-    CORS_ORIGINS: list = ["*"]
-    class Config:
-        case_sensitive = True
-        env_file = ".env"
+    # Connections opened past the pool size under load; -1 for no limit.
+    # SQLite keeps SQLAlchemy's default pool.
+    DATABASE_MAX_OVERFLOW: int = 10
+    CORS_ORIGINS: List[str] = ["*"]
+    # Run Base.metadata.create_all on startup; use Alembic migrations otherwise.
+    CREATE_TABLES_ON_STARTUP: bool = False
+
+    HEALTH_CHECK_INTERVAL_SECONDS: float = 5
+    HEALTH_MAX_LOOP_LAG_MS: float = 500
+    HEALTH_MAX_POOL_USAGE: float = 0.9
+
+    # Entries per namespace in the entity cache; 0 disables it.
+    ENTITY_CACHE_MAX_ENTRIES: int = 10_000
+    # How often each worker checks cache_versions for writes by other workers.
+    CACHE_VERSION_POLL_MS: float = 100
+
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_CALLS: int = 100
+    RATE_LIMIT_PERIOD: int = 60
+    RATE_LIMIT_BACKEND: str = "memory"
+    RATE_LIMIT_SHM_PATH: Optional[str] = None
+    RATE_LIMIT_SHM_SLOTS: int = 65536
+
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "json"
+    LOG_SAMPLE_RATE: float = 1.0
+
+    SQL_N_PLUS_ONE_THRESHOLD: int = 10
+    SLOW_QUERY_THRESHOLD_MS: float = 500
+    SLOW_QUERY_LOG_PATH: str = "logs/slow_queries.log"
+
+    ANALYTICS_BACKEND: str = "sql"
+    ANALYTICS_SNAPSHOT_QUERIES: Optional[str] = None
+    ANALYTICS_SNAPSHOT_DIR: str = "exports/parquet"
+    ANALYTICS_SNAPSHOT_REFRESH_SECONDS: float = 60
+    ANALYTICS_SNAPSHOT_MAX_AGE_SECONDS: float = 600
+    ANALYTICS_DUCKDB_PATH: str = ":memory:"
+    # Exports read rows this recent again, in case they committed late.
+    ANALYTICS_EXPORT_RESCAN_SECONDS: float = 300
+
+    # RFM and cohort tables older than this are recomputed in the background.
+    CUSTOMER_ANALYTICS_MAX_AGE_SECONDS: float = 3600
+    CUSTOMER_ANALYTICS_CHUNK_SIZE: int = 100_000
+
+    # Sales velocity is averaged over this many trailing days.
+    STOCK_FORECAST_WINDOW_DAYS: int = 28
+    STOCK_FORECAST_MAX_AGE_SECONDS: float = 900
+
+    # Reorder points: demand history, supplier lead time and target fill rate.
+    REORDER_DEMAND_WINDOW_DAYS: int = 90
+    REORDER_LEAD_TIME_DAYS: float = 7
+    REORDER_SERVICE_LEVEL: float = 0.95
+    REORDER_REVIEW_DAYS: float = 14
+    REORDER_POINTS_INTERVAL_SECONDS: float = 86400
+
+    # How often queued sales are added to the daily sketches.
+    SALES_SKETCH_MERGE_SECONDS: float = 60
+
+    # /dashboard/summary periods precomputed by a background job; keep its
+    # interval just under the TTL past which snapshots are reported stale.
+    DASHBOARD_SNAPSHOT_PERIODS: str = "7,30,90,365"
+    DASHBOARD_SNAPSHOT_INTERVAL_SECONDS: float = 270
+    DASHBOARD_SNAPSHOT_TTL_SECONDS: float = 300
+    # Older snapshots are not served; the summary is computed in the request.
+    DASHBOARD_SNAPSHOT_MAX_AGE_SECONDS: float = 1800
+
+    # Background jobs; each run is claimed by one worker across the fleet.
+    SCHEDULER_ENABLED: bool = True
+    SCHEDULER_TICK_SECONDS: float = 5
+    SCHEDULER_MAX_WORKERS: int = 2
+    # A run whose worker died is claimable again after this long.
+    SCHEDULER_LOCK_LEASE_SECONDS: float = 3600
 
 
 settings = Settings()
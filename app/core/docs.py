@@ -51,5 +51,7 @@ This API powers an admin dashboard for e-commerce managers, providing:
 API endpoints require authentication (to be implemented).
 
 ## Rate Limiting
-API requests are subject to rate limiting (to be implemented).
+API requests are rate limited per client IP (100 units per minute by default).
+Analytics and dashboard requests cost 5 units each. Requests over the limit
+receive a `429` response with a `Retry-After` header.
 """
@@ -0,0 +1,168 @@
+"""Liveness and readiness state, refreshed in the background.
+
+Probes never touch the database themselves: a daemon thread pings it every
+``HEALTH_CHECK_INTERVAL_SECONDS`` and an asyncio task measures event-loop lag,
+and the endpoints only read the cached ``HealthMonitor.readiness()``.
+
+The app is ready when the last ping succeeded and is recent, the connection
+pool is not saturated and the event loop is not lagging.
+"""
+
+import time
+import asyncio
+import logging
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+from app.core.metrics import registry
+from app.db.session import engine
+
+logger = logging.getLogger("health")
+
+db_ping_seconds = registry.gauge(
+    "db_ping_seconds", "Latency of the last background database ping."
+)
+event_loop_lag_seconds = registry.gauge(
+    "event_loop_lag_seconds", "How late the last event-loop lag probe woke up."
+)
+
+
+def pool_usage(engine: Engine, max_overflow: int) -> Dict[str, Optional[int]]:
+    """Checked-out connections against the pool's capacity, if it has one.
+
+    Pools do not expose their overflow limit, so it is passed in; it must match
+    the engine's ``max_overflow``.
+    """
+    pool = engine.pool
+    try:
+        in_use = pool.checkedout()
+        size = pool.size()
+    except AttributeError:  # NullPool, StaticPool and friends
+        return {"in_use": None, "capacity": None}
+    capacity = None if max_overflow < 0 else size + max_overflow
+    return {"in_use": in_use, "capacity": capacity}
+
+
+class HealthMonitor:
+    def __init__(
+        self,
+        engine: Engine,
+        interval: float = 5.0,
+        max_loop_lag: float = 0.5,
+        max_pool_usage: float = 0.9,
+        max_overflow: int = 10,
+    ):
+        self.engine = engine
+        self.interval = interval
+        self.max_loop_lag = max_loop_lag
+        self.max_pool_usage = max_pool_usage
+        self.max_overflow = max_overflow
+        self.started_at = time.time()
+        self.db_ok = False
+        self.db_latency: Optional[float] = None
+        self.db_error: Optional[str] = None
+        self.db_checked_at: Optional[float] = None
+        self.loop_lag = 0.0
+        self._stop = threading.Event()
+        self._pinger: Optional[threading.Thread] = None
+        self._lag_task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Start the DB pinger and, inside a running loop, the lag probe."""
+        self._stop.clear()
+        if self._pinger is None or not self._pinger.is_alive():
+            self._pinger = threading.Thread(
+                target=self._ping_loop, name="health-db-ping", daemon=True
+            )
+            self._pinger.start()
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._lag_task = loop.create_task(self._lag_loop())
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._lag_task is not None:
+            self._lag_task.cancel()
+            self._lag_task = None
+
+    def ping(self) -> None:
+        started = time.perf_counter()
+        try:
+            with self.engine.connect() as conn:
+                conn.execution_options(slow_query_log=False).execute(text("SELECT 1"))
+        except Exception as exc:
+            if self.db_ok:
+                logger.warning("database ping failed", extra={"error": str(exc)})
+            self.db_ok = False
+            self.db_error = str(exc)
+        else:
+            self.db_ok = True
+            self.db_error = None
+        self.db_latency = time.perf_counter() - started
+        self.db_checked_at = time.time()
+        db_ping_seconds.set((), self.db_latency)
+
+    def _ping_loop(self) -> None:
+        while not self._stop.is_set():
+            self.ping()
+            self._stop.wait(self.interval)
+
+    async def _lag_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        period = min(self.interval, 1.0)
+        while True:
+            expected = loop.time() + period
+            await asyncio.sleep(period)
+            self.loop_lag = max(loop.time() - expected, 0.0)
+            event_loop_lag_seconds.set((), self.loop_lag)
+
+    def liveness(self) -> Dict[str, Any]:
+        return {"status": "ok", "uptime_seconds": round(time.time() - self.started_at)}
+
+    def readiness(self) -> Dict[str, Any]:
+        now = time.time()
+        pool = pool_usage(self.engine, self.max_overflow)
+        checks = {
+            # A hung ping leaves db_checked_at behind, which also fails this.
+            "database": self.db_ok
+            and self.db_checked_at is not None
+            and now - self.db_checked_at <= 3 * self.interval,
+            "pool": pool["capacity"] is None
+            or pool["in_use"] < pool["capacity"] * self.max_pool_usage,
+            "event_loop": self.loop_lag <= self.max_loop_lag,
+        }
+        return {
+            "status": "ok" if all(checks.values()) else "unavailable",
+            "checks": checks,
+            "database": {
+                "latency_ms": (
+                    round(self.db_latency * 1000, 2)
+                    if self.db_latency is not None
+                    else None
+                ),
+                "checked_at": (
+                    datetime.fromtimestamp(self.db_checked_at, timezone.utc).isoformat()
+                    if self.db_checked_at is not None
+                    else None
+                ),
+                "error": self.db_error,
+            },
+            "pool": pool,
+            "event_loop_lag_ms": round(self.loop_lag * 1000, 2),
+        }
+
+
+health_monitor = HealthMonitor(
+    engine,
+    interval=settings.HEALTH_CHECK_INTERVAL_SECONDS,
+    max_loop_lag=settings.HEALTH_MAX_LOOP_LAG_MS / 1000,
+    max_pool_usage=settings.HEALTH_MAX_POOL_USAGE,
+    max_overflow=settings.DATABASE_MAX_OVERFLOW,
+)
@@ -0,0 +1,122 @@
+import json
+import queue
+import random
+import atexit
+import logging
+import logging.handlers
+from datetime import datetime, timezone
+from typing import Optional
+
+from app.core.config import settings
+
+# Attributes every LogRecord has; anything else was passed through ``extra``.
+_RESERVED_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional[logging.Handler] = None
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line, with any ``extra`` fields at the top level."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS and not key.startswith("_"):
+                payload[key] = value
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            payload["exc_info"] = record.exc_text
+        return json.dumps(payload, default=str)
+
+
+class SuccessSamplingFilter(logging.Filter):
+    """Keep only a ``rate`` fraction of records for 2xx responses.
+
+    Records without a ``status`` attribute, and records for any non-2xx
+    status, always pass.
+    """
+
+    def __init__(self, rate: float = 1.0):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        status = getattr(record, "status", None)
+        if status is None or not 200 <= status < 300 or self.rate >= 1.0:
+            return True
+        return random.random() < self.rate
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that leaves message formatting to the listener thread.
+
+    The stock ``prepare`` renders the message on the calling thread; here only
+    the traceback is rendered eagerly so the record does not keep frames alive.
+    Log arguments should therefore be immutable values.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def setup_logging(
+    level: Optional[str] = None,
+    log_format: Optional[str] = None,
+    sample_rate: Optional[float] = None,
+) -> None:
+    """Route all logging through a queue drained by a background thread.
+
+    Request handlers only append records to an in-memory queue; formatting and
+    writing to stdout happen on the listener thread, so a slow stdout cannot
+    stall the event loop. Safe to call more than once.
+    """
+    global _listener, _queue_handler
+    if _listener is not None:
+        return
+
+    level = level or settings.LOG_LEVEL
+    log_format = log_format or settings.LOG_FORMAT
+    if sample_rate is None:
+        sample_rate = settings.LOG_SAMPLE_RATE
+
+    stream_handler = logging.StreamHandler()
+    if log_format == "json":
+        stream_handler.setFormatter(JSONFormatter())
+    else:
+        stream_handler.setFormatter(
+            logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+        )
+
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    _queue_handler = NonBlockingQueueHandler(log_queue)
+    _queue_handler.addFilter(SuccessSamplingFilter(sample_rate))
+
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.addHandler(_queue_handler)
+
+    _listener = logging.handlers.QueueListener(
+        log_queue, stream_handler, respect_handler_level=True
+    )
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the listener thread."""
+    global _listener, _queue_handler
+    if _listener is not None:
+        logging.getLogger().removeHandler(_queue_handler)
+        _listener.stop()
+        _listener = None
+        _queue_handler = None
@@ -1,42 +1,133 @@
 import time
 import uuid
 import logging
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.types import ASGIApp
+from typing import Dict
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+from app.db.instrumentation import QueryStats, query_stats
+from app.core.metrics import (
+    http_request_duration_seconds,
+    http_requests_in_flight,
+    http_requests_total,
 )
+
 logger = logging.getLogger("api")
 
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+# Routes live as long as the app, so their ids are stable keys.
+_route_templates: Dict[int, str] = {}
+
+
+def route_template(scope: Scope) -> str:
+    """Route path template (e.g. ``/api/v1/products/{product_id}``).
+
+    Using the template rather than the raw path keeps metric label
+    cardinality bounded by the number of routes. Depending on the FastAPI
+    version ``route.path`` may omit the prefixes of enclosing routers, so the
+    prefix is recovered from the first request path the route matches and
+    cached per route; later requests are a dict lookup.
+    """
+    route = scope.get("route")
+    if route is None:
+        return UNMATCHED_ROUTE
+    template = _route_templates.get(id(route))
+    if template is not None:
+        return template
 
-class RequestLoggingMiddleware(BaseHTTPMiddleware):
+    regex = getattr(route, "path_regex", None)
+    if regex is None:
+        return getattr(route, "path", UNMATCHED_ROUTE)
+    path = scope["path"]
+    start = 0
+    while start >= 0 and not regex.match(path[start:]):
+        start = path.find("/", start + 1)
+    template = path[:start] + route.path if start > 0 else route.path
+    _route_templates[id(route)] = template
+    return template
+
+
+class RequestLoggingMiddleware:
+    """Raw ASGI middleware that tags requests and records latency metrics.
+
+    Unlike ``BaseHTTPMiddleware`` it does not wrap the response body in an
+    extra task and stream, so streaming responses pass straight through.
+    """
 
     def __init__(self, app: ASGIApp):
-        super().__init__(app)
+        self.app = app
 
-    async def dispatch(self, request: Request, call_next):
-        request_id = str(uuid.uuid4())
-        request.state.request_id = request_id
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
-        logger.info(
-            f"REQ:{request_id} - {request.method} {request.url.path} - "
-            f"Client: {request.client.host if request.client else 'Unknown'}"
-        )
-        start_time = time.time()
-        response = await call_next(request)
+        request_id = str(uuid.uuid4())
+        scope.setdefault("state", {})["request_id"] = request_id
+        template = None
 
-        process_time = time.time() - start_time
-        process_time_ms = round(process_time * 1000)
+        def request_route() -> str:
+            # Resolved once per request, as soon as routing has matched.
+            nonlocal template
+            if template is None:
+                if "route" not in scope:
+                    return UNMATCHED_ROUTE
+                template = route_template(scope)
+            return template
 
-        logger.info(
-            f"RES:{request_id} - Status: {response.status_code} - "
-            f"Time: {process_time_ms}ms"
-        )
+        stats = QueryStats(request_route)
+        stats_token = query_stats.set(stats)
+        start_time = time.perf_counter()
+        status_code = 500
 
-        response.headers["X-Process-Time"] = str(process_time_ms)
-        response.headers["X-Request-ID"] = request_id
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                process_time = (time.perf_counter() - start_time) * 1000
+                headers = list(message.get("headers", []))
+                headers.append((b"x-process-time", b"%d" % round(process_time)))
+                headers.append((b"x-request-id", request_id.encode()))
+                headers.append((b"x-db-queries", b"%d" % stats.count))
+                headers.append(
+                    (
+                        b"server-timing",
+                        b"db;dur=%.2f, app;dur=%.2f"
+                        % (stats.db_time * 1000, process_time),
+                    )
+                )
+                message["headers"] = headers
+            await send(message)
 
-        return response
+        http_requests_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - start_time
+            query_stats.reset(stats_token)
+            http_requests_in_flight.dec()
+            route = request_route()
+            method = scope["method"]
+            http_requests_total.inc((method, route, status_code))
+            http_request_duration_seconds.observe((method, route), duration)
+            level = (
+                logging.ERROR
+                if status_code >= 500
+                else logging.WARNING if status_code >= 400 else logging.INFO
+            )
+            if logger.isEnabledFor(level):
+                logger.log(
+                    level,
+                    "request completed",
+                    extra={
+                        "request_id": request_id,
+                        "method": method,
+                        "path": scope["path"],
+                        "route": route,
+                        "status": status_code,
+                        "duration_ms": round(duration * 1000, 2),
+                        "db_queries": stats.count,
+                        "db_time_ms": round(stats.db_time * 1000, 2),
+                    },
+                )
@@ -1,46 +1,290 @@
+import os
+import math
+import mmap
 import time
-from typing import Dict, List, Callable
+import struct
+import hashlib
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, Callable, List, Optional, Tuple
 from fastapi import Request, HTTPException, Depends
 
+from app.core.config import settings
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+
+class RateLimitBackend(ABC):
+    """Storage for GCRA state, one theoretical arrival time (TAT) per key.
+
+    ``update`` must perform the whole read-compare-write step atomically for
+    the key. A Redis-compatible backend can implement it as a small Lua script
+    that runs the same arithmetic server-side.
+    """
+
+    @abstractmethod
+    def update(self, key: str, increment: float, period: float) -> Tuple[bool, float]:
+        """Spend ``increment`` seconds of ``key``'s budget of ``period``."""
+
+    @abstractmethod
+    def reset(self) -> None:
+        """Forget every key."""
+
+
+def _gcra(tat: Optional[float], now: float, increment: float, period: float):
+    """Return ``(new_tat, retry_after)``; ``new_tat`` is None when rejected."""
+    if tat is None or tat < now:
+        tat = now
+    new_tat = tat + increment
+    allow_at = new_tat - period
+    if allow_at > now:
+        return None, allow_at - now
+    return new_tat, 0.0
+
+
+class MemoryBackend(RateLimitBackend):
+    """Per-process backend; keys are evicted in LRU order past ``max_keys``."""
+
+    def __init__(
+        self, max_keys: int = 100_000, clock: Callable[[], float] = time.monotonic
+    ):
+        self.max_keys = max_keys
+        self.clock = clock
+        self.cache: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def update(self, key: str, increment: float, period: float) -> Tuple[bool, float]:
+        with self._lock:
+            new_tat, retry_after = _gcra(
+                self.cache.get(key), self.clock(), increment, period
+            )
+            if new_tat is None:
+                return False, retry_after
+
+            self.cache[key] = new_tat
+            self.cache.move_to_end(key)
+            if len(self.cache) > self.max_keys:
+                self.cache.popitem(last=False)
+            return True, 0.0
+
+    def reset(self) -> None:
+        with self._lock:
+            self.cache.clear()
+
+
+class SharedMemoryBackend(RateLimitBackend):
+    """Backend shared by every worker process on a host.
+
+    State lives in a memory-mapped file laid out as a table of 16-byte slots
+    (8-byte key hash, 8-byte TAT). A key hashes to a bucket of
+    ``bucket_size`` consecutive slots; when the bucket is full the slot with
+    the oldest TAT is reused. Buckets are grouped into ``stripes`` that are
+    locked with a byte-range ``fcntl`` lock (across processes) plus a thread
+    lock (within a process), so unrelated keys rarely contend.
+
+    Wall-clock time is used because the file outlives individual processes.
+    """
+
+    SLOT = struct.Struct("<Qd")
+
+    def __init__(
+        self,
+        path: str,
+        slots: int = 65536,
+        bucket_size: int = 8,
+        stripes: int = 64,
+        clock: Callable[[], float] = time.time,
+    ):
+        if fcntl is None:
+            raise RuntimeError("SharedMemoryBackend requires fcntl (POSIX only)")
+        if slots % bucket_size:
+            raise ValueError("slots must be a multiple of bucket_size")
+
+        self.path = path
+        self.slots = slots
+        self.bucket_size = bucket_size
+        self.buckets = slots // bucket_size
+        self.stripes = min(stripes, self.buckets)
+        self.clock = clock
+        self._thread_locks: List[threading.Lock] = [
+            threading.Lock() for _ in range(self.stripes)
+        ]
+
+        size = slots * self.SLOT.size
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        fcntl.lockf(self._fd, fcntl.LOCK_EX)
+        try:
+            if os.fstat(self._fd).st_size < size:
+                os.ftruncate(self._fd, size)
+        finally:
+            fcntl.lockf(self._fd, fcntl.LOCK_UN)
+        self._map = mmap.mmap(self._fd, size)
+
+    @staticmethod
+    def key_hash(key: str) -> int:
+        digest = hashlib.blake2b(key.encode(), digest_size=8).digest()
+        return int.from_bytes(digest, "little") or 1
+
+    def update(self, key: str, increment: float, period: float) -> Tuple[bool, float]:
+        key_hash = self.key_hash(key)
+        bucket = key_hash % self.buckets
+        stripe = bucket % self.stripes
+        base = bucket * self.bucket_size * self.SLOT.size
+
+        with self._thread_locks[stripe]:
+            fcntl.lockf(self._fd, fcntl.LOCK_EX, 1, stripe)
+            try:
+                now = self.clock()
+                offset, tat = self._find_slot(base, key_hash)
+                new_tat, retry_after = _gcra(tat, now, increment, period)
+                if new_tat is None:
+                    return False, retry_after
+                self.SLOT.pack_into(self._map, offset, key_hash, new_tat)
+                return True, 0.0
+            finally:
+                fcntl.lockf(self._fd, fcntl.LOCK_UN, 1, stripe)
+
+    def _find_slot(self, base: int, key_hash: int) -> Tuple[int, Optional[float]]:
+        # Prefer the key's own slot, then an empty one, then the oldest TAT.
+        victim, victim_tat = base, float("inf")
+        for i in range(self.bucket_size):
+            offset = base + i * self.SLOT.size
+            slot_hash, slot_tat = self.SLOT.unpack_from(self._map, offset)
+            if slot_hash == key_hash:
+                return offset, slot_tat
+            if slot_hash == 0:
+                slot_tat = float("-inf")
+            if slot_tat < victim_tat:
+                victim, victim_tat = offset, slot_tat
+        return victim, None
+
+    def reset(self) -> None:
+        for stripe in range(self.stripes):
+            with self._thread_locks[stripe]:
+                fcntl.lockf(self._fd, fcntl.LOCK_EX, 1, stripe)
+                try:
+                    for bucket in range(stripe, self.buckets, self.stripes):
+                        base = bucket * self.bucket_size * self.SLOT.size
+                        end = base + self.bucket_size * self.SLOT.size
+                        self._map[base:end] = bytes(end - base)
+                finally:
+                    fcntl.lockf(self._fd, fcntl.LOCK_UN, 1, stripe)
+
+    def close(self) -> None:
+        self._map.close()
+        os.close(self._fd)
+
 
 class RateLimiter:
+    """GCRA (generic cell rate algorithm) limiter.
 
-    def __init__(self, calls: int, period: int):
+    Each key stores a single float, its theoretical arrival time (TAT), so a
+    check is O(1) regardless of how many calls the key has made. Where that
+    float lives is up to the backend; the default keeps it in process memory.
+    """
+
+    def __init__(
+        self,
+        calls: int,
+        period: int,
+        backend: Optional[RateLimitBackend] = None,
+    ):
         self.calls = calls
         self.period = period
-        self.cache: Dict[str, List[float]] = {}
+        self.emission_interval = period / calls
+        self.backend = backend if backend is not None else MemoryBackend()
 
-    def is_allowed(self, key: str) -> bool:
-        current_time = time.time()
-        if key not in self.cache:
-            self.cache[key] = []
+    def acquire(self, key: str, cost: int = 1) -> Tuple[bool, float]:
+        """Try to spend ``cost`` units for ``key``.
 
-        self.cache[key] = [
-            timestamp
-            for timestamp in self.cache[key]
-            if timestamp > current_time - self.period
-        ]
+        Returns ``(allowed, retry_after)`` where ``retry_after`` is the number
+        of seconds until the request would be admitted (0 when allowed). A
+        cost above ``calls`` can never be admitted: it is rejected without
+        touching the key, with ``retry_after`` infinite.
+        """
+        if cost > self.calls:
+            return False, math.inf
+        return self.backend.update(key, self.emission_interval * cost, self.period)
 
-        if len(self.cache[key]) < self.calls:
-            self.cache[key].append(current_time)
-            return True
+    def is_allowed(self, key: str, cost: int = 1) -> bool:
+        return self.acquire(key, cost)[0]
 
-        return False
+    def reset(self) -> None:
+        self.backend.reset()
 
 
-default_limiter = RateLimiter(calls=100, period=60)
+def create_backend() -> RateLimitBackend:
+    backend = settings.RATE_LIMIT_BACKEND.lower()
+    if backend == "shared":
+        shm_dir = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+        return SharedMemoryBackend(
+            path=settings.RATE_LIMIT_SHM_PATH
+            or os.path.join(shm_dir, "ecommerce-rate-limit"),
+            slots=settings.RATE_LIMIT_SHM_SLOTS,
+        )
+    if backend == "memory":
+        return MemoryBackend()
+    raise ValueError(f"Unknown RATE_LIMIT_BACKEND: {backend}")
+
+
+RATE_LIMIT_ENABLED = settings.RATE_LIMIT_ENABLED
+
+# Cost charged per request, matched against the route path. Analytics and
+# dashboard routes aggregate over whole tables so they use up the quota faster.
+ROUTE_COSTS: Dict[str, int] = {
+    "/analytics/": 5,
+    "/dashboard/": 5,
+}
+
+default_limiter = RateLimiter(
+    calls=settings.RATE_LIMIT_CALLS,
+    period=settings.RATE_LIMIT_PERIOD,
+    backend=create_backend(),
+)
+
+
+def client_host(request: Request) -> str:
+    return request.client.host if request.client else "unknown"
+
+
+def route_cost(request: Request) -> int:
+    route = request.scope.get("route")
+    path = route.path if route is not None else request.url.path
+    for prefix, cost in ROUTE_COSTS.items():
+        if prefix in path:
+            return cost
+    return 1
 
 
 def rate_limit(
     limiter: RateLimiter = default_limiter,
-    key_func: Callable[[Request], str] = lambda request: request.client.host,
+    key_func: Callable[[Request], str] = client_host,
+    cost: Optional[int] = None,
 ):
 
     def dependency(request: Request):
+        if not RATE_LIMIT_ENABLED:
+            return
         key = key_func(request)
-        if not limiter.is_allowed(key):
+        allowed, retry_after = limiter.acquire(
+            key, cost if cost is not None else route_cost(request)
+        )
+        if not allowed and math.isinf(retry_after):
+            # Waiting would not help, so there is no Retry-After.
+            raise HTTPException(
+                status_code=429,
+                detail="Request cost exceeds the rate limit; it can never be allowed.",
+            )
+        if not allowed:
             raise HTTPException(
-                status_code=429, detail="Rate limit exceeded. Please try again later."
+                status_code=429,
+                detail="Rate limit exceeded. Please try again later.",
+                headers={"Retry-After": str(int(retry_after) + 1)},
             )
 
     return Depends(dependency)
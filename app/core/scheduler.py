@@ -0,0 +1,483 @@
+"""Interval jobs run in the background, once per interval across the fleet.
+
+Every worker runs a ``Scheduler``, but each run of a job is claimed first in
+the ``scheduled_jobs`` table: a worker may start a job only by moving the row's
+lease (``locked_until``) forward with a conditional ``UPDATE`` while the job is
+due and unleased. Exactly one worker wins; the others see the new
+``next_run_at`` and wait for it. On MySQL the claim is also guarded by
+``GET_LOCK``, held on a dedicated connection for the length of the run. The
+server releases it when that connection dies, and a worker that then gets the
+lock may take over an unexpired lease, so a worker that dies mid-run frees the
+job at once instead of when the lease expires. Other databases rely on the
+lease alone.
+
+Jobs run on a small thread pool, not a process pool: they share this process's
+engine and caches (a Core write must invalidate the local ``entity_cache``).
+Runs, failures and durations are exported as Prometheus metrics, and the table
+keeps each job's last run, duration and error for ``/health/jobs``.
+
+Worker clocks are assumed to agree to well within a job's interval.
+"""
+
+import os
+import time
+import uuid
+import socket
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import insert, or_, select, text, update
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import IntegrityError
+
+from app.core.config import settings
+from app.core.metrics import registry
+from app.db.session import engine
+from app.models.models import ScheduledJob
+
+logger = logging.getLogger("scheduler")
+
+DASHBOARD_SNAPSHOTS_JOB = "dashboard_snapshots"
+
+job_runs_total = registry.counter(
+    "scheduler_job_runs_total",
+    "Scheduled job runs started by this worker, by job and outcome.",
+    ("job", "status"),
+)
+job_duration_seconds = registry.histogram(
+    "scheduler_job_duration_seconds",
+    "Duration of scheduled job runs in seconds.",
+    ("job",),
+    buckets=(0.1, 0.5, 1, 5, 15, 60, 300, 900, 3600),
+)
+job_last_success_timestamp = registry.gauge(
+    "scheduler_job_last_success_timestamp_seconds",
+    "Unix time at which this worker last finished the job successfully.",
+    ("job",),
+)
+
+
+class Job:
+    def __init__(self, name: str, func: Callable[[], Any], interval: float):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.running = False
+
+
+class JobLock:
+    """Claims runs of a job in ``scheduled_jobs`` for one worker at a time."""
+
+    def __init__(
+        self,
+        engine: Engine,
+        owner: str,
+        lease_seconds: float,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.engine = engine
+        self.owner = owner
+        self.lease_seconds = lease_seconds
+        self.clock = clock
+
+    def now(self) -> datetime:
+        return datetime.fromtimestamp(self.clock(), timezone.utc)
+
+    def ensure_row(self, name: str, first_run_at: datetime) -> None:
+        with self.engine.connect() as conn:
+            exists = conn.execute(
+                select(ScheduledJob.name).where(ScheduledJob.name == name)
+            ).first()
+        if exists:
+            return
+        try:
+            with self.engine.begin() as conn:
+                conn.execute(
+                    insert(ScheduledJob).values(name=name, next_run_at=first_run_at)
+                )
+        except IntegrityError:
+            pass  # another worker created it
+
+    @property
+    def lease_only(self) -> bool:
+        """True when an unexpired lease is the only sign of a live run."""
+        return self.engine.dialect.name != "mysql"
+
+    def acquire(self, name: str) -> Optional[Connection]:
+        """Claim the due run of ``name``; returns the connection holding it."""
+        conn = self.engine.connect()
+        try:
+            if not self._lock(conn, name):
+                conn.close()
+                return None
+            now = self.now()
+            claimable = [ScheduledJob.name == name, ScheduledJob.next_run_at <= now]
+            if self.lease_only:
+                claimable.append(
+                    or_(
+                        ScheduledJob.locked_until.is_(None),
+                        ScheduledJob.locked_until < now,
+                    )
+                )
+            # With GET_LOCK held, a lease left behind is from a dead worker.
+            with conn.begin():
+                claimed = conn.execute(
+                    update(ScheduledJob)
+                    .where(*claimable)
+                    .values(
+                        owner=self.owner,
+                        locked_until=now + timedelta(seconds=self.lease_seconds),
+                    )
+                ).rowcount
+            if claimed:
+                return conn
+            self._unlock(conn, name)
+            conn.close()
+            return None
+        except Exception:
+            conn.close()
+            raise
+
+    def release(
+        self,
+        conn: Connection,
+        name: str,
+        started_at: datetime,
+        interval: float,
+        error: Optional[str],
+    ) -> None:
+        """Record the run and schedule the next one an interval after it started."""
+        try:
+            finished_at = self.now()
+            with conn.begin():
+                conn.execute(
+                    update(ScheduledJob)
+                    .where(ScheduledJob.name == name, ScheduledJob.owner == self.owner)
+                    .values(
+                        locked_until=None,
+                        next_run_at=started_at + timedelta(seconds=interval),
+                        last_started_at=started_at,
+                        last_duration_seconds=(
+                            finished_at - started_at
+                        ).total_seconds(),
+                        last_error=error[:500] if error else None,
+                    )
+                )
+            self._unlock(conn, name)
+        finally:
+            conn.close()
+
+    def abandon(self, conn: Connection, name: str) -> None:
+        """Give up a claimed run that never started; it stays due."""
+        try:
+            with conn.begin():
+                conn.execute(
+                    update(ScheduledJob)
+                    .where(ScheduledJob.name == name, ScheduledJob.owner == self.owner)
+                    .values(locked_until=None)
+                )
+            self._unlock(conn, name)
+        finally:
+            conn.close()
+
+    def _lock(self, conn: Connection, name: str) -> bool:
+        if conn.dialect.name != "mysql":
+            return True
+        key = {"key": f"job:{name}"}
+        return bool(conn.execute(text("SELECT GET_LOCK(:key, 0)"), key).scalar())
+
+    def _unlock(self, conn: Connection, name: str) -> None:
+        if conn.dialect.name == "mysql":
+            conn.execute(text("SELECT RELEASE_LOCK(:key)"), {"key": f"job:{name}"})
+
+
+class Scheduler:
+    def __init__(
+        self,
+        engine: Engine,
+        tick: float = 5.0,
+        max_workers: int = 2,
+        lease_seconds: float = 3600,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.engine = engine
+        self.tick = tick
+        self.max_workers = max_workers
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.lock = JobLock(engine, self.owner, lease_seconds, clock)
+        self.jobs: Dict[str, Job] = {}
+        self._first_runs: Dict[str, datetime] = {}
+        self._rows_ready = False
+        self._executor: Optional[ThreadPoolExecutor] = None
+        # Runs submitted to the pool and not yet finished, with their claims.
+        self._submitted: Dict[Future, Tuple[Job, Connection]] = {}
+        self._submitted_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def register(
+        self,
+        name: str,
+        interval: float,
+        func: Callable[[], Any],
+        delay: Optional[float] = None,
+    ) -> Job:
+        """Run ``func`` every ``interval`` seconds, first after ``delay``.
+
+        ``delay`` defaults to the interval and only applies the first time the
+        job is registered anywhere in the fleet.
+        """
+        job = self.jobs[name] = Job(name, func, interval)
+        first_run = self.lock.now() + timedelta(
+            seconds=interval if delay is None else delay
+        )
+        self._first_runs[name] = first_run
+        self._rows_ready = False
+        return job
+
+    def ensure_rows(self) -> None:
+        for name, first_run_at in self._first_runs.items():
+            self.lock.ensure_row(name, first_run_at)
+        self._rows_ready = True
+
+    def run_soon(self, name: str) -> None:
+        """Make ``name`` due now; the run is still claimed by one worker."""
+        now = self.lock.now()
+        with self.engine.begin() as conn:
+            conn.execute(
+                update(ScheduledJob)
+                .where(ScheduledJob.name == name, ScheduledJob.next_run_at > now)
+                .values(next_run_at=now)
+            )
+
+    def due(self) -> List[str]:
+        now = self.lock.now()
+        with self.engine.connect() as conn:
+            rows = conn.execute(
+                select(
+                    ScheduledJob.name,
+                    ScheduledJob.next_run_at,
+                    ScheduledJob.locked_until,
+                ).where(ScheduledJob.name.in_(self.jobs))
+            ).all()
+        return [
+            name
+            for name, next_run_at, locked_until in rows
+            if _aware(next_run_at) <= now
+            and (
+                not self.lock.lease_only
+                or locked_until is None
+                or _aware(locked_until) < now
+            )
+            and not self.jobs[name].running
+        ]
+
+    def run_pending(self) -> List[str]:
+        """Start every due job this worker can claim; returns their names.
+
+        Jobs run on the pool once ``start`` has been called, inline otherwise.
+        """
+        if not self._rows_ready:
+            self.ensure_rows()
+        started = []
+        executor = self._executor
+        for name in self.due():
+            if executor is not None and self._stop.is_set():
+                break
+            conn = self.lock.acquire(name)
+            if conn is None:
+                continue
+            job = self.jobs[name]
+            job.running = True
+            if executor is None:
+                started.append(name)
+                self._execute(job, conn)
+                continue
+            with self._submitted_lock:
+                try:
+                    future = executor.submit(self._execute, job, conn)
+                except RuntimeError:  # the pool was shut down by stop()
+                    job.running = False
+                    self.lock.abandon(conn, name)
+                    break
+                self._submitted[future] = (job, conn)
+            future.add_done_callback(self._forget)
+            started.append(name)
+        return started
+
+    def _forget(self, future: Future) -> None:
+        if future.cancelled():
+            return  # stop() gives up the claim
+        with self._submitted_lock:
+            self._submitted.pop(future, None)
+
+    def _execute(self, job: Job, conn: Connection) -> None:
+        started_at = self.lock.now()
+        started = time.perf_counter()
+        error = None
+        try:
+            job.func()
+        except Exception as exc:
+            logger.exception("scheduled job failed", extra={"job": job.name})
+            error = f"{type(exc).__name__}: {exc}"
+        duration = time.perf_counter() - started
+        job_runs_total.inc((job.name, "failure" if error else "success"))
+        job_duration_seconds.observe((job.name,), duration)
+        if error is None:
+            job_last_success_timestamp.set((job.name,), time.time())
+        try:
+            self.lock.release(conn, job.name, started_at, job.interval, error)
+        except Exception:
+            logger.exception("could not release job", extra={"job": job.name})
+        finally:
+            job.running = False
+
+    def status(self) -> List[Dict[str, Any]]:
+        """Fleet-wide state of every registered job, from ``scheduled_jobs``."""
+        with self.engine.connect() as conn:
+            rows = conn.execute(
+                select(ScheduledJob)
+                .where(ScheduledJob.name.in_(self.jobs))
+                .order_by(ScheduledJob.name)
+            ).all()
+        return [
+            {
+                "name": row.name,
+                "interval_seconds": self.jobs[row.name].interval,
+                "running": row.locked_until is not None,
+                "owner": row.owner,
+                "next_run_at": row.next_run_at,
+                "last_started_at": row.last_started_at,
+                "last_duration_seconds": row.last_duration_seconds,
+                "last_error": row.last_error,
+            }
+            for row in rows
+        ]
+
+    def start(self) -> None:
+        if not self.jobs or (self._thread is not None and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="scheduled-job"
+        )
+        self._thread = threading.Thread(target=self._run, name="scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._executor is None:
+            return
+        with self._submitted_lock:
+            # Running jobs finish on their own; their leases are released then.
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            cancelled = [
+                (future, claim)
+                for future, claim in self._submitted.items()
+                if future.cancelled()
+            ]
+            for future, _ in cancelled:
+                del self._submitted[future]
+        for _, (job, conn) in cancelled:
+            job.running = False
+            try:
+                self.lock.abandon(conn, job.name)
+            except Exception:
+                logger.exception("could not abandon job", extra={"job": job.name})
+
+    def _run(self) -> None:
+        failing = False
+        while not self._stop.is_set():
+            try:
+                self.run_pending()
+                failing = False
+            except Exception:
+                if not failing:
+                    logger.exception("scheduler tick failed")
+                failing = True
+            self._stop.wait(self.tick)
+
+
+def _aware(value: datetime) -> datetime:
+    # SQLite returns naive datetimes; they are stored in UTC.
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def _refresh_customer_analytics() -> None:
+    from app.analytics.customers import customer_analytics
+
+    customer_analytics.refresh()
+
+
+def _refresh_stock_forecasts() -> None:
+    from app.analytics.inventory import stock_forecasts
+
+    stock_forecasts.refresh()
+
+
+def _recompute_reorder_points() -> None:
+    from app.analytics.inventory import recompute_reorder_points
+
+    recompute_reorder_points(
+        engine,
+        window_days=settings.REORDER_DEMAND_WINDOW_DAYS,
+        lead_time_days=settings.REORDER_LEAD_TIME_DAYS,
+        service_level=settings.REORDER_SERVICE_LEVEL,
+        review_days=settings.REORDER_REVIEW_DAYS,
+    )
+
+
+def _merge_pending_sketches() -> None:
+    from app.crud.crud import merge_pending_sketches
+
+    merge_pending_sketches(engine)
+
+
+def _refresh_dashboard_snapshots() -> None:
+    from app.analytics.dashboard import dashboard_snapshots
+
+    dashboard_snapshots.refresh()
+
+
+def register_default_jobs(scheduler: "Scheduler") -> None:
+    scheduler.register(
+        "customer_analytics",
+        settings.CUSTOMER_ANALYTICS_MAX_AGE_SECONDS,
+        _refresh_customer_analytics,
+    )
+    scheduler.register(
+        "stock_forecasts",
+        settings.STOCK_FORECAST_MAX_AGE_SECONDS,
+        _refresh_stock_forecasts,
+    )
+    scheduler.register(
+        "reorder_points",
+        settings.REORDER_POINTS_INTERVAL_SECONDS,
+        _recompute_reorder_points,
+    )
+    scheduler.register(
+        "sales_sketches",
+        settings.SALES_SKETCH_MERGE_SECONDS,
+        _merge_pending_sketches,
+    )
+    scheduler.register(
+        DASHBOARD_SNAPSHOTS_JOB,
+        settings.DASHBOARD_SNAPSHOT_INTERVAL_SECONDS,
+        _refresh_dashboard_snapshots,
+        delay=0,
+    )
+
+
+scheduler = Scheduler(
+    engine,
+    tick=settings.SCHEDULER_TICK_SECONDS,
+    max_workers=settings.SCHEDULER_MAX_WORKERS,
+    lease_seconds=settings.SCHEDULER_LOCK_LEASE_SECONDS,
+)
@@ -1,9 +1,12 @@
 from sqlalchemy.orm import Session
-from typing import List, Optional, Dict, Any, Union, Tuple
+import heapq
+import math
+from typing import TYPE_CHECKING, List, Optional, Dict, Any, Union, Tuple
 from datetime import datetime, date, timedelta
-from sqlalchemy import func, desc, and_, or_, extract
+from sqlalchemy import func, desc, and_, or_, extract, case, insert, select, update
 from sqlalchemy.sql import label
-import pandas as pd
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import joinedload, make_transient_to_detached
 
 from app.models.models import (
     Category,
@@ -13,8 +16,58 @@ from app.models.models import (
     Sale,
     SaleItem,
     Customer,
+    CustomerStats,
+    CustomerRFM,
+    CohortRetention,
+    ProductDailySales,
+    DailySalesRollup,
+    PendingSaleSketch,
+    StockForecast,
 )
 from app.schemas import schemas
+from app.core.cache import entity_cache
+from app.core.config import settings
+from app.db.cache_versions import track_cache_versions
+from app.db.search import (
+    fulltext_matches,
+    normalize_email,
+    normalize_name,
+    normalize_phone,
+)
+from app.analytics.snapshot import snapshot_backend
+from app.analytics.sketches import HLL_STANDARD_ERROR, HyperLogLog, TDigest
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Writes bump cache_versions and invalidate entity_cache when they commit.
+track_cache_versions()
+
+
+def _cached_lookup(db: Session, model, namespace: str, key, query):
+    """Read-through lookup of one row in ``entity_cache``.
+
+    The cache holds column values, never ORM instances: a hit rebuilds the
+    instance and merges it into ``db`` without a query, so relationships still
+    lazy-load through the caller's session. Missing rows are not cached.
+    """
+    values = entity_cache.get(namespace, key)
+    if values is not None:
+        instance = model(**values)
+        make_transient_to_detached(instance)
+        return db.merge(instance, load=False)
+
+    generation = entity_cache.generation(namespace)
+    instance = query.first()
+    if instance is not None:
+        values = {c.key: getattr(instance, c.key) for c in model.__table__.columns}
+        entity_cache.set(namespace, key, values, generation)
+    return instance
+
+
+def _get_for_update(db: Session, model, id: int):
+    # Writes always start from the current row, never from cached values.
+    return db.get(model, id, populate_existing=True)
 
 
 def create_category(db: Session, category: schemas.CategoryCreate) -> Category:
@@ -26,11 +79,23 @@ def create_category(db: Session, category: schemas.CategoryCreate) -> Category:
 
 
 def get_category(db: Session, category_id: int) -> Optional[Category]:
-    return db.query(Category).filter(Category.id == category_id).first()
+    return _cached_lookup(
+        db,
+        Category,
+        "category",
+        ("id", category_id),
+        db.query(Category).filter(Category.id == category_id),
+    )
 
 
 def get_category_by_name(db: Session, name: str) -> Optional[Category]:
-    return db.query(Category).filter(Category.name == name).first()
+    return _cached_lookup(
+        db,
+        Category,
+        "category",
+        ("name", name),
+        db.query(Category).filter(Category.name == name),
+    )
 
 
 def get_categories(db: Session, skip: int = 0, limit: int = 100) -> List[Category]:
@@ -40,7 +105,7 @@ def get_categories(db: Session, skip: int = 0, limit: int = 100) -> List[Categor
 def update_category(
     db: Session, category_id: int, category: schemas.CategoryUpdate
 ) -> Optional[Category]:
-    db_category = get_category(db, category_id)
+    db_category = _get_for_update(db, Category, category_id)
     if db_category:
         update_data = category.dict(exclude_unset=True)
         for field, value in update_data.items():
@@ -51,7 +116,7 @@ def update_category(
 
 
 def delete_category(db: Session, category_id: int) -> bool:
-    db_category = get_category(db, category_id)
+    db_category = _get_for_update(db, Category, category_id)
     if db_category:
         db.delete(db_category)
         db.commit()
@@ -68,11 +133,23 @@ def create_product(db: Session, product: schemas.ProductCreate) -> Product:
 
 
 def get_product(db: Session, product_id: int) -> Optional[Product]:
-    return db.query(Product).filter(Product.id == product_id).first()
+    return _cached_lookup(
+        db,
+        Product,
+        "product",
+        ("id", product_id),
+        db.query(Product).filter(Product.id == product_id),
+    )
 
 
 def get_product_by_sku(db: Session, sku: str) -> Optional[Product]:
-    return db.query(Product).filter(Product.sku == sku).first()
+    return _cached_lookup(
+        db,
+        Product,
+        "product",
+        ("sku", sku),
+        db.query(Product).filter(Product.sku == sku),
+    )
 
 
 def get_products(
@@ -84,10 +161,45 @@ def get_products(
     return query.offset(skip).limit(limit).all()
 
 
+def _prefix_range(column, prefix: str):
+    # A range instead of LIKE so every backend can use the column's index.
+    return and_(column >= prefix, column < prefix[:-1] + chr(ord(prefix[-1]) + 1))
+
+
+def search_products(db: Session, q: str, limit: int = 20) -> List[Product]:
+    """SKU prefix matches in SKU order, then full-text matches by relevance."""
+    q = q.strip()
+    if not q:
+        return []
+    ids = [
+        product_id
+        for (product_id,) in db.query(Product.id)
+        .filter(_prefix_range(Product.sku, q))
+        .order_by(Product.sku)
+        .limit(limit)
+    ]
+    if len(ids) < limit:
+        seen = set(ids)
+        for product_id, _ in fulltext_matches(db, q, limit + len(ids)):
+            if product_id not in seen:
+                ids.append(product_id)
+                seen.add(product_id)
+        ids = ids[:limit]
+    if not ids:
+        return []
+    products = {
+        product.id: product
+        for product in db.query(Product)
+        .options(joinedload(Product.category))
+        .filter(Product.id.in_(ids))
+    }
+    return [products[product_id] for product_id in ids if product_id in products]
+
+
 def update_product(
     db: Session, product_id: int, product: schemas.ProductUpdate
 ) -> Optional[Product]:
-    db_product = get_product(db, product_id)
+    db_product = _get_for_update(db, Product, product_id)
     if db_product:
         update_data = product.dict(exclude_unset=True)
         for field, value in update_data.items():
@@ -98,7 +210,7 @@ def update_product(
 
 
 def delete_product(db: Session, product_id: int) -> bool:
-    db_product = get_product(db, product_id)
+    db_product = _get_for_update(db, Product, product_id)
     if db_product:
         db.delete(db_product)
         db.commit()
@@ -146,7 +258,8 @@ def update_inventory(
     inventory_update: schemas.InventoryUpdate,
     change_reason: Optional[str] = None,
 ) -> Optional[Inventory]:
-    db_inventory = get_inventory(db, inventory_id)
+    # Served from the identity map when create_sale has just loaded the row.
+    db_inventory = db.get(Inventory, inventory_id)
 
     if db_inventory:
         update_data = inventory_update.dict(exclude_unset=True)
@@ -187,6 +300,15 @@ def get_inventory_history(
     )
 
 
+def _suggested_order(
+    quantity: int, threshold: int, reorder_quantity: Optional[int]
+) -> Optional[int]:
+    # Enough to get back to the reorder point plus one review period's demand.
+    if reorder_quantity is None:
+        return None
+    return max(threshold + reorder_quantity - quantity, 0)
+
+
 def get_low_stock_alerts(
     db: Session, threshold_override: Optional[int] = None
 ) -> List[Dict[str, Any]]:
@@ -195,6 +317,7 @@ def get_low_stock_alerts(
         Product.name.label("product_name"),
         Inventory.quantity.label("current_quantity"),
         Inventory.low_stock_threshold.label("threshold"),
+        Inventory.reorder_quantity,
     ).join(Inventory, Product.id == Inventory.product_id)
 
     if threshold_override:
@@ -209,6 +332,9 @@ def get_low_stock_alerts(
             "product_name": r.product_name,
             "current_quantity": r.current_quantity,
             "threshold": r.threshold,
+            "suggested_order_quantity": _suggested_order(
+                r.current_quantity, r.threshold, r.reorder_quantity
+            ),
         }
         for r in results
     ]
@@ -217,13 +343,20 @@ def get_low_stock_alerts(
 def create_customer(db: Session, customer: schemas.CustomerCreate) -> Customer:
     db_customer = Customer(**customer.dict())
     db.add(db_customer)
+    db.add(CustomerStats(customer=db_customer, order_count=0, total_revenue=0))
     db.commit()
     db.refresh(db_customer)
     return db_customer
 
 
 def get_customer(db: Session, customer_id: int) -> Optional[Customer]:
-    return db.query(Customer).filter(Customer.id == customer_id).first()
+    return _cached_lookup(
+        db,
+        Customer,
+        "customer",
+        ("id", customer_id),
+        db.query(Customer).filter(Customer.id == customer_id),
+    )
 
 
 def get_customer_by_email(db: Session, email: str) -> Optional[Customer]:
@@ -234,10 +367,58 @@ def get_customers(db: Session, skip: int = 0, limit: int = 100) -> List[Customer
     return db.query(Customer).offset(skip).limit(limit).all()
 
 
+def search_customers(db: Session, q: str, limit: int = 20) -> List[Customer]:
+    """Customers whose email, phone digits or name start with ``q``.
+
+    Queries without letters search phones, queries with "@" search emails and
+    anything else searches names and emails; each is a prefix scan of an index.
+    """
+    searches = []
+    if "@" in q:
+        searches.append((Customer.email_normalized, normalize_email(q)))
+    elif not any(c.isalpha() for c in q):
+        searches.append((Customer.phone_digits, normalize_phone(q)))
+    else:
+        searches.append((Customer.name_normalized, normalize_name(q)))
+        searches.append((Customer.email_normalized, normalize_email(q)))
+
+    customers: Dict[int, Customer] = {}
+    for column, prefix in searches:
+        if not prefix:
+            continue
+        query = (
+            db.query(Customer)
+            .filter(_prefix_range(column, prefix))
+            .order_by(column, Customer.id)
+            .limit(limit)
+        )
+        for customer in query:
+            customers.setdefault(customer.id, customer)
+    return list(customers.values())[:limit]
+
+
+def find_duplicate_customers(
+    db: Session, customer: schemas.CustomerBase, limit: int = 5
+) -> List[Customer]:
+    """Existing customers with the same normalized email or phone number."""
+    email = normalize_email(customer.email)
+    phone = normalize_phone(customer.phone)
+    conditions = []
+    if email:
+        conditions.append(Customer.email_normalized == email)
+    # Shorter numbers are extensions or typos, not identities.
+    if phone and len(phone) >= 7:
+        conditions.append(Customer.phone_digits == phone)
+    if not conditions:
+        return []
+    query = db.query(Customer).filter(or_(*conditions)).order_by(Customer.id)
+    return query.limit(limit).all()
+
+
 def update_customer(
     db: Session, customer_id: int, customer: schemas.CustomerUpdate
 ) -> Optional[Customer]:
-    db_customer = get_customer(db, customer_id)
+    db_customer = _get_for_update(db, Customer, customer_id)
     if db_customer:
         update_data = customer.dict(exclude_unset=True)
         for field, value in update_data.items():
@@ -251,6 +432,9 @@ def create_sale(db: Session, sale: schemas.SaleCreate) -> Sale:
     sale_dict = sale.dict(exclude={"items"})
     db_sale = Sale(**sale_dict)
     db.add(db_sale)
+    _record_orders(db, sale.customer_id, 1, sale.total_amount, sale.order_date)
+    _record_product_sales(db, db_sale, sale.items)
+    _record_daily_sale(db, db_sale)
     db.commit()
     db.refresh(db_sale)
 
@@ -311,18 +495,560 @@ def get_sale_items(db: Session, sale_id: int) -> List[SaleItem]:
 
 
 def update_sale(db: Session, sale_id: int, sale: schemas.SaleUpdate) -> Optional[Sale]:
+    """Update status or total; a new total is applied to the sale's aggregates.
+
+    The day's order value digest keeps the original total, since a t-digest
+    cannot remove a value, until ``rebuild_daily_sales_rollups`` is run.
+    """
     db_sale = get_sale(db, sale_id)
     if db_sale:
         update_data = sale.dict(exclude_unset=True)
+        if update_data.get("total_amount") is not None:
+            delta = update_data["total_amount"] - db_sale.total_amount
+            if delta:
+                _record_orders(db, db_sale.customer_id, 0, delta)
+                _revise_daily_revenue(db, db_sale, delta)
         for field, value in update_data.items():
             setattr(db_sale, field, value)
         db.commit()
         db.refresh(db_sale)
     return db_sale
 
+
+def _record_orders(
+    db: Session,
+    customer_id: int,
+    orders: int,
+    revenue: float,
+    order_date: Optional[datetime] = None,
+) -> None:
+    """Add to a customer's stats row in the caller's transaction.
+
+    A single UPDATE with the increments computed by the database, so
+    concurrent sales for one customer cannot lose each other's totals.
+    """
+    values = {
+        "order_count": CustomerStats.order_count + orders,
+        "total_revenue": CustomerStats.total_revenue + revenue,
+    }
+    if order_date is not None:
+        first, last = CustomerStats.first_order_date, CustomerStats.last_order_date
+        values["first_order_date"] = case(
+            (or_(first.is_(None), first > order_date), order_date), else_=first
+        )
+        values["last_order_date"] = case(
+            (or_(last.is_(None), last < order_date), order_date), else_=last
+        )
+    result = db.execute(
+        update(CustomerStats)
+        .where(CustomerStats.customer_id == customer_id)
+        .values(values)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount == 0:
+        # Customers loaded in bulk before stats existed have no row yet.
+        db.execute(
+            insert(CustomerStats).values(
+                customer_id=customer_id,
+                order_count=orders,
+                total_revenue=revenue,
+                first_order_date=order_date,
+                last_order_date=order_date,
+            )
+        )
+
+
+def _add_to_counters(
+    db: Session, model, key: Dict[str, Any], increments: Dict[str, Any]
+) -> None:
+    """Add ``increments`` to the row of ``model`` at ``key``, creating it."""
+    table = model.__table__
+    dialect = db.get_bind().dialect.name
+    if dialect in ("sqlite", "mysql"):
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as upsert
+        else:
+            from sqlalchemy.dialects.mysql import insert as upsert
+        stmt = upsert(table).values({**key, **increments})
+        if dialect == "sqlite":
+            stmt = stmt.on_conflict_do_update(
+                index_elements=list(key),
+                set_={c: table.c[c] + stmt.excluded[c] for c in increments},
+            )
+        else:
+            stmt = stmt.on_duplicate_key_update(
+                {c: table.c[c] + stmt.inserted[c] for c in increments}
+            )
+        db.execute(stmt)
+        return
+    result = db.execute(
+        table.update()
+        .where(and_(*(table.c[c] == v for c, v in key.items())))
+        .values({c: table.c[c] + v for c, v in increments.items()})
+    )
+    if result.rowcount == 0:
+        db.execute(table.insert().values({**key, **increments}))
+
+
+def _record_product_sales(
+    db: Session, db_sale: Sale, items: List[schemas.SaleItemCreate]
+) -> None:
+    totals: Dict[int, List[float]] = {}
+    for item in items:
+        units_revenue = totals.setdefault(item.product_id, [0, 0.0])
+        units_revenue[0] += item.quantity
+        units_revenue[1] += item.unit_price * item.quantity - item.discount
+    for product_id, (units, revenue) in sorted(totals.items()):
+        _add_to_counters(
+            db,
+            ProductDailySales,
+            {
+                "day": db_sale.order_date.date(),
+                "product_id": product_id,
+                "platform": db_sale.platform or "website",
+            },
+            {"units": units, "revenue": revenue},
+        )
+
+
+def _record_daily_sale(db: Session, db_sale: Sale) -> None:
+    """Count the sale in its day's rollup and queue it for the day's sketches.
+
+    Rewriting the sketches needs a locking read of the rollup row, which would
+    make every sale of the day and platform wait for the previous one to
+    commit, so ``merge_pending_sketches`` adds queued sales in the background.
+    """
+    key = {
+        "day": db_sale.order_date.date(),
+        "platform": db_sale.platform or "website",
+    }
+    _add_to_counters(
+        db, DailySalesRollup, key, {"orders": 1, "revenue": db_sale.total_amount}
+    )
+    db.execute(
+        insert(PendingSaleSketch).values(
+            **key, customer_id=db_sale.customer_id, total_amount=db_sale.total_amount
+        )
+    )
+
+
+def merge_pending_sketches(engine: Engine, chunk_size: int = 10_000) -> int:
+    """Add queued sales to their days' sketches; returns how many were added.
+
+    Each chunk is one transaction, so sales are only held up by the rollup
+    rows of one chunk at a time.
+    """
+    merged = 0
+    while True:
+        with engine.begin() as conn:
+            pending = conn.execute(
+                select(PendingSaleSketch)
+                .order_by(PendingSaleSketch.id)
+                .limit(chunk_size)
+                .with_for_update()
+            ).all()
+            by_key: Dict[Tuple[date, str], List[Any]] = {}
+            for row in pending:
+                by_key.setdefault((row.day, row.platform), []).append(row)
+            for (day, platform), rows in sorted(by_key.items()):
+                where = and_(
+                    DailySalesRollup.day == day, DailySalesRollup.platform == platform
+                )
+                # Locking read: sales may update the row's counters meanwhile.
+                rollup = conn.execute(
+                    select(
+                        DailySalesRollup.customer_sketch,
+                        DailySalesRollup.order_value_sketch,
+                    )
+                    .where(where)
+                    .with_for_update()
+                ).first()
+                if rollup is None:
+                    continue  # rebuilt from sales since
+                customers, order_values = HyperLogLog(rollup[0]), TDigest(rollup[1])
+                for row in rows:
+                    customers.add(row.customer_id)
+                    order_values.add(row.total_amount)
+                conn.execute(
+                    update(DailySalesRollup)
+                    .where(where)
+                    .values(
+                        customer_sketch=customers.to_bytes(),
+                        order_value_sketch=order_values.to_bytes(),
+                    )
+                )
+            conn.execute(
+                PendingSaleSketch.__table__.delete().where(
+                    PendingSaleSketch.id.in_([row.id for row in pending])
+                )
+            )
+        merged += len(pending)
+        if len(pending) < chunk_size:
+            return merged
+
+
+def _revise_daily_revenue(db: Session, db_sale: Sale, delta: float) -> None:
+    db.execute(
+        update(DailySalesRollup)
+        .where(
+            DailySalesRollup.day == db_sale.order_date.date(),
+            DailySalesRollup.platform == (db_sale.platform or "website"),
+        )
+        .values(revenue=DailySalesRollup.revenue + delta)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _as_date(value: Union[date, str]) -> date:
+    # DATE() returns a string on SQLite.
+    return value if isinstance(value, date) else date.fromisoformat(value)
+
+
+def rebuild_daily_sales_rollups(
+    db: Union[Session, Connection], chunk_size: int = 100_000
+) -> None:
+    """Recompute ``daily_sales_rollups``, sketches included, from ``sales``."""
+    day = func.date(Sale.order_date)
+    rollups: Dict[Tuple[date, str], Dict[str, Any]] = {}
+    totals = select(
+        day, Sale.platform, func.count(Sale.id), func.sum(Sale.total_amount)
+    ).group_by(day, Sale.platform)
+    for row_day, platform, orders, revenue in db.execute(totals):
+        rollups[(_as_date(row_day), platform)] = {
+            "day": _as_date(row_day),
+            "platform": platform,
+            "orders": orders,
+            "revenue": revenue,
+            "customer_sketch": HyperLogLog(),
+            "order_value_sketch": TDigest(),
+        }
+    result = db.execute(
+        select(day, Sale.platform, Sale.customer_id, Sale.total_amount),
+        execution_options={"stream_results": True, "yield_per": chunk_size},
+    )
+    for rows in result.partitions(chunk_size):
+        for row_day, platform, customer_id, total_amount in rows:
+            rollup = rollups[(_as_date(row_day), platform)]
+            rollup["customer_sketch"].add(customer_id)
+            rollup["order_value_sketch"].add(total_amount)
+
+    db.execute(DailySalesRollup.__table__.delete())
+    db.execute(PendingSaleSketch.__table__.delete())
+    rows = [
+        {
+            **rollup,
+            "customer_sketch": rollup["customer_sketch"].to_bytes(),
+            "order_value_sketch": rollup["order_value_sketch"].to_bytes(),
+        }
+        for rollup in rollups.values()
+    ]
+    for start in range(0, len(rows), chunk_size):
+        db.execute(insert(DailySalesRollup), rows[start : start + chunk_size])
+
+
+def _period_start(day: date, group_by: str) -> Union[date, int]:
+    # Same periods as _summarize_revenue: weeks start on Monday.
+    if group_by == "week":
+        return day - timedelta(days=day.weekday())
+    if group_by == "month":
+        return day.replace(day=1)
+    if group_by == "year":
+        return day.year
+    return day
+
+
+def _rollups_by_period(
+    db: Session,
+    start_date: date,
+    end_date: date,
+    group_by: str,
+    platform: Optional[str] = None,
+) -> Dict[Any, List[Dict[str, Any]]]:
+    """Daily rollups by period, with queued sales added to their sketches."""
+    pending_query = select(
+        PendingSaleSketch.day,
+        PendingSaleSketch.platform,
+        PendingSaleSketch.customer_id,
+        PendingSaleSketch.total_amount,
+    ).where(PendingSaleSketch.day >= start_date, PendingSaleSketch.day <= end_date)
+    query = select(DailySalesRollup.__table__).where(
+        DailySalesRollup.day >= start_date, DailySalesRollup.day <= end_date
+    )
+    if platform:
+        pending_query = pending_query.where(PendingSaleSketch.platform == platform)
+        query = query.where(DailySalesRollup.platform == platform)
+
+    pending: Dict[Tuple[date, str], Tuple[HyperLogLog, TDigest]] = {}
+    for day, row_platform, customer_id, total_amount in db.execute(pending_query):
+        customers, order_values = pending.setdefault(
+            (day, row_platform), (HyperLogLog(), TDigest())
+        )
+        customers.add(customer_id)
+        order_values.add(total_amount)
+
+    periods: Dict[Any, List[Dict[str, Any]]] = {}
+    query = query.order_by(DailySalesRollup.day, DailySalesRollup.platform)
+    for rollup in db.execute(query).mappings():
+        rollup = dict(rollup)
+        queued = pending.get((rollup["day"], rollup["platform"]))
+        if queued:
+            customers, order_values = queued
+            customers.merge(HyperLogLog(rollup["customer_sketch"]))
+            order_values.merge(TDigest(rollup["order_value_sketch"]))
+            rollup["customer_sketch"] = customers.to_bytes()
+            rollup["order_value_sketch"] = order_values.to_bytes()
+        periods.setdefault(_period_start(rollup["day"], group_by), []).append(rollup)
+    return periods
+
+
+def get_unique_customers(
+    db: Session,
+    start_date: date,
+    end_date: date,
+    group_by: str = "day",
+    platform: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Approximate distinct customers per period from the daily sketches.
+
+    Cost depends on the number of days and platforms in the window, plus the
+    sales not yet merged into the sketches, not on the number of sales.
+    Estimates carry a relative standard error of ``HLL_STANDARD_ERROR``; orders
+    and revenue are exact.
+    """
+    result = {}
+    merged = []
+    for period, rollups in _rollups_by_period(
+        db, start_date, end_date, group_by, platform
+    ).items():
+        sketch = HyperLogLog.merge_all(r["customer_sketch"] for r in rollups)
+        merged.append(sketch.to_bytes())
+        result[str(period)] = {
+            "unique_customers": round(sketch.count()),
+            "orders": sum(r["orders"] for r in rollups),
+            "revenue": sum(r["revenue"] for r in rollups),
+        }
+    return {
+        "group_by": group_by,
+        "standard_error": HLL_STANDARD_ERROR,
+        "total": {
+            "unique_customers": round(HyperLogLog.merge_all(merged).count()),
+            "orders": sum(p["orders"] for p in result.values()),
+            "revenue": sum(p["revenue"] for p in result.values()),
+        },
+        "periods": result,
+    }
+
+
+def _order_value_summary(rollups: List[Dict[str, Any]]) -> Dict[str, Any]:
+    orders = sum(r["orders"] for r in rollups)
+    revenue = sum(r["revenue"] for r in rollups)
+    digest = TDigest.merge_all(r["order_value_sketch"] for r in rollups)
+    return {
+        "orders": orders,
+        "average_order_value": revenue / orders if orders else 0.0,
+        "p50": digest.quantile(0.5),
+        "p90": digest.quantile(0.9),
+        "p99": digest.quantile(0.99),
+    }
+
+
+def get_order_value_percentiles(
+    db: Session,
+    start_date: date,
+    end_date: date,
+    group_by: str = "day",
+    platform: Optional[str] = None,
+) -> Dict[str, Any]:
+    """p50, p90 and p99 order value per period and per platform.
+
+    Merges the per-day t-digests in ``daily_sales_rollups`` instead of sorting
+    order totals, so the cost depends on the days in the window, not on sales.
+    Percentiles reflect totals as first recorded; see ``update_sale``.
+    """
+    periods = _rollups_by_period(db, start_date, end_date, group_by, platform)
+    rollups = [r for period in periods.values() for r in period]
+    platforms: Dict[str, List[Dict[str, Any]]] = {}
+    for rollup in rollups:
+        platforms.setdefault(rollup["platform"], []).append(rollup)
+    return {
+        "group_by": group_by,
+        "total": _order_value_summary(rollups),
+        "periods": {str(p): _order_value_summary(r) for p, r in periods.items()},
+        "platforms": {
+            name: _order_value_summary(r) for name, r in sorted(platforms.items())
+        },
+    }
+
+
+def rebuild_product_daily_sales(db: Union[Session, Connection]) -> None:
+    """Recompute ``product_daily_sales`` from the sale lines."""
+    day = func.date(Sale.order_date)
+    db.execute(ProductDailySales.__table__.delete())
+    db.execute(
+        insert(ProductDailySales).from_select(
+            ["day", "product_id", "platform", "units", "revenue"],
+            select(
+                day,
+                SaleItem.product_id,
+                Sale.platform,
+                func.sum(SaleItem.quantity),
+                func.sum(SaleItem.unit_price * SaleItem.quantity - SaleItem.discount),
+            )
+            .join(Sale, Sale.id == SaleItem.sale_id)
+            .group_by(day, SaleItem.product_id, Sale.platform),
+        )
+    )
+
+
+def get_top_products(
+    db: Session,
+    start_date: date,
+    end_date: date,
+    by: str = "units",
+    k: int = 10,
+    platform: Optional[str] = None,
+    category_id: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """The ``k`` best-selling products between two days, both inclusive.
+
+    Sums the per-day partials of each product, which are far fewer than the
+    sale lines, and keeps the best ``k`` with a heap instead of sorting them.
+    """
+    query = db.query(
+        ProductDailySales.product_id,
+        func.sum(ProductDailySales.units).label("units"),
+        func.sum(ProductDailySales.revenue).label("revenue"),
+    ).filter(ProductDailySales.day >= start_date, ProductDailySales.day <= end_date)
+    if platform:
+        query = query.filter(ProductDailySales.platform == platform)
+    if category_id:
+        query = query.join(Product, Product.id == ProductDailySales.product_id).filter(
+            Product.category_id == category_id
+        )
+    rows = query.group_by(ProductDailySales.product_id)
+    # Ties go to the lower product id.
+    top = heapq.nlargest(k, rows, key=lambda row: (getattr(row, by), -row.product_id))
+
+    names = dict(
+        db.query(Product.id, Product.name).filter(
+            Product.id.in_([row.product_id for row in top])
+        )
+    )
+    return [
+        {
+            "rank": rank,
+            "product_id": row.product_id,
+            "product_name": names.get(row.product_id),
+            "units": int(row.units),
+            "revenue": float(row.revenue),
+        }
+        for rank, row in enumerate(top, 1)
+    ]
+
+
+def rebuild_customer_stats(db: Union[Session, Connection]) -> None:
+    """Recompute every customer's stats from ``sales``, e.g. after a bulk load."""
+    db.execute(CustomerStats.__table__.delete())
+    db.execute(
+        insert(CustomerStats).from_select(
+            [
+                "customer_id",
+                "order_count",
+                "total_revenue",
+                "first_order_date",
+                "last_order_date",
+            ],
+            select(
+                Customer.id,
+                func.count(Sale.id),
+                func.coalesce(func.sum(Sale.total_amount), 0),
+                func.min(Sale.order_date),
+                func.max(Sale.order_date),
+            )
+            .outerjoin(Sale, Sale.customer_id == Customer.id)
+            .group_by(Customer.id),
+        )
+    )
+
+
+def _stats_dict(stats: CustomerStats) -> Dict[str, Any]:
+    return {
+        "customer_id": stats.customer_id,
+        "order_count": stats.order_count,
+        "total_revenue": stats.total_revenue,
+        "average_order_value": (
+            stats.total_revenue / stats.order_count if stats.order_count else 0.0
+        ),
+        "first_order_date": stats.first_order_date,
+        "last_order_date": stats.last_order_date,
+    }
+
+
+def get_customer_stats(db: Session, customer_id: int) -> Dict[str, Any]:
+    stats = db.get(CustomerStats, customer_id)
+    if stats is None:
+        stats = CustomerStats(
+            customer_id=customer_id, order_count=0, total_revenue=0.0
+        )
+    return _stats_dict(stats)
+
+
+def get_top_customers(
+    db: Session, by: str = "revenue", limit: int = 10
+) -> List[Dict[str, Any]]:
+    """Customers with the highest revenue or order count, read off its index."""
+    column = {
+        "revenue": CustomerStats.total_revenue,
+        "orders": CustomerStats.order_count,
+    }[by]
+    rows = (
+        db.query(CustomerStats, Customer.name, Customer.email)
+        .join(Customer, Customer.id == CustomerStats.customer_id)
+        .order_by(desc(column), desc(CustomerStats.customer_id))
+        .limit(limit)
+        .all()
+    )
+    return [
+        {**_stats_dict(stats), "name": name, "email": email}
+        for stats, name, email in rows
+    ]
+
+
+def _summarize_sales(sales: List[Tuple[datetime, float]]) -> Dict[str, Any]:
+    if not sales:
+        return {
+            "total_sales": 0,
+            "total_revenue": 0.0,
+            "average_order_value": 0.0,
+            "sales_by_date": {},
+        }
+
+    total_sales = len(sales)
+    total_revenue = sum(total_amount for _, total_amount in sales)
+    average_order_value = total_revenue / total_sales if total_sales > 0 else 0.0
+
+    sales_by_date = {}
+    for order_date, total_amount in sales:
+        sale_date = order_date.date().isoformat()
+        if sale_date not in sales_by_date:
+            sales_by_date[sale_date] = {"count": 0, "revenue": 0.0}
+        sales_by_date[sale_date]["count"] += 1
+        sales_by_date[sale_date]["revenue"] += total_amount
+
+    return {
+        "total_sales": total_sales,
+        "total_revenue": total_revenue,
+        "average_order_value": average_order_value,
+        "sales_by_date": sales_by_date,
+    }
+
+
 def get_sales_analytics(
     db: Session, params: schemas.SalesAnalyticsParams
 ) -> Dict[str, Any]:
+    if snapshot_backend.serves("sales_analytics"):
+        return _summarize_sales(snapshot_backend.sales(params))
+
     start_date = params.start_date
     end_date = params.end_date
 
@@ -333,15 +1059,8 @@ def get_sales_analytics(
     if params.platform:
         query = query.filter(Sale.platform == params.platform)
 
-    sales_data = query.all()
-
-    if not sales_data:
-        return {
-            "total_sales": 0,
-            "total_revenue": 0.0,
-            "average_order_value": 0.0,
-            "sales_by_date": {},
-        }
+    # Ordered so totals are summed in the same order as the snapshot backend.
+    sales_data = query.order_by(Sale.id).all()
 
     if params.product_id or params.category_id:
         filtered_sales = []
@@ -366,37 +1085,53 @@ def get_sales_analytics(
 
         sales_data = filtered_sales
 
-    total_sales = len(sales_data)
-    total_revenue = sum(sale.total_amount for sale in sales_data)
-    average_order_value = total_revenue / total_sales if total_sales > 0 else 0.0
+    return _summarize_sales(
+        [(sale.order_date, sale.total_amount) for sale in sales_data]
+    )
 
-    sales_by_date = {}
-    for sale in sales_data:
-        sale_date = sale.order_date.date().isoformat()
-        if sale_date not in sales_by_date:
-            sales_by_date[sale_date] = {"count": 0, "revenue": 0.0}
-        sales_by_date[sale_date]["count"] += 1
-        sales_by_date[sale_date]["revenue"] += sale.total_amount
+
+def _summarize_revenue(df: "pd.DataFrame", group_by: str) -> Dict[str, Any]:
+    if df.empty:
+        return {"total_revenue": 0.0, "revenue_by_period": {}}
+
+    if group_by == "day":
+        df["period"] = df["order_date"].dt.date
+    elif group_by == "week":
+        df["period"] = (
+            df["order_date"].dt.to_period("W").apply(lambda x: x.start_time.date())
+        )
+    elif group_by == "month":
+        df["period"] = (
+            df["order_date"].dt.to_period("M").apply(lambda x: x.start_time.date())
+        )
+    elif group_by == "year":
+        df["period"] = df["order_date"].dt.year
+
+    revenue_by_period = df.groupby("period")["total_amount"].sum().to_dict()
+
+    revenue_by_period = {str(k): float(v) for k, v in revenue_by_period.items()}
 
     return {
-        "total_sales": total_sales,
-        "total_revenue": total_revenue,
-        "average_order_value": average_order_value,
-        "sales_by_date": sales_by_date,
+        "total_revenue": float(df["total_amount"].sum()),
+        "revenue_by_period": revenue_by_period,
     }
 
 
-def get_revenue_analytics(
-    db: Session, params: schemas.RevenueAnalyticsParams
+def _revenue_analytics(
+    db: Session, params: schemas.RevenueAnalyticsParams, from_snapshot: bool
 ) -> Dict[str, Any]:
-    start_date = params.start_date
-    end_date = params.end_date
     group_by = params.group_by.lower()
 
     valid_group_by = ["day", "week", "month", "year"]
     if group_by not in valid_group_by:
         group_by = "day"
 
+    if from_snapshot:
+        return _summarize_revenue(snapshot_backend.revenue(params), group_by)
+
+    start_date = params.start_date
+    end_date = params.end_date
+
     query = db.query(Sale).filter(
         Sale.order_date >= start_date, Sale.order_date <= end_date
     )
@@ -404,20 +1139,19 @@ def get_revenue_analytics(
     if params.platform:
         query = query.filter(Sale.platform == params.platform)
 
+    if params.product_id or params.category_id:
+        query = query.join(SaleItem)
+
     if params.product_id:
-        query = query.join(SaleItem).filter(SaleItem.product_id == params.product_id)
+        query = query.filter(SaleItem.product_id == params.product_id)
 
     if params.category_id:
-        query = (
-            query.join(SaleItem)
-            .join(Product)
-            .filter(Product.category_id == params.category_id)
-        )
+        query = query.join(Product).filter(Product.category_id == params.category_id)
 
-    sales_data = query.all()
+    sales_data = query.order_by(Sale.id).all()
 
-    if not sales_data:
-        return {"total_revenue": 0.0, "revenue_by_period": {}}
+    # pandas is slow to import and only needed here.
+    import pandas as pd
 
     df = pd.DataFrame(
         [
@@ -425,28 +1159,13 @@ def get_revenue_analytics(
             for sale in sales_data
         ]
     )
+    return _summarize_revenue(df, group_by)
 
-    if group_by == "day":
-        df["period"] = df["order_date"].dt.date
-    elif group_by == "week":
-        df["period"] = (
-            df["order_date"].dt.to_period("W").apply(lambda x: x.start_time.date())
-        )
-    elif group_by == "month":
-        df["period"] = (
-            df["order_date"].dt.to_period("M").apply(lambda x: x.start_time.date())
-        )
-    elif group_by == "year":
-        df["period"] = df["order_date"].dt.year
-
-    revenue_by_period = df.groupby("period")["total_amount"].sum().to_dict()
-
-    revenue_by_period = {str(k): float(v) for k, v in revenue_by_period.items()}
 
-    return {
-        "total_revenue": float(df["total_amount"].sum()),
-        "revenue_by_period": revenue_by_period,
-    }
+def get_revenue_analytics(
+    db: Session, params: schemas.RevenueAnalyticsParams
+) -> Dict[str, Any]:
+    return _revenue_analytics(db, params, snapshot_backend.serves("revenue_analytics"))
 
 
 def get_inventory_analytics(
@@ -474,6 +1193,9 @@ def get_inventory_analytics(
                     "product_name": inv.product.name,
                     "current_quantity": inv.quantity,
                     "threshold": inv.low_stock_threshold,
+                    "suggested_order_quantity": _suggested_order(
+                        inv.quantity, inv.low_stock_threshold, inv.reorder_quantity
+                    ),
                 }
             )
 
@@ -503,7 +1225,9 @@ def compare_revenue_periods(
         category_id=category_id,
         platform=platform,
     )
-    current_revenue = get_revenue_analytics(db, current_params)
+    # Both periods come from the same backend so they are comparable.
+    from_snapshot = snapshot_backend.serves("compare_revenue_periods")
+    current_revenue = _revenue_analytics(db, current_params, from_snapshot)
 
     previous_params = schemas.RevenueAnalyticsParams(
         start_date=previous_start,
@@ -513,7 +1237,7 @@ def compare_revenue_periods(
         category_id=category_id,
         platform=platform,
     )
-    previous_revenue = get_revenue_analytics(db, previous_params)
+    previous_revenue = _revenue_analytics(db, previous_params, from_snapshot)
 
     current_total = current_revenue["total_revenue"]
     previous_total = previous_revenue["total_revenue"]
@@ -541,3 +1265,227 @@ def compare_revenue_periods(
             "percent_change": percent_change,
         },
     }
+
+
+def get_stock_forecast(
+    db: Session, horizon_days: Optional[int] = None, skip: int = 0, limit: int = 100
+) -> Dict[str, Any]:
+    """Products by days of cover, soonest stock-out first; unsold products last."""
+    # Like the customer analytics, the forecast job imports NumPy.
+    from app.analytics.inventory import stock_forecasts
+
+    stock_forecasts.ensure_fresh(db.get_bind())
+    query = db.query(StockForecast, Product.name, Product.sku).join(
+        Product, Product.id == StockForecast.product_id
+    )
+    if horizon_days is not None:
+        query = query.filter(StockForecast.days_of_cover < horizon_days + 1)
+    rows = (
+        query.order_by(
+            StockForecast.days_of_cover.is_(None),
+            StockForecast.days_of_cover,
+            StockForecast.product_id,
+        )
+        .offset(skip)
+        .limit(limit)
+        .all()
+    )
+    as_of, computed_at = db.query(
+        func.max(StockForecast.as_of), func.max(StockForecast.computed_at)
+    ).one()
+    return {
+        "as_of": as_of,
+        "computed_at": computed_at,
+        "window_days": settings.STOCK_FORECAST_WINDOW_DAYS,
+        "products": [
+            {
+                "product_id": forecast.product_id,
+                "product_name": name,
+                "sku": sku,
+                "quantity": forecast.quantity,
+                "daily_velocity": forecast.daily_velocity,
+                "days_of_cover": forecast.days_of_cover,
+                "stockout_date": forecast.stockout_date,
+            }
+            for forecast, name, sku in rows
+        ],
+    }
+
+
+def _fresh_customer_analytics(db: Session):
+    # NumPy is only needed by the batch job, so import it on first use.
+    from app.analytics.customers import customer_analytics
+
+    customer_analytics.ensure_fresh(db.get_bind())
+    return customer_analytics
+
+
+def get_rfm_summary(db: Session) -> Dict[str, Any]:
+    _fresh_customer_analytics(db)
+    rows = (
+        db.query(
+            CustomerRFM.segment,
+            func.count(CustomerRFM.customer_id).label("customers"),
+            func.avg(CustomerRFM.recency_days).label("recency"),
+            func.avg(CustomerRFM.frequency).label("frequency"),
+            func.avg(CustomerRFM.monetary).label("monetary"),
+            func.sum(CustomerRFM.monetary).label("total_monetary"),
+            func.max(CustomerRFM.as_of).label("as_of"),
+            func.max(CustomerRFM.computed_at).label("computed_at"),
+        )
+        .group_by(CustomerRFM.segment)
+        .order_by(desc("total_monetary"))
+        .all()
+    )
+    total = sum(row.customers for row in rows)
+    return {
+        "as_of": max((row.as_of for row in rows), default=None),
+        "computed_at": max((row.computed_at for row in rows), default=None),
+        "segments": [
+            {
+                "segment": row.segment,
+                "customers": row.customers,
+                "share": row.customers / total,
+                "average_recency_days": float(row.recency),
+                "average_frequency": float(row.frequency),
+                "average_monetary": float(row.monetary),
+                "total_monetary": float(row.total_monetary),
+            }
+            for row in rows
+        ],
+    }
+
+
+def get_rfm_segment(
+    db: Session, segment: str, skip: int = 0, limit: int = 100
+) -> List[CustomerRFM]:
+    _fresh_customer_analytics(db)
+    return (
+        db.query(CustomerRFM)
+        .filter(CustomerRFM.segment == segment)
+        .order_by(desc(CustomerRFM.monetary))
+        .offset(skip)
+        .limit(limit)
+        .all()
+    )
+
+
+def get_cohort_retention(db: Session, cohorts: int = 12) -> Dict[str, Any]:
+    """The latest ``cohorts`` monthly cohorts with their retention curves."""
+    _fresh_customer_analytics(db)
+    months = [
+        month
+        for (month,) in db.query(CohortRetention.cohort_month)
+        .filter(CohortRetention.months_since == 0)
+        .order_by(desc(CohortRetention.cohort_month))
+        .limit(cohorts)
+    ]
+    rows = (
+        db.query(CohortRetention)
+        .filter(CohortRetention.cohort_month.in_(months))
+        .order_by(CohortRetention.cohort_month, CohortRetention.months_since)
+        .all()
+    )
+    by_cohort: Dict[str, Dict[str, Any]] = {}
+    for row in rows:
+        cohort = by_cohort.setdefault(
+            row.cohort_month, {"cohort": row.cohort_month, "retention": []}
+        )
+        if row.months_since == 0:
+            cohort["customers"] = row.customers
+        # Months in which nobody from the cohort ordered have no row.
+        missing = row.months_since - len(cohort["retention"])
+        cohort["retention"].extend([0.0] * missing)
+        cohort["retention"].append(row.retention)
+    return {
+        "computed_at": max((row.computed_at for row in rows), default=None),
+        "cohorts": list(by_cohort.values()),
+    }
+
+
+def get_dashboard_summary(
+    db: Session, period_days: int, today: Optional[date] = None
+) -> Dict[str, Any]:
+    """Sales, revenue, inventory, top products and platforms of ``period_days``."""
+    today = today or datetime.now().date()
+    start_date = today - timedelta(days=period_days)
+    sales_params = schemas.SalesAnalyticsParams(start_date=start_date, end_date=today)
+    sales_data = get_sales_analytics(db, sales_params)
+    revenue_params = schemas.RevenueAnalyticsParams(
+        start_date=start_date, end_date=today, group_by="day"
+    )
+    revenue_data = get_revenue_analytics(db, revenue_params)
+    inventory_params = schemas.InventoryAnalyticsParams(low_stock_only=True)
+    inventory_data = get_inventory_analytics(db, inventory_params)
+    prev_start_date = start_date - timedelta(days=period_days)
+    prev_end_date = today - timedelta(days=period_days)
+
+    comparison = compare_revenue_periods(
+        db,
+        current_start=start_date,
+        current_end=today,
+        previous_start=prev_start_date,
+        previous_end=prev_end_date,
+        group_by="day",
+    )
+    # JSON has no infinity: growth from zero revenue is reported as null.
+    percent_change = comparison["comparison"]["percent_change"]
+    if not math.isfinite(percent_change):
+        percent_change = None
+
+    # Daily partials end with yesterday, like the queries above that stop at
+    # today's midnight.
+    top_products = [
+        {
+            "id": p["product_id"],
+            "name": p["product_name"],
+            "total_sold": p["units"],
+            "total_revenue": p["revenue"],
+        }
+        for p in get_top_products(
+            db, start_date, today - timedelta(days=1), by="units", k=5
+        )
+    ]
+
+    platform_query = (
+        db.query(
+            Sale.platform,
+            func.count(Sale.id).label("order_count"),
+            func.sum(Sale.total_amount).label("total_revenue"),
+        )
+        .filter(Sale.order_date >= start_date, Sale.order_date <= today)
+        .group_by(Sale.platform)
+        .order_by(func.sum(Sale.total_amount).desc())
+    )
+
+    platform_distribution = [
+        {
+            "platform": p.platform,
+            "order_count": p.order_count,
+            "total_revenue": float(p.total_revenue),
+        }
+        for p in platform_query.all()
+    ]
+
+    return {
+        "period": {
+            "start_date": start_date.isoformat(),
+            "end_date": today.isoformat(),
+            "days": period_days,
+        },
+        "sales_summary": {
+            "total_orders": sales_data["total_sales"],
+            "average_order_value": sales_data["average_order_value"],
+        },
+        "revenue_summary": {
+            "total_revenue": revenue_data["total_revenue"],
+            "revenue_change_percent": percent_change,
+        },
+        "inventory_summary": {
+            "total_products": inventory_data["total_products"],
+            "out_of_stock": inventory_data["out_of_stock_products"],
+            "low_stock_alerts": len(inventory_data["low_stock_alerts"]),
+        },
+        "top_products": top_products,
+        "platform_distribution": platform_distribution,
+    }
@@ -0,0 +1,168 @@
+"""Cross-worker invalidation of ``entity_cache`` through the ``cache_versions`` table.
+
+Every ORM transaction that writes to a cached table bumps the version of the
+matching namespaces just before it commits, in the same transaction, so the
+bump commits or rolls back with the write. Each worker polls the table (one
+small query every ``CACHE_VERSION_POLL_MS``) and invalidates only the namespaces whose version
+changed; the worker that made the write invalidates its own cache on commit.
+
+Writes that bypass the ORM unit of work (Core ``insert``/``update``) must call
+``bump_versions`` themselves.
+"""
+
+import logging
+import threading
+from typing import Dict, Iterable, Optional, Set
+
+from sqlalchemy import event, func, insert, select, update
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.cache import EntityCache, entity_cache
+from app.core.config import settings
+from app.db.session import engine
+from app.models.models import CacheVersion
+
+logger = logging.getLogger("cache")
+
+# Cache namespace affected by writes to each table. Only tables that
+# ``entity_cache`` caches rows of are listed: bumping a version locks its row,
+# so writes to other tables (sales, inventory) must not pay for it.
+TABLE_NAMESPACES: Dict[str, str] = {
+    "categories": "category",
+    "customers": "customer",
+    "products": "product",
+}
+NAMESPACES = sorted(set(TABLE_NAMESPACES.values()))
+
+_PENDING = "cache_namespaces"
+
+
+def bump_versions(conn: Connection, namespaces: Iterable[str]) -> None:
+    # Sorted so concurrent transactions lock the rows in the same order.
+    namespaces = sorted(set(namespaces))
+    if namespaces:
+        conn.execute(
+            update(CacheVersion)
+            .where(CacheVersion.namespace.in_(namespaces))
+            .values(version=CacheVersion.version + 1, updated_at=func.now())
+        )
+
+
+def _before_flush(session: Session, flush_context, instances) -> None:
+    namespaces = {
+        TABLE_NAMESPACES.get(getattr(obj, "__tablename__", None))
+        for obj in (*session.new, *session.dirty, *session.deleted)
+    }
+    namespaces.discard(None)
+    if namespaces:
+        session.info.setdefault(_PENDING, set()).update(namespaces)
+
+
+def _before_commit(session: Session) -> None:
+    session.flush()
+    namespaces = session.info.get(_PENDING)
+    if namespaces:
+        # Bumped last so the version rows stay locked only until the commit.
+        bump_versions(session.connection(), namespaces)
+
+
+def _after_commit(session: Session) -> None:
+    namespaces = session.info.pop(_PENDING, None)
+    if namespaces:
+        entity_cache.invalidate(*namespaces)
+
+
+def _after_rollback(session: Session, previous_transaction) -> None:
+    session.info.pop(_PENDING, None)
+
+
+def track_cache_versions(target=Session) -> None:
+    """Bump namespace versions on ORM writes made through ``target`` sessions."""
+    if not event.contains(target, "before_flush", _before_flush):
+        event.listen(target, "before_flush", _before_flush)
+        event.listen(target, "before_commit", _before_commit)
+        event.listen(target, "after_commit", _after_commit)
+        event.listen(target, "after_soft_rollback", _after_rollback)
+
+
+class CacheVersionPoller:
+    def __init__(self, engine: Engine, cache: EntityCache, interval: float = 0.1):
+        self.engine = engine
+        self.cache = cache
+        self.interval = interval
+        self.versions: Optional[Dict[str, int]] = None
+        self.failing = False
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def ensure_rows(self) -> None:
+        with self.engine.connect() as conn:
+            existing = set(conn.execute(select(CacheVersion.namespace)).scalars())
+        for namespace in NAMESPACES:
+            if namespace in existing:
+                continue
+            try:
+                with self.engine.begin() as conn:
+                    conn.execute(
+                        insert(CacheVersion).values(namespace=namespace, version=0)
+                    )
+            except IntegrityError:
+                pass  # another worker created it
+
+    def poll(self) -> Set[str]:
+        """Invalidate namespaces whose version changed; returns them."""
+        with self.engine.connect() as conn:
+            versions = dict(
+                conn.execute(select(CacheVersion.namespace, CacheVersion.version)).all()
+            )
+        changed: Set[str] = set()
+        if self.versions is not None:
+            changed = {
+                namespace
+                for namespace, version in versions.items()
+                if self.versions.get(namespace) != version
+            }
+        else:
+            # Anything cached before the first poll may predate a remote write.
+            changed = set(versions)
+        if changed:
+            self.cache.invalidate(*changed)
+        self.versions = versions
+        return changed
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="cache-version-poller", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _run(self) -> None:
+        try:
+            self.ensure_rows()
+        except Exception:
+            logger.exception("could not create cache version rows")
+        while not self._stop.is_set():
+            try:
+                self.poll()
+                self.failing = False
+            except Exception:
+                # Without versions we cannot tell what is stale.
+                self.cache.clear()
+                self.versions = None
+                if not self.failing:
+                    logger.exception("cache version poll failed")
+                self.failing = True
+            self._stop.wait(self.interval)
+
+
+cache_version_poller = CacheVersionPoller(
+    engine, entity_cache, interval=settings.CACHE_VERSION_POLL_MS / 1000
+)
@@ -0,0 +1,99 @@
+import time
+import logging
+import weakref
+from contextvars import ContextVar
+from typing import Callable, Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+from app.db.slow_query import SlowQueryLog, slow_query_log
+
+logger = logging.getLogger("sql")
+
+# Warn when one request runs the same statement more than this many times.
+N_PLUS_ONE_THRESHOLD = settings.SQL_N_PLUS_ONE_THRESHOLD
+
+
+class QueryStats:
+    """SQL statements and time spent in the database for one request."""
+
+    __slots__ = ("count", "db_time", "shapes", "_route_getter")
+
+    def __init__(self, route_getter: Optional[Callable[[], str]] = None):
+        self.count = 0
+        self.db_time = 0.0
+        self.shapes: Dict[str, int] = {}
+        self._route_getter = route_getter
+
+    @property
+    def route(self) -> Optional[str]:
+        return self._route_getter() if self._route_getter else None
+
+    def record(self, statement: str, elapsed: float) -> None:
+        self.count += 1
+        self.db_time += elapsed
+        # Statements are parameterized, so the SQL text is the statement shape.
+        seen = self.shapes.get(statement, 0) + 1
+        self.shapes[statement] = seen
+        if seen == N_PLUS_ONE_THRESHOLD + 1:
+            logger.warning(
+                "possible N+1 query pattern",
+                extra={
+                    "route": self.route,
+                    "statement": statement,
+                    "threshold": N_PLUS_ONE_THRESHOLD,
+                },
+            )
+
+
+query_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+_slow_query_logs: "weakref.WeakKeyDictionary[Engine, SlowQueryLog]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start_time"].pop()
+    stats = query_stats.get()
+    if stats is not None:
+        stats.record(statement, elapsed)
+
+    slow_log = _slow_query_logs.get(conn.engine)
+    if (
+        slow_log is not None
+        and slow_log.is_slow(elapsed)
+        and context.execution_options.get("slow_query_log", True)
+    ):
+        slow_log.submit(
+            conn.engine,
+            statement,
+            parameters,
+            elapsed,
+            route=stats.route if stats is not None else None,
+            executemany=executemany,
+        )
+
+
+def _handle_error(exception_context):
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_start_time"):
+        conn.info["query_start_time"].pop()
+
+
+def instrument_engine(
+    engine: Engine, slow_log: Optional[SlowQueryLog] = slow_query_log
+) -> None:
+    """Attach per-request statement counting, timing and slow-query logging."""
+    if slow_log is not None:
+        _slow_query_logs[engine] = slow_log
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(engine, "handle_error", _handle_error)
@@ -0,0 +1,134 @@
+"""Search keys and full-text search.
+
+Customers are found through normalized copies of their email, phone and name,
+each indexed so lookups are prefix range scans; ``customer_search_keys``
+derives them and must be applied to rows inserted without the ORM.
+
+Products are searched with full text on name and description.
+
+MySQL uses a ``FULLTEXT`` index on ``products(name, description)``, which InnoDB
+maintains itself. SQLite uses an external-content FTS5 table, ``products_fts``,
+kept in sync with ``products`` by triggers, so every insert, update and delete
+is indexed in the same transaction whether it goes through the ORM or not.
+Other databases fall back to a ``LIKE`` scan of the name.
+"""
+
+import re
+import unicodedata
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import DDL, event, text
+from sqlalchemy.orm import Session
+from sqlalchemy.schema import Table
+
+MAX_TERMS = 8
+
+SQLITE_FTS_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5("
+    "name, description, content='products', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS products_fts_ai AFTER INSERT ON products BEGIN "
+    "INSERT INTO products_fts(rowid, name, description) "
+    "VALUES (new.id, new.name, new.description); END",
+    "CREATE TRIGGER IF NOT EXISTS products_fts_ad AFTER DELETE ON products BEGIN "
+    "INSERT INTO products_fts(products_fts, rowid, name, description) "
+    "VALUES ('delete', old.id, old.name, old.description); END",
+    "CREATE TRIGGER IF NOT EXISTS products_fts_au "
+    "AFTER UPDATE OF name, description ON products BEGIN "
+    "INSERT INTO products_fts(products_fts, rowid, name, description) "
+    "VALUES ('delete', old.id, old.name, old.description); "
+    "INSERT INTO products_fts(rowid, name, description) "
+    "VALUES (new.id, new.name, new.description); END",
+    # Reindex whatever the table already holds.
+    "INSERT INTO products_fts(products_fts) VALUES ('rebuild')",
+]
+# Triggers first: left behind, they would write to the dropped table.
+SQLITE_FTS_DROP = [
+    "DROP TRIGGER IF EXISTS products_fts_ai",
+    "DROP TRIGGER IF EXISTS products_fts_ad",
+    "DROP TRIGGER IF EXISTS products_fts_au",
+    "DROP TABLE IF EXISTS products_fts",
+]
+
+# Name matches count ten times as much as description matches.
+_SQLITE_MATCH = text(
+    "SELECT rowid, bm25(products_fts, 10.0, 1.0) AS score FROM products_fts "
+    "WHERE products_fts MATCH :query ORDER BY score LIMIT :limit"
+)
+_MYSQL_MATCH = text(
+    "SELECT id, MATCH(name, description) AGAINST (:query IN BOOLEAN MODE) AS score "
+    "FROM products WHERE MATCH(name, description) AGAINST (:query IN BOOLEAN MODE) "
+    "ORDER BY score DESC LIMIT :limit"
+)
+_LIKE_MATCH = text(
+    "SELECT id, 0 AS score FROM products WHERE lower(name) LIKE :query "
+    "ORDER BY name LIMIT :limit"
+)
+
+
+def normalize_email(email: Optional[str]) -> Optional[str]:
+    return (email.strip().lower() or None) if email else None
+
+
+def normalize_phone(phone: Optional[str]) -> Optional[str]:
+    """Digits only, so "+1 (555) 010-0000" and "15550100000" are the same key."""
+    return (re.sub(r"\D", "", phone)[:20] or None) if phone else None
+
+
+def normalize_name(name: Optional[str]) -> Optional[str]:
+    """Lowercase, accents removed and whitespace collapsed."""
+    if not name:
+        return None
+    decomposed = unicodedata.normalize("NFKD", name)
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join(stripped.lower().split())[:100] or None
+
+
+def customer_search_keys(
+    name: Optional[str], email: Optional[str], phone: Optional[str]
+) -> Dict[str, Optional[str]]:
+    return {
+        "name_normalized": normalize_name(name),
+        "email_normalized": normalize_email(email),
+        "phone_digits": normalize_phone(phone),
+    }
+
+
+def install_product_search(products: Table) -> None:
+    """Create and drop the SQLite FTS5 index along with ``products``."""
+    for statement in SQLITE_FTS_DDL:
+        event.listen(
+            products, "after_create", DDL(statement).execute_if(dialect="sqlite")
+        )
+    for statement in SQLITE_FTS_DROP:
+        event.listen(
+            products, "before_drop", DDL(statement).execute_if(dialect="sqlite")
+        )
+
+
+def search_terms(query: str) -> List[str]:
+    """Words of ``query``; punctuation is dropped so it cannot act as syntax."""
+    return re.findall(r"\w+", query.lower())[:MAX_TERMS]
+
+
+def fulltext_matches(db: Session, query: str, limit: int) -> List[Tuple[int, float]]:
+    """``(product_id, score)`` of products matching every word, best first.
+
+    Each word also matches as a prefix, so "blue shi" finds "Blue Shirt".
+    """
+    terms = search_terms(query)
+    if not terms:
+        return []
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        match = " ".join(f'"{term}"*' for term in terms)
+        rows = db.execute(_SQLITE_MATCH, {"query": match, "limit": limit})
+        # bm25 is lower for better matches.
+        return [(row.rowid, -row.score) for row in rows]
+    if dialect == "mysql":
+        match = " ".join(f"+{term}*" for term in terms)
+        rows = db.execute(_MYSQL_MATCH, {"query": match, "limit": limit})
+        return [(row.id, row.score) for row in rows]
+    pattern = "%" + "%".join(terms) + "%"
+    rows = db.execute(_LIKE_MATCH, {"query": pattern, "limit": limit})
+    return [(row.id, row.score) for row in rows]
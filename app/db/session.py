@@ -1,15 +1,19 @@
-import os
 import logging
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-from dotenv import load_dotenv
 
-load_dotenv()
+from app.core.config import settings
+from app.db.instrumentation import instrument_engine
 
-SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL")
+SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+engine_options = {}
+if make_url(SQLALCHEMY_DATABASE_URL).get_backend_name() != "sqlite":
+    engine_options["max_overflow"] = settings.DATABASE_MAX_OVERFLOW
+
+engine = create_engine(SQLALCHEMY_DATABASE_URL, **engine_options)
+instrument_engine(engine)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -0,0 +1,167 @@
+import os
+import re
+import json
+import queue
+import logging
+import threading
+import logging.handlers
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+logger = logging.getLogger("sql")
+
+EXPLAIN_PREFIXES = {
+    "sqlite": "EXPLAIN QUERY PLAN ",
+    "mysql": "EXPLAIN ",
+    "mariadb": "EXPLAIN ",
+    "postgresql": "EXPLAIN ",
+}
+
+_WHITESPACE = re.compile(r"\s+")
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*(?:\?|%s|%\(\w+\)s)(?:\s*,\s*(?:\?|%s|%\(\w+\)s))*\s*\)")
+
+
+def normalize_sql(statement: str) -> str:
+    """Collapse whitespace, literals and IN-lists so equal shapes compare equal."""
+    statement = _WHITESPACE.sub(" ", statement).strip()
+    statement = _STRING_LITERAL.sub("?", statement)
+    statement = _NUMBER_LITERAL.sub("?", statement)
+    return _PLACEHOLDER_LIST.sub("(?)", statement)
+
+
+class SlowQueryLog:
+    """Records statements slower than ``threshold_ms`` to a rotating file.
+
+    The request thread only enqueues the statement; a daemon worker thread
+    runs ``EXPLAIN`` on its own connection and writes one JSON line per slow
+    statement. When the queue is full new entries are dropped rather than
+    blocking the request.
+    """
+
+    def __init__(
+        self,
+        threshold_ms: float,
+        path: str,
+        max_bytes: int = 10 * 1024 * 1024,
+        backup_count: int = 5,
+        explain: bool = True,
+        max_pending: int = 1000,
+    ):
+        self.threshold = threshold_ms / 1000 if threshold_ms > 0 else None
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.explain = explain
+        self.dropped = 0
+        self._queue: "queue.Queue[Dict[str, Any]]" = queue.Queue(max_pending)
+        self._worker: Optional[threading.Thread] = None
+        self._file_logger: Optional[logging.Logger] = None
+        self._start_lock = threading.Lock()
+
+    def is_slow(self, elapsed: float) -> bool:
+        return self.threshold is not None and elapsed >= self.threshold
+
+    def submit(
+        self,
+        engine: Engine,
+        statement: str,
+        parameters: Any,
+        elapsed: float,
+        route: Optional[str] = None,
+        executemany: bool = False,
+    ) -> None:
+        self._ensure_worker()
+        entry = {
+            "engine": engine,
+            "statement": statement,
+            "parameters": parameters,
+            "duration_ms": round(elapsed * 1000, 2),
+            "route": route,
+            "executemany": executemany,
+            "recorded_at": datetime.now(timezone.utc).isoformat(),
+        }
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            self.dropped += 1
+
+    def flush(self) -> None:
+        """Block until every submitted statement has been written."""
+        self._queue.join()
+
+    def _ensure_worker(self) -> None:
+        if self._worker is not None:
+            return
+        with self._start_lock:
+            if self._worker is None:
+                self._worker = threading.Thread(
+                    target=self._run, name="slow-query-log", daemon=True
+                )
+                self._worker.start()
+
+    def _get_file_logger(self) -> logging.Logger:
+        if self._file_logger is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            handler = logging.handlers.RotatingFileHandler(
+                self.path, maxBytes=self.max_bytes, backupCount=self.backup_count
+            )
+            file_logger = logging.getLogger(f"sql.slow.{id(self)}")
+            file_logger.propagate = False
+            file_logger.setLevel(logging.INFO)
+            file_logger.addHandler(handler)
+            self._file_logger = file_logger
+        return self._file_logger
+
+    def _run(self) -> None:
+        while True:
+            entry = self._queue.get()
+            try:
+                self._write(entry)
+            except Exception:
+                logger.exception("failed to record slow query")
+            finally:
+                self._queue.task_done()
+
+    def _write(self, entry: Dict[str, Any]) -> None:
+        engine = entry.pop("engine")
+        statement = entry["statement"]
+        entry["normalized"] = normalize_sql(statement)
+        entry["plan"] = None
+        if self.explain and not entry["executemany"]:
+            entry["plan"] = self._explain(engine, statement, entry["parameters"])
+        self._get_file_logger().info(json.dumps(entry, default=str))
+        logger.warning(
+            "slow query",
+            extra={
+                "route": entry["route"],
+                "duration_ms": entry["duration_ms"],
+                "statement": entry["normalized"],
+            },
+        )
+
+    def _explain(self, engine: Engine, statement: str, parameters: Any):
+        prefix = EXPLAIN_PREFIXES.get(engine.dialect.name)
+        if prefix is None or not statement.lstrip().upper().startswith("SELECT"):
+            return None
+        try:
+            with engine.connect() as conn:
+                result = conn.execution_options(slow_query_log=False).exec_driver_sql(
+                    prefix + statement, parameters
+                )
+                return [dict(row._mapping) for row in result]
+        except Exception as exc:
+            return {"error": str(exc)}
+
+
+slow_query_log = SlowQueryLog(
+    threshold_ms=settings.SLOW_QUERY_THRESHOLD_MS,
+    path=settings.SLOW_QUERY_LOG_PATH,
+)
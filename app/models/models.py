@@ -10,10 +10,17 @@ from sqlalchemy import (
     Date,
     UniqueConstraint,
     Index,
+    LargeBinary,
 )
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, validates
 from sqlalchemy.sql import func
 from app.db.session import Base
+from app.db.search import (
+    install_product_search,
+    normalize_email,
+    normalize_name,
+    normalize_phone,
+)
 
 
 class Category(Base):
@@ -47,10 +54,22 @@ class Product(Base):
     inventory_items = relationship("Inventory", back_populates="product")
     sale_items = relationship("SaleItem", back_populates="product")
 
+    __table_args__ = (
+        Index(
+            "ft_products_name_description",
+            "name",
+            "description",
+            mysql_prefix="FULLTEXT",
+        ).ddl_if(dialect="mysql"),
+    )
+
     def __repr__(self):
         return f"<Product {self.name}>"
 
 
+install_product_search(Product.__table__)
+
+
 class Inventory(Base):
     __tablename__ = "inventory"
 
@@ -59,6 +78,8 @@ class Inventory(Base):
     quantity = Column(Integer, nullable=False, default=0)
     location = Column(String(100), nullable=True)
     low_stock_threshold = Column(Integer, nullable=False, default=10)
+    # Expected demand over the review period, set by the reorder-point job.
+    reorder_quantity = Column(Integer, nullable=True)
     last_restock_date = Column(DateTime(timezone=True), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
@@ -82,6 +103,9 @@ class InventoryHistory(Base):
     previous_quantity = Column(Integer, nullable=False)
     new_quantity = Column(Integer, nullable=False)
     change_reason = Column(String(200), nullable=True)
+    # Set when the entry records a low_stock_threshold change.
+    previous_threshold = Column(Integer, nullable=True)
+    new_threshold = Column(Integer, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     inventory = relationship("Inventory", back_populates="inventory_history")
@@ -96,7 +120,9 @@ class Sale(Base):
     id = Column(Integer, primary_key=True, index=True)
     order_number = Column(String(100), unique=True, nullable=False, index=True)
     order_date = Column(DateTime(timezone=True), nullable=False, index=True)
-    customer_id = Column(Integer, ForeignKey("customers.id"), nullable=False)
+    customer_id = Column(
+        Integer, ForeignKey("customers.id"), nullable=False, index=True
+    )
     total_amount = Column(Float, nullable=False)
     platform = Column(
         String(50), nullable=False, default="website"
@@ -146,10 +172,206 @@ class Customer(Base):
     email = Column(String(100), nullable=True, unique=True, index=True)
     phone = Column(String(20), nullable=True)
     address = Column(Text, nullable=True)
+    # Search keys, see app.db.search.customer_search_keys.
+    name_normalized = Column(String(100), nullable=True, index=True)
+    email_normalized = Column(String(100), nullable=True, index=True)
+    phone_digits = Column(String(20), nullable=True, index=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
     sales = relationship("Sale", back_populates="customer")
 
+    @validates("name", "email", "phone")
+    def _update_search_keys(self, key, value):
+        if key == "name":
+            self.name_normalized = normalize_name(value)
+        elif key == "email":
+            self.email_normalized = normalize_email(value)
+        else:
+            self.phone_digits = normalize_phone(value)
+        return value
+
     def __repr__(self):
         return f"<Customer {self.name}>"
+
+
+class CustomerStats(Base):
+    """Lifetime order totals per customer, kept current by crud sale writes."""
+
+    __tablename__ = "customer_stats"
+
+    customer_id = Column(Integer, ForeignKey("customers.id"), primary_key=True)
+    order_count = Column(Integer, nullable=False, default=0)
+    total_revenue = Column(Float, nullable=False, default=0)
+    first_order_date = Column(DateTime(timezone=True), nullable=True)
+    last_order_date = Column(DateTime(timezone=True), nullable=True)
+    updated_at = Column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
+
+    customer = relationship("Customer")
+
+    __table_args__ = (
+        Index("ix_customer_stats_total_revenue", "total_revenue"),
+        Index("ix_customer_stats_order_count", "order_count"),
+    )
+
+    def __repr__(self):
+        return f"<CustomerStats for customer_id={self.customer_id}>"
+
+
+class ProductDailySales(Base):
+    """Units and revenue per product, day and platform, kept current by crud."""
+
+    __tablename__ = "product_daily_sales"
+
+    day = Column(Date, primary_key=True)
+    product_id = Column(Integer, ForeignKey("products.id"), primary_key=True)
+    platform = Column(String(50), primary_key=True)
+    units = Column(Integer, nullable=False, default=0)
+    revenue = Column(Float, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<ProductDailySales {self.day} product_id={self.product_id}>"
+
+
+class DailySalesRollup(Base):
+    """Orders, revenue and sketches per day and platform, kept current by crud."""
+
+    __tablename__ = "daily_sales_rollups"
+
+    day = Column(Date, primary_key=True)
+    platform = Column(String(50), primary_key=True)
+    orders = Column(Integer, nullable=False, default=0)
+    revenue = Column(Float, nullable=False, default=0)
+    # HyperLogLog of the day's customer ids, see app.analytics.sketches.
+    customer_sketch = Column(LargeBinary, nullable=True)
+    # t-digest of the day's order totals.
+    order_value_sketch = Column(LargeBinary, nullable=True)
+
+    def __repr__(self):
+        return f"<DailySalesRollup {self.day} {self.platform}>"
+
+
+class PendingSaleSketch(Base):
+    """A sale counted in its daily rollup but not yet added to its sketches."""
+
+    __tablename__ = "pending_sale_sketches"
+
+    id = Column(Integer, primary_key=True)
+    day = Column(Date, nullable=False, index=True)
+    platform = Column(String(50), nullable=False)
+    customer_id = Column(Integer, nullable=False)
+    total_amount = Column(Float, nullable=False)
+
+    def __repr__(self):
+        return f"<PendingSaleSketch {self.day} {self.platform}>"
+
+
+class CustomerRFM(Base):
+    """Cached RFM scores, rewritten by app.analytics.customers."""
+
+    __tablename__ = "customer_rfm"
+
+    customer_id = Column(Integer, ForeignKey("customers.id"), primary_key=True)
+    recency_days = Column(Integer, nullable=False)
+    frequency = Column(Integer, nullable=False)
+    monetary = Column(Float, nullable=False)
+    r_score = Column(Integer, nullable=False)
+    f_score = Column(Integer, nullable=False)
+    m_score = Column(Integer, nullable=False)
+    segment = Column(String(30), nullable=False, index=True)
+    as_of = Column(Date, nullable=False)
+    computed_at = Column(DateTime(timezone=True), nullable=False)
+
+    def __repr__(self):
+        return f"<CustomerRFM {self.customer_id} {self.segment}>"
+
+
+class CohortRetention(Base):
+    """Cached monthly cohort retention, rewritten by app.analytics.customers."""
+
+    __tablename__ = "cohort_retention"
+
+    cohort_month = Column(String(7), primary_key=True)
+    months_since = Column(Integer, primary_key=True)
+    customers = Column(Integer, nullable=False)
+    retention = Column(Float, nullable=False)
+    computed_at = Column(DateTime(timezone=True), nullable=False)
+
+    def __repr__(self):
+        return f"<CohortRetention {self.cohort_month}+{self.months_since}>"
+
+
+class StockForecast(Base):
+    """Cached stock-out forecasts, rewritten by app.analytics.inventory."""
+
+    __tablename__ = "stock_forecasts"
+
+    product_id = Column(Integer, ForeignKey("products.id"), primary_key=True)
+    quantity = Column(Integer, nullable=False)
+    daily_velocity = Column(Float, nullable=False)
+    # Null when the product sold nothing in the trailing window.
+    days_of_cover = Column(Float, nullable=True, index=True)
+    stockout_date = Column(Date, nullable=True)
+    as_of = Column(Date, nullable=False)
+    computed_at = Column(DateTime(timezone=True), nullable=False)
+
+    def __repr__(self):
+        return f"<StockForecast {self.product_id} {self.stockout_date}>"
+
+
+class DashboardSnapshot(Base):
+    """Precomputed /dashboard/summary, rewritten by app.analytics.dashboard."""
+
+    __tablename__ = "dashboard_snapshots"
+
+    period_days = Column(Integer, primary_key=True)
+    end_date = Column(Date, nullable=False)
+    # The summary as JSON text.
+    payload = Column(Text, nullable=False)
+    computed_at = Column(DateTime(timezone=True), nullable=False)
+
+    def __repr__(self):
+        return f"<DashboardSnapshot {self.period_days}d {self.computed_at}>"
+
+
+class AnalyticsRefresh(Base):
+    """When each cached analytics result was last computed, even if empty."""
+
+    __tablename__ = "analytics_refreshes"
+
+    name = Column(String(100), primary_key=True)
+    computed_at = Column(DateTime(timezone=True), nullable=False)
+
+    def __repr__(self):
+        return f"<AnalyticsRefresh {self.name} {self.computed_at}>"
+
+
+class ScheduledJob(Base):
+    """Schedule and lease of one background job, shared by every worker."""
+
+    __tablename__ = "scheduled_jobs"
+
+    name = Column(String(100), primary_key=True)
+    next_run_at = Column(DateTime(timezone=True), nullable=False)
+    # Set while a worker runs the job; a lapsed lease can be claimed again.
+    owner = Column(String(100), nullable=True)
+    locked_until = Column(DateTime(timezone=True), nullable=True)
+    last_started_at = Column(DateTime(timezone=True), nullable=True)
+    last_duration_seconds = Column(Float, nullable=True)
+    last_error = Column(String(500), nullable=True)
+
+    def __repr__(self):
+        return f"<ScheduledJob {self.name}>"
+
+
+class CacheVersion(Base):
+    __tablename__ = "cache_versions"
+
+    namespace = Column(String(50), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    def __repr__(self):
+        return f"<CacheVersion {self.namespace}={self.version}>"
@@ -81,6 +81,7 @@ class InventoryUpdate(BaseModel):
 
 class InventoryInDB(InventoryBase):
     id: int
+    reorder_quantity: Optional[int] = None
     last_restock_date: Optional[datetime] = None
     created_at: datetime
     updated_at: Optional[datetime] = None
@@ -98,6 +99,8 @@ class InventoryHistoryBase(BaseModel):
     previous_quantity: int
     new_quantity: int
     change_reason: Optional[str] = None
+    previous_threshold: Optional[int] = None
+    new_threshold: Optional[int] = None
 
 
 class InventoryHistoryCreate(InventoryHistoryBase):
@@ -144,6 +147,20 @@ class Customer(CustomerInDB):
     pass
 
 
+class CustomerStats(BaseModel):
+    customer_id: int
+    order_count: int
+    total_revenue: float
+    average_order_value: float
+    first_order_date: Optional[datetime] = None
+    last_order_date: Optional[datetime] = None
+
+
+class TopCustomer(CustomerStats):
+    name: str
+    email: Optional[str] = None
+
+
 class SaleItemBase(BaseModel):
     product_id: int
     quantity: int
@@ -235,11 +252,111 @@ class RevenueAnalyticsResponse(BaseModel):
     revenue_by_period: Dict[str, float]
 
 
+class TopProduct(BaseModel):
+    rank: int
+    product_id: int
+    product_name: Optional[str] = None
+    units: int
+    revenue: float
+
+
+class UniqueCustomers(BaseModel):
+    unique_customers: int
+    orders: int
+    revenue: float
+
+
+class UniqueCustomersResponse(BaseModel):
+    group_by: str
+    # Relative standard error of every unique_customers estimate.
+    standard_error: float
+    total: UniqueCustomers
+    periods: Dict[str, UniqueCustomers]
+
+
+class OrderValuePercentiles(BaseModel):
+    orders: int
+    average_order_value: float
+    # Estimated from t-digests; None when there are no orders.
+    p50: Optional[float] = None
+    p90: Optional[float] = None
+    p99: Optional[float] = None
+
+
+class OrderValuePercentilesResponse(BaseModel):
+    group_by: str
+    total: OrderValuePercentiles
+    periods: Dict[str, OrderValuePercentiles]
+    platforms: Dict[str, OrderValuePercentiles]
+
+
+class RFMSegmentSummary(BaseModel):
+    segment: str
+    customers: int
+    share: float
+    average_recency_days: float
+    average_frequency: float
+    average_monetary: float
+    total_monetary: float
+
+
+class RFMSummaryResponse(BaseModel):
+    as_of: Optional[date] = None
+    computed_at: Optional[datetime] = None
+    segments: List[RFMSegmentSummary]
+
+
+class CustomerRFM(BaseModel):
+    customer_id: int
+    recency_days: int
+    frequency: int
+    monetary: float
+    r_score: int
+    f_score: int
+    m_score: int
+    segment: str
+
+    class Config:
+        orm_mode = True
+
+
+class CohortRow(BaseModel):
+    cohort: str
+    customers: int
+    # retention[n] is the share of the cohort ordering n months after its first.
+    retention: List[float]
+
+
+class CohortRetentionResponse(BaseModel):
+    computed_at: Optional[datetime] = None
+    cohorts: List[CohortRow]
+
+
 class LowStockAlert(BaseModel):
     product_id: int
     product_name: str
     current_quantity: int
     threshold: int
+    # Set once the reorder-point job has estimated the product's demand.
+    suggested_order_quantity: Optional[int] = None
+
+
+class StockForecast(BaseModel):
+    product_id: int
+    product_name: str
+    sku: str
+    quantity: int
+    daily_velocity: float
+    # None when the product sold nothing in the trailing window.
+    days_of_cover: Optional[float] = None
+    stockout_date: Optional[date] = None
+
+
+class StockForecastResponse(BaseModel):
+    as_of: Optional[date] = None
+    computed_at: Optional[datetime] = None
+    window_days: int
+    products: List[StockForecast]
 
 
 class InventoryAnalyticsResponse(BaseModel):
@@ -0,0 +1,91 @@
+"""Application import-time benchmark.
+
+Usage:
+    python -m benchmarks.bench_import [--runs 5] [--budget-ms 1500]
+
+Imports ``main`` in fresh interpreters and reports the best wall time, the
+slowest modules from ``python -X importtime`` and whether any heavy optional
+module (pandas, pyarrow, duckdb) was loaded. Exits with status 1 when the
+import exceeds ``--budget-ms`` or loads a heavy module, so it can guard CI.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+HEAVY_MODULES = ("pandas", "pyarrow", "duckdb")
+
+# The database is never opened during import; the URL only has to parse.
+ENV = {"DATABASE_URL": "sqlite:///./import-benchmark.db"}
+
+PROBE = (
+    "import sys, main; "
+    f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+)
+
+
+def _python(*args: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *args],
+        env={**os.environ, **ENV},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def slowest_modules(count: int = 10) -> list:
+    """``(cumulative_ms, module)`` of the slowest top-level imports."""
+    stderr = _python("-X", "importtime", "-c", "import main").stderr
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        # Indentation is the import depth; report direct imports of main.
+        if len(name) - len(name.lstrip()) <= 3:
+            modules.append((int(cumulative) / 1000, name.strip()))
+    return sorted(modules, reverse=True)[:count]
+
+
+def run(runs: int) -> dict:
+    timings = []
+    heavy = ""
+    for _ in range(runs):
+        start = time.perf_counter()
+        heavy = _python("-c", PROBE).stdout.strip()
+        timings.append(time.perf_counter() - start)
+    return {
+        "runs": runs,
+        "best_ms": round(min(timings) * 1000, 1),
+        "heavy_modules": heavy.split(",") if heavy else [],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=1500)
+    args = parser.parse_args()
+
+    result = run(args.runs)
+    for name, value in result.items():
+        print(f"{name:>14}: {value}")
+    print("slowest imports (cumulative ms):")
+    for elapsed, module in slowest_modules():
+        print(f"{elapsed:>10.1f}  {module}")
+
+    failed = False
+    if result["best_ms"] > args.budget_ms:
+        print(f"FAIL: import took {result['best_ms']} ms > {args.budget_ms} ms")
+        failed = True
+    if result["heavy_modules"]:
+        print(f"FAIL: heavy modules imported: {', '.join(result['heavy_modules'])}")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
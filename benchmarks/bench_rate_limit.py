@@ -0,0 +1,61 @@
+"""Rate limiter micro-benchmark.
+
+Usage:
+    python -m benchmarks.bench_rate_limit [--keys 100000] [--rounds 5]
+        [--backend memory|shared]
+
+Fills the limiter with ``--keys`` distinct client keys, then measures the
+per-call cost of ``acquire`` over repeated passes, and the cache size, which
+must stay bounded by ``max_keys``.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from app.core.rate_limit import MemoryBackend, RateLimiter, SharedMemoryBackend
+
+
+def run(keys: int, rounds: int, max_keys: int, backend: str = "memory") -> dict:
+    if backend == "shared":
+        path = os.path.join(tempfile.mkdtemp(), "rate-limit.bin")
+        store = SharedMemoryBackend(path, slots=max_keys - max_keys % 8)
+    else:
+        store = MemoryBackend(max_keys=max_keys)
+    limiter = RateLimiter(calls=100, period=60, backend=store)
+    names = [f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}" for i in range(keys)]
+
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for name in names:
+            limiter.acquire(name)
+        timings.append(time.perf_counter() - start)
+
+    best = min(timings)
+    return {
+        "backend": backend,
+        "keys": keys,
+        "rounds": rounds,
+        "best_round_s": round(best, 4),
+        "ns_per_call": round(best / keys * 1e9, 1),
+        "calls_per_s": round(keys / best),
+        "cached_keys": len(store.cache) if backend == "memory" else store.slots,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--keys", type=int, default=100_000)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--max-keys", type=int, default=100_000)
+    parser.add_argument("--backend", choices=["memory", "shared"], default="memory")
+    args = parser.parse_args()
+
+    result = run(args.keys, args.rounds, args.max_keys, args.backend)
+    for name, value in result.items():
+        print(f"{name:>14}: {value}")
+
+
+if __name__ == "__main__":
+    main()
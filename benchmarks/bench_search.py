@@ -0,0 +1,100 @@
+"""Product search benchmark.
+
+Usage:
+    python -m benchmarks.bench_search [--products 1000000] [--queries 200]
+
+Loads ``--products`` synthetic products into a temporary SQLite database (FTS5
+index included), then reports the median and p95 latency of
+``crud.search_products`` for SKU prefixes and full-text queries.
+"""
+
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.crud import crud
+from app.db.session import Base
+from app.models.models import Category, Product
+
+# A catalog-sized vocabulary: 1,000 made-up words built from syllables.
+SYLLABLES = "ka lo mi ne ru sa te vo zi pa".split()
+WORDS = [a + b + c for a in SYLLABLES for b in SYLLABLES for c in SYLLABLES]
+NOUNS = "shirt jacket boot lamp chair mug kettle backpack watch desk".split()
+
+
+def _load(db, products: int, batch: int = 50_000) -> None:
+    rng = random.Random(7)
+    db.add(Category(id=1, name="Benchmark"))
+    db.commit()
+    for start in range(0, products, batch):
+        rows = [
+            {
+                "sku": f"{NOUNS[i % len(NOUNS)][:3].upper()}-{i:07d}",
+                "name": " ".join(rng.sample(WORDS, 2) + [NOUNS[i % len(NOUNS)]]),
+                "description": " ".join(rng.sample(WORDS, 6)),
+                "price": 1.0,
+                "category_id": 1,
+            }
+            for i in range(start, min(start + batch, products))
+        ]
+        db.execute(insert(Product), rows)
+        db.commit()
+
+
+def _time(db, queries: list) -> dict:
+    timings = []
+    for q in queries:
+        start = time.perf_counter()
+        crud.search_products(db, q, limit=20)
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return {
+        "median_ms": round(statistics.median(timings) * 1000, 2),
+        "p95_ms": round(timings[int(len(timings) * 0.95)] * 1000, 2),
+    }
+
+
+def run(products: int, queries: int) -> dict:
+    path = os.path.join(tempfile.mkdtemp(), "search.db")
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+
+    start = time.perf_counter()
+    _load(db, products)
+    load_seconds = time.perf_counter() - start
+
+    rng = random.Random(11)
+    sku_queries = [
+        f"{rng.choice(NOUNS)[:3].upper()}-{rng.randrange(products):07d}"[:7]
+        for _ in range(queries)
+    ]
+    text_queries = [
+        f"{rng.choice(WORDS)} {rng.choice(NOUNS)[:4]}" for _ in range(queries)
+    ]
+    return {
+        "products": products,
+        "load_seconds": round(load_seconds, 1),
+        "sku_prefix": _time(db, sku_queries),
+        "full_text": _time(db, text_queries),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--products", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    for name, value in run(args.products, args.queries).items():
+        print(f"{name:>14}: {value}")
+
+
+if __name__ == "__main__":
+    main()
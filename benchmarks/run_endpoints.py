@@ -0,0 +1,506 @@
+"""Endpoint benchmark suite.
+
+Seeds a database at the requested scale, drives every route of the API
+in-process (sequentially, then under concurrent load), and writes latency
+percentiles, throughput and SQL query counts per route to JSON. With
+``--baseline`` the run is compared against a previous result and the exit
+status is 1 if any route's p95 regressed by more than ``--tolerance``.
+
+Usage:
+    python -m benchmarks.run_endpoints --scale 10k
+    python -m benchmarks.run_endpoints --scale 1m --concurrency 32 \\
+        --output benchmarks/results/1m.json --baseline benchmarks/baseline/1m.json
+    python -m benchmarks.run_endpoints --db-url mysql+pymysql://u:p@localhost/bench
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import platform
+import statistics
+from datetime import date, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+Request = Tuple[str, str, dict]
+
+SCALES = {"10k": 10_000, "1m": 1_000_000, "10m": 10_000_000}
+
+
+class RouteCase:
+    """One route to drive; ``build(i)`` returns ``(method, url, kwargs)``."""
+
+    def __init__(self, name: str, build: Callable[[int], Request], setup=None):
+        self.name = name
+        self.build = build
+        self.setup = setup
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = max(
+        0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values)) - 1)
+    )
+    return sorted_values[index]
+
+
+def build_cases(sizes: Dict[str, int], prefix: str) -> List[RouteCase]:
+    products = sizes["products"]
+    customers = sizes["customers"]
+    sales = sizes["sales"]
+    today = date.today()
+    month_ago = (today - timedelta(days=30)).isoformat()
+    quarter_ago = (today - timedelta(days=90)).isoformat()
+    year_ago = (today - timedelta(days=365)).isoformat()
+    # Rows consumed by destructive routes, made by each case's own ``setup``.
+    disposable: Dict[str, List[int]] = {
+        "categories": [],
+        "products": [],
+        "unstocked_products": [],
+    }
+
+    def get(path, **params):
+        return lambda i: ("GET", prefix + path(i), {"params": params})
+
+    async def create_category(i, client):
+        category = await client(
+            "POST", prefix + "/categories/", {"json": {"name": f"tmp-{i}"}}
+        )
+        disposable["categories"].append(category["id"])
+
+    async def _create_product(i, client, sku):
+        product = await client(
+            "POST",
+            prefix + "/products/",
+            {"json": {"name": sku, "sku": sku, "price": 1.0, "category_id": 1}},
+        )
+        return product["id"]
+
+    async def create_product(i, client):
+        disposable["products"].append(await _create_product(i, client, f"TMP-{i}"))
+
+    async def create_unstocked_product(i, client):
+        product_id = await _create_product(i, client, f"TMP-STOCK-{i}")
+        disposable["unstocked_products"].append(product_id)
+
+    return [
+        RouteCase("GET /categories/", get(lambda i: "/categories/")),
+        RouteCase("GET /categories/{id}", get(lambda i: f"/categories/{i % 8 + 1}")),
+        RouteCase(
+            "POST /categories/",
+            lambda i: (
+                "POST",
+                prefix + "/categories/",
+                {"json": {"name": f"bench-{i}"}},
+            ),
+        ),
+        RouteCase(
+            "PUT /categories/{id}",
+            lambda i: (
+                "PUT",
+                prefix + f"/categories/{i % 8 + 1}",
+                {"json": {"description": f"updated {i}"}},
+            ),
+        ),
+        RouteCase(
+            "DELETE /categories/{id}",
+            lambda i: (
+                "DELETE",
+                prefix + f"/categories/{disposable['categories'][i]}",
+                {},
+            ),
+            setup=create_category,
+        ),
+        RouteCase("GET /products/", get(lambda i: "/products/", category_id=1)),
+        RouteCase("GET /products/{id}", get(lambda i: f"/products/{i % products + 1}")),
+        RouteCase(
+            "POST /products/",
+            lambda i: (
+                "POST",
+                prefix + "/products/",
+                {
+                    "json": {
+                        "name": f"bench-{i}",
+                        "sku": f"BENCH-NEW-{i}",
+                        "price": 9.99,
+                        "category_id": i % 8 + 1,
+                    }
+                },
+            ),
+        ),
+        RouteCase(
+            "PUT /products/{id}",
+            lambda i: (
+                "PUT",
+                prefix + f"/products/{i % products + 1}",
+                {"json": {"description": f"updated {i}"}},
+            ),
+        ),
+        RouteCase(
+            "DELETE /products/{id}",
+            lambda i: ("DELETE", prefix + f"/products/{disposable['products'][i]}", {}),
+            setup=create_product,
+        ),
+        RouteCase(
+            "GET /products/search",
+            get(lambda i: "/products/search", q="benchmark product"),
+        ),
+        RouteCase(
+            "POST /inventory/",
+            lambda i: (
+                "POST",
+                prefix + "/inventory/",
+                {
+                    "json": {
+                        "product_id": disposable["unstocked_products"][i],
+                        "quantity": 100,
+                    }
+                },
+            ),
+            setup=create_unstocked_product,
+        ),
+        RouteCase("GET /inventory/", get(lambda i: "/inventory/", low_stock_only=True)),
+        RouteCase(
+            "GET /inventory/{id}", get(lambda i: f"/inventory/{i % products + 1}")
+        ),
+        RouteCase(
+            "GET /inventory/product/{id}",
+            get(lambda i: f"/inventory/product/{i % products + 1}"),
+        ),
+        RouteCase(
+            "PUT /inventory/{id}",
+            lambda i: (
+                "PUT",
+                prefix + f"/inventory/{i % products + 1}",
+                {"json": {"quantity": 1000 + i}, "params": {"change_reason": "bench"}},
+            ),
+        ),
+        RouteCase(
+            "GET /inventory/{id}/history",
+            get(lambda i: f"/inventory/{i % products + 1}/history"),
+        ),
+        RouteCase("GET /inventory/low-stock", get(lambda i: "/inventory/low-stock")),
+        RouteCase(
+            "GET /inventory/forecast",
+            get(lambda i: "/inventory/forecast", horizon_days=30),
+        ),
+        RouteCase(
+            "POST /customers/",
+            lambda i: (
+                "POST",
+                prefix + "/customers/",
+                {"json": {"name": f"Bench {i}", "email": f"bench{i}@example.com"}},
+            ),
+        ),
+        RouteCase("GET /customers/", get(lambda i: "/customers/")),
+        RouteCase(
+            "GET /customers/search", get(lambda i: "/customers/search", q="customer1")
+        ),
+        RouteCase("GET /customers/top", get(lambda i: "/customers/top")),
+        RouteCase(
+            "GET /customers/{id}", get(lambda i: f"/customers/{i % customers + 1}")
+        ),
+        RouteCase(
+            "GET /customers/{id}/stats",
+            get(lambda i: f"/customers/{i % customers + 1}/stats"),
+        ),
+        RouteCase(
+            "PUT /customers/{id}",
+            lambda i: (
+                "PUT",
+                prefix + f"/customers/{i % customers + 1}",
+                {"json": {"address": f"{i} Bench Street"}},
+            ),
+        ),
+        RouteCase(
+            "POST /sales/",
+            lambda i: (
+                "POST",
+                prefix + "/sales/",
+                {
+                    "json": {
+                        "order_number": f"BENCH-NEW-{i}",
+                        "order_date": f"{today.isoformat()}T12:00:00",
+                        "customer_id": i % customers + 1,
+                        "total_amount": 10.0,
+                        "items": [
+                            {
+                                "product_id": i % products + 1,
+                                "quantity": 1,
+                                "unit_price": 10.0,
+                            }
+                        ],
+                    }
+                },
+            ),
+        ),
+        RouteCase("GET /sales/", get(lambda i: "/sales/", start_date=month_ago)),
+        RouteCase("GET /sales/{id}", get(lambda i: f"/sales/{i % sales + 1}")),
+        RouteCase(
+            "GET /sales/order/{order_number}",
+            get(lambda i: f"/sales/order/BENCH-{i % sales + 1:09d}"),
+        ),
+        RouteCase(
+            "PUT /sales/{id}",
+            lambda i: (
+                "PUT",
+                prefix + f"/sales/{i % sales + 1}",
+                {"json": {"status": "completed"}},
+            ),
+        ),
+        RouteCase(
+            "POST /analytics/sales",
+            lambda i: (
+                "POST",
+                prefix + "/analytics/sales",
+                {"json": {"start_date": month_ago, "end_date": today.isoformat()}},
+            ),
+        ),
+        RouteCase(
+            "POST /analytics/revenue",
+            lambda i: (
+                "POST",
+                prefix + "/analytics/revenue",
+                {
+                    "json": {
+                        "start_date": year_ago,
+                        "end_date": today.isoformat(),
+                        "group_by": "month",
+                        "category_id": i % 8 + 1,
+                    }
+                },
+            ),
+        ),
+        RouteCase(
+            "POST /analytics/inventory",
+            lambda i: (
+                "POST",
+                prefix + "/analytics/inventory",
+                {"json": {"low_stock_only": True}},
+            ),
+        ),
+        RouteCase(
+            "GET /analytics/top-products",
+            get(lambda i: "/analytics/top-products", start_date=month_ago),
+        ),
+        RouteCase(
+            "GET /analytics/unique-customers",
+            get(
+                lambda i: "/analytics/unique-customers",
+                start_date=year_ago,
+                group_by="month",
+            ),
+        ),
+        RouteCase(
+            "GET /analytics/order-values",
+            get(
+                lambda i: "/analytics/order-values",
+                start_date=year_ago,
+                group_by="month",
+            ),
+        ),
+        RouteCase(
+            "GET /analytics/customers/rfm", get(lambda i: "/analytics/customers/rfm")
+        ),
+        RouteCase(
+            "GET /analytics/customers/rfm/{segment}",
+            get(lambda i: "/analytics/customers/rfm/champions"),
+        ),
+        RouteCase(
+            "GET /analytics/customers/cohorts",
+            get(lambda i: "/analytics/customers/cohorts"),
+        ),
+        RouteCase(
+            "POST /analytics/revenue/compare",
+            lambda i: (
+                "POST",
+                prefix + "/analytics/revenue/compare",
+                {
+                    "params": {
+                        "current_start": quarter_ago,
+                        "current_end": today.isoformat(),
+                    }
+                },
+            ),
+        ),
+        RouteCase(
+            "GET /dashboard/summary",
+            lambda i: (
+                "GET",
+                prefix + "/dashboard/summary",
+                {"params": {"period_days": (7, 30, 90, 365)[i % 4]}},
+            ),
+        ),
+        # Outside the API prefix.
+        RouteCase("GET /health/jobs", lambda i: ("GET", "/health/jobs", {})),
+    ]
+
+
+async def drive(client, case: RouteCase, offset: int, count: int, concurrency: int):
+    latencies: List[float] = []
+    queries: List[int] = []
+    errors = 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int):
+        nonlocal errors
+        method, url, kwargs = case.build(offset + i)
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.request(method, url, **kwargs)
+            latencies.append(time.perf_counter() - start)
+        if response.status_code >= 400:
+            errors += 1
+        queries.append(int(response.headers.get("x-db-queries", 0)))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(count)))
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": count,
+        "errors": errors,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 3),
+        "throughput_rps": round(count / wall, 1),
+        "queries_per_request": round(statistics.fmean(queries), 2),
+    }
+
+
+async def run_suite(app, cases, requests: int, concurrency: int, only: Optional[str]):
+    import httpx
+
+    transport = httpx.ASGITransport(app=app)
+    results = {}
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as client:
+
+        async def call(method, url, kwargs):
+            response = await client.request(method, url, **kwargs)
+            response.raise_for_status()
+            return response.json()
+
+        for case in cases:
+            if only and only not in case.name:
+                continue
+            if case.setup is not None:
+                for i in range(requests * 2):
+                    await case.setup(i, call)
+            results[case.name] = {
+                "sequential": await drive(client, case, 0, requests, 1),
+                "concurrent": await drive(
+                    client, case, requests, requests, concurrency
+                ),
+            }
+            print(
+                f"{case.name:<36} p50 {results[case.name]['sequential']['p50_ms']:>9.2f}ms"
+                f"  p95 {results[case.name]['sequential']['p95_ms']:>9.2f}ms"
+                f"  {results[case.name]['concurrent']['throughput_rps']:>8.1f} req/s"
+                f"  {results[case.name]['sequential']['queries_per_request']:>6.1f} q/req"
+            )
+    return results
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> List[str]:
+    regressions = []
+    for name, result in current["routes"].items():
+        previous = baseline.get("routes", {}).get(name)
+        if previous is None:
+            continue
+        for mode in ("sequential", "concurrent"):
+            now_p95 = result[mode]["p95_ms"]
+            then_p95 = previous[mode]["p95_ms"]
+            # Ignore sub-millisecond noise on very fast routes.
+            if now_p95 > then_p95 * (1 + tolerance) and now_p95 - then_p95 > 1.0:
+                regressions.append(
+                    f"{name} [{mode}] p95 {then_p95:.2f}ms -> {now_p95:.2f}ms"
+                )
+        if (
+            result["sequential"]["queries_per_request"]
+            > previous["sequential"]["queries_per_request"]
+        ):
+            regressions.append(
+                f"{name} queries/request "
+                f"{previous['sequential']['queries_per_request']} -> "
+                f"{result['sequential']['queries_per_request']}"
+            )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark every API route.")
+    parser.add_argument("--scale", choices=["10k", "1m", "10m"], default="10k")
+    parser.add_argument("--sales", type=int, help="Exact number of sales to seed")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--db-url", help="Defaults to benchmarks/data/<scale>.db")
+    parser.add_argument("--requests", type=int, default=50, help="Requests per route")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--only", help="Only run routes whose name contains this")
+    parser.add_argument("--output", default="benchmarks/results/latest.json")
+    parser.add_argument("--baseline", help="Previous result JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    sales = args.sales or SCALES[args.scale]
+    db_url = args.db_url
+    if db_url is None:
+        os.makedirs("benchmarks/data", exist_ok=True)
+        db_url = f"sqlite:///benchmarks/data/{sales}-{args.seed}.db"
+
+    # The app reads its configuration at import time.
+    os.environ["DATABASE_URL"] = db_url
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+    os.environ.setdefault("LOG_LEVEL", "ERROR")
+    os.environ.setdefault("API_V1_STR", "/api/v1")
+
+    from app.db.session import engine
+    from benchmarks.seed import seed
+    from main import app
+
+    print(f"Seeding {sales} sales into {engine.url.render_as_string()} ...")
+    sizes = seed(engine, sales, seed=args.seed)
+    print(f"Seeded: {sizes}")
+
+    cases = build_cases(sizes, os.environ["API_V1_STR"])
+    routes = asyncio.run(
+        run_suite(app, cases, args.requests, args.concurrency, args.only)
+    )
+    result = {
+        "meta": {
+            "sales": sales,
+            "seed": args.seed,
+            "dialect": engine.dialect.name,
+            "requests_per_route": args.requests,
+            "concurrency": args.concurrency,
+            "python": platform.python_version(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "sizes": sizes,
+        "routes": routes,
+    }
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(result, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(result, json.load(f), args.tolerance)
+        if regressions:
+            print("Regressions against baseline:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print("No regressions against baseline.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""Deterministic bulk seeding of a benchmark database.
+
+Rows are generated from a fixed seed and inserted with Core ``executemany``
+batches, so the same ``--sales`` and ``--seed`` always produce the same
+database and runs are comparable.
+"""
+
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.engine import Engine
+
+from app.crud.crud import (
+    rebuild_customer_stats,
+    rebuild_daily_sales_rollups,
+    rebuild_product_daily_sales,
+)
+from app.db.search import customer_search_keys
+from app.db.session import Base
+from app.models.models import (
+    Category,
+    Customer,
+    Inventory,
+    Product,
+    Sale,
+    SaleItem,
+)
+
+PLATFORMS = ["Amazon", "Walmart", "Website", "eBay", "Etsy"]
+STATUSES = ["completed", "pending", "cancelled", "refunded"]
+BATCH_SIZE = 10_000
+
+
+def scale_sizes(sales: int) -> Dict[str, int]:
+    return {
+        "categories": 8,
+        "products": max(40, sales // 250),
+        "customers": max(20, sales // 10),
+        "sales": sales,
+    }
+
+
+def _insert_batches(conn, table, rows: List[dict]) -> None:
+    for start in range(0, len(rows), BATCH_SIZE):
+        conn.execute(insert(table), rows[start : start + BATCH_SIZE])
+
+
+def seed(engine: Engine, sales: int, seed: int = 42, days: int = 730) -> Dict[str, int]:
+    """Create the schema and fill it; returns the row counts per table.
+
+    Does nothing if the database already holds ``sales`` sales.
+    """
+    Base.metadata.create_all(bind=engine)
+    with engine.connect() as conn:
+        existing = conn.execute(select(func.count()).select_from(Sale)).scalar()
+    sizes = scale_sizes(sales)
+    if existing == sales:
+        return sizes
+    if existing:
+        raise RuntimeError(
+            f"Database already holds {existing} sales; use a fresh database file"
+        )
+
+    rng = random.Random(seed)
+    # Dates are relative to today so dashboard windows always contain data.
+    now = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    started = time.perf_counter()
+
+    with engine.begin() as conn:
+        _insert_batches(
+            conn,
+            Category.__table__,
+            [
+                {"id": i, "name": f"Category {i}", "description": f"Category {i}"}
+                for i in range(1, sizes["categories"] + 1)
+            ],
+        )
+
+        prices = {}
+        product_rows = []
+        for i in range(1, sizes["products"] + 1):
+            prices[i] = round(rng.uniform(5, 500), 2)
+            product_rows.append(
+                {
+                    "id": i,
+                    "name": f"Product {i}",
+                    "description": f"Benchmark product {i}",
+                    "sku": f"BENCH-{i:08d}",
+                    "price": prices[i],
+                    "category_id": rng.randint(1, sizes["categories"]),
+                }
+            )
+        _insert_batches(conn, Product.__table__, product_rows)
+        _insert_batches(
+            conn,
+            Inventory.__table__,
+            [
+                {
+                    "id": i,
+                    "product_id": i,
+                    "quantity": rng.randint(0, 1000),
+                    "location": "Warehouse A",
+                    "low_stock_threshold": 10,
+                }
+                for i in range(1, sizes["products"] + 1)
+            ],
+        )
+        _insert_batches(
+            conn,
+            Customer.__table__,
+            [
+                {
+                    "id": i,
+                    "name": f"Customer {i}",
+                    "email": f"customer{i}@example.com",
+                    "phone": f"555-{i:07d}",
+                    **customer_search_keys(
+                        f"Customer {i}", f"customer{i}@example.com", f"555-{i:07d}"
+                    ),
+                }
+                for i in range(1, sizes["customers"] + 1)
+            ],
+        )
+
+    item_id = 0
+    product_ids = list(prices)
+    for start in range(1, sales + 1, BATCH_SIZE):
+        sale_rows, item_rows = [], []
+        for sale_id in range(start, min(start + BATCH_SIZE, sales + 1)):
+            total = 0.0
+            for product_id in rng.sample(product_ids, rng.randint(1, 4)):
+                item_id += 1
+                quantity = rng.choice((1, 1, 1, 2, 2, 3))
+                discount = round(prices[product_id] * rng.uniform(0, 0.2), 2)
+                total += quantity * (prices[product_id] - discount)
+                item_rows.append(
+                    {
+                        "id": item_id,
+                        "sale_id": sale_id,
+                        "product_id": product_id,
+                        "quantity": quantity,
+                        "unit_price": prices[product_id],
+                        "discount": discount,
+                    }
+                )
+            sale_rows.append(
+                {
+                    "id": sale_id,
+                    "order_number": f"BENCH-{sale_id:09d}",
+                    "order_date": now - timedelta(seconds=rng.randint(0, days * 86400)),
+                    "customer_id": rng.randint(1, sizes["customers"]),
+                    "total_amount": round(total, 2),
+                    "platform": rng.choice(PLATFORMS),
+                    "status": rng.choices(STATUSES, weights=(80, 10, 5, 5))[0],
+                }
+            )
+        with engine.begin() as conn:
+            conn.execute(insert(Sale.__table__), sale_rows)
+            conn.execute(insert(SaleItem.__table__), item_rows)
+    with engine.begin() as conn:
+        rebuild_customer_stats(conn)
+        rebuild_product_daily_sales(conn)
+        rebuild_daily_sales_rollups(conn)
+
+    sizes["sale_items"] = item_id
+    sizes["seconds"] = round(time.perf_counter() - started, 1)
+    return sizes
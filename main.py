@@ -1,31 +1,55 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.openapi.docs import get_swagger_ui_html, get_redoc_html
-from fastapi.staticfiles import StaticFiles
-import os
-from dotenv import load_dotenv
+from fastapi.responses import JSONResponse, PlainTextResponse
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
 
 from app.api.api import api_router
 from app.db.session import engine, Base
+from app.core.config import settings
 from app.core.docs import tags_metadata, API_DESCRIPTION
+from app.core.metrics import registry as metrics_registry
+from app.core.logging_config import setup_logging, shutdown_logging
+from app.core.health import health_monitor
+from app.db.cache_versions import cache_version_poller
+from app.core.scheduler import register_default_jobs, scheduler
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    setup_logging()
+    # Schema changes are normally applied with Alembic; creating tables here
+    # is opt-in so importing the app never touches the database.
+    if settings.CREATE_TABLES_ON_STARTUP:
+        Base.metadata.create_all(bind=engine)
+    health_monitor.start()
+    cache_version_poller.start()
+    if settings.SCHEDULER_ENABLED:
+        register_default_jobs(scheduler)
+        scheduler.start()
+    yield
+    scheduler.stop()
+    cache_version_poller.stop()
+    health_monitor.stop()
+    shutdown_logging()
 
-# Load environment variables
-load_dotenv()
 
 # Create FastAPI app
 app = FastAPI(
-    title=os.getenv("PROJECT_NAME", "E-commerce Admin Dashboard API"),
+    title=settings.PROJECT_NAME,
     description=API_DESCRIPTION,
     version="1.0.0",
     openapi_tags=tags_metadata,
     docs_url=None,
     redoc_url=None,
+    lifespan=lifespan,
 )
 
 # Set up CORS
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],  # In production, replace with specific origins
+    allow_origins=settings.CORS_ORIGINS,  # In production, list specific origins
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
@@ -36,11 +60,8 @@ from app.core.middleware import RequestLoggingMiddleware
 
 app.add_middleware(RequestLoggingMiddleware)
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
-
 # Include API router
-app.include_router(api_router, prefix=os.getenv("API_V1_STR", "/api"))
+app.include_router(api_router, prefix=settings.API_V1_STR)
 
 
 @app.get("/")
@@ -74,16 +95,54 @@ async def redoc_html():
     )
 
 
-# Add health check endpoint
+# Health checks answer from state cached by the background health monitor.
 @app.get("/health", tags=["status"])
 async def health_check():
     """
     Health check endpoint to verify the API is running properly.
     Returns status information about the API and its connections.
     """
-    return {
-        "status": "ok",
-        "api_version": app.version,
-        "database": "connected",  # In a real app, check the DB connection
-        "timestamp": os.popen("date").read().strip(),
-    }
+    readiness = health_monitor.readiness()
+    return JSONResponse(
+        {
+            "status": readiness["status"],
+            "api_version": app.version,
+            "database": (
+                "connected" if readiness["checks"]["database"] else "unavailable"
+            ),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+        },
+        status_code=200 if readiness["status"] == "ok" else 503,
+    )
+
+
+@app.get("/health/live", tags=["status"])
+async def liveness():
+    """Liveness probe: the process is running and serving requests."""
+    return health_monitor.liveness()
+
+
+@app.get("/health/ready", tags=["status"])
+async def readiness():
+    """
+    Readiness probe: the last background database ping succeeded, the
+    connection pool has capacity and the event loop is responsive.
+    """
+    readiness = health_monitor.readiness()
+    return JSONResponse(
+        readiness, status_code=200 if readiness["status"] == "ok" else 503
+    )
+
+
+@app.get("/health/jobs", tags=["status"])
+def scheduled_jobs():
+    """Schedule, last run, duration and error of every background job."""
+    return scheduler.status()
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics in text exposition format."""
+    return PlainTextResponse(
+        metrics_registry.render(), media_type="text/plain; version=0.0.4"
+    )
@@ -0,0 +1,44 @@
+"""Recompute RFM segments and cohort retention.
+
+Usage:
+    python scripts/compute_customer_analytics.py
+    python scripts/compute_customer_analytics.py --as-of 2024-12-31
+
+The endpoints under ``/analytics/customers/`` refresh stale results on their
+own; run this from cron to keep them fresh without a request paying for it.
+"""
+
+import os
+import sys
+import argparse
+from datetime import date
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.core.config import settings
+from app.db.session import engine
+from app.analytics.customers import refresh_customer_analytics
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Compute customer analytics.")
+    parser.add_argument(
+        "--as-of", type=date.fromisoformat, help="Recency reference date (today)"
+    )
+    parser.add_argument(
+        "--chunk-size", type=int, default=settings.CUSTOMER_ANALYTICS_CHUNK_SIZE
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    result = refresh_customer_analytics(engine, args.as_of, args.chunk_size)
+    print(
+        f"Scored {result['customers']} customers and {result['cohort_cells']} "
+        f"cohort cells in {result['seconds']:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,506 +1,723 @@
+"""Generate demo data at any scale.
+
+Usage:
+    python scripts/create_demo_data.py
+    python scripts/create_demo_data.py --reset --sales 5000000 --customers 500000 \\
+        --products 20000 --workers 8 --seed 7
+
+Sales are generated in chunks by a process pool with NumPy: product
+popularity follows a power law, order timing follows yearly and weekly
+seasonality with a growth trend, and rows are written with Core
+``executemany`` batches. On MySQL/PostgreSQL each worker inserts its own
+chunks; SQLite allows a single writer, so workers only generate rows and the
+parent process inserts them. Inventory levels and history are derived from
+the units actually sold, so the history chain always ends at the current
+quantity. The same ``--seed`` always produces the same data.
+"""
+
 import os
 import sys
-import random
+import time
+import argparse
+import multiprocessing
 from datetime import datetime, timedelta
+from typing import List, NamedTuple, Optional
+
+import numpy as np
 from faker import Faker
-from sqlalchemy.orm import Session
-from dotenv import load_dotenv
+from sqlalchemy import create_engine, func, insert, select
+from sqlalchemy.pool import NullPool
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
-from app.db.session import SessionLocal
+from app.crud.crud import (
+    rebuild_customer_stats,
+    rebuild_daily_sales_rollups,
+    rebuild_product_daily_sales,
+)
+from app.db.search import customer_search_keys
+from app.db.session import Base, engine
 from app.models.models import (
     Category,
     Product,
     Inventory,
+    InventoryHistory,
     Customer,
     Sale,
     SaleItem,
-    Base,
-    engine,
 )
-from app.schemas import schemas
-
-load_dotenv()
-
-fake = Faker()
-
 
-def create_categories() -> list:
-    categories = [
-        {"name": "Electronics", "description": "Electronic devices and gadgets"},
-        {"name": "Clothing", "description": "Apparel and fashion items"},
-        {"name": "Home & Kitchen", "description": "Household items and appliances"},
-        {"name": "Books", "description": "Books, e-books, and audiobooks"},
-        {
-            "name": "Sports & Outdoors",
-            "description": "Sporting gear and outdoor equipment",
-        },
-        {
-            "name": "Beauty & Personal Care",
-            "description": "Cosmetics and personal care products",
-        },
-        {"name": "Toys & Games", "description": "Toys, games, and entertainment items"},
-        {"name": "Grocery", "description": "Food and grocery items"},
+PLATFORMS = ["Amazon", "Walmart", "Website", "eBay", "Etsy"]
+PLATFORM_WEIGHTS = [0.35, 0.2, 0.25, 0.12, 0.08]
+STATUSES = ["completed", "pending", "cancelled", "refunded"]
+STATUS_WEIGHTS = [0.8, 0.1, 0.05, 0.05]
+# Probability of an order having 1..5 lines, and a line having quantity 1..3.
+ITEM_COUNT_WEIGHTS = [0.45, 0.25, 0.15, 0.1, 0.05]
+QUANTITY_WEIGHTS = [0.6, 0.3, 0.1]
+# Share of orders per hour of day, peaking in the evening.
+HOUR_WEIGHTS = np.array(
+    [1, 0.6, 0.4, 0.3, 0.3, 0.4, 0.8, 1.5, 2.5, 3, 3.2, 3.4]
+    + [3.6, 3.5, 3.3, 3.2, 3.4, 3.8, 4.4, 5, 5.2, 4.6, 3.2, 1.8]
+)
+HOUR_WEIGHTS = HOUR_WEIGHTS / HOUR_WEIGHTS.sum()
+# Monday..Sunday
+WEEKDAY_FACTORS = np.array([0.95, 0.93, 0.95, 0.98, 1.05, 1.12, 1.02])
+
+CATEGORIES = [
+    {"name": "Electronics", "description": "Electronic devices and gadgets"},
+    {"name": "Clothing", "description": "Apparel and fashion items"},
+    {"name": "Home & Kitchen", "description": "Household items and appliances"},
+    {"name": "Books", "description": "Books, e-books, and audiobooks"},
+    {
+        "name": "Sports & Outdoors",
+        "description": "Sporting gear and outdoor equipment",
+    },
+    {
+        "name": "Beauty & Personal Care",
+        "description": "Cosmetics and personal care products",
+    },
+    {"name": "Toys & Games", "description": "Toys, games, and entertainment items"},
+    {"name": "Grocery", "description": "Food and grocery items"},
+]
+
+ELECTRONICS_PRODUCTS = [
+    {
+        "name": "Smartphone X",
+        "description": "Latest smartphone with advanced features",
+        "price": 999.99,
+        "sku": "ELEC-001",
+    },
+    {
+        "name": "Laptop Pro",
+        "description": "High-performance laptop for professionals",
+        "price": 1299.99,
+        "sku": "ELEC-002",
+    },
+    {
+        "name": "Wireless Earbuds",
+        "description": "True wireless earbuds with noise cancellation",
+        "price": 149.99,
+        "sku": "ELEC-003",
+    },
+    {
+        "name": "Smart Watch",
+        "description": "Fitness and health tracking smartwatch",
+        "price": 249.99,
+        "sku": "ELEC-004",
+    },
+    {
+        "name": "4K Smart TV",
+        "description": "Ultra HD smart television with streaming capabilities",
+        "price": 799.99,
+        "sku": "ELEC-005",
+    },
+]
+
+CLOTHING_PRODUCTS = [
+    {
+        "name": "Men's T-Shirt",
+        "description": "Cotton crew neck t-shirt",
+        "price": 19.99,
+        "sku": "CLTH-001",
+    },
+    {
+        "name": "Women's Jeans",
+        "description": "Slim fit denim jeans",
+        "price": 49.99,
+        "sku": "CLTH-002",
+    },
+    {
+        "name": "Winter Jacket",
+        "description": "Insulated water-resistant jacket",
+        "price": 89.99,
+        "sku": "CLTH-003",
+    },
+    {
+        "name": "Athletic Shoes",
+        "description": "High-performance running shoes",
+        "price": 79.99,
+        "sku": "CLTH-004",
+    },
+    {
+        "name": "Casual Dress",
+        "description": "Everyday casual dress",
+        "price": 59.99,
+        "sku": "CLTH-005",
+    },
+]
+
+HOME_PRODUCTS = [
+    {
+        "name": "Coffee Maker",
+        "description": "Programmable coffee machine",
+        "price": 69.99,
+        "sku": "HOME-001",
+    },
+    {
+        "name": "Blender",
+        "description": "High-speed countertop blender",
+        "price": 49.99,
+        "sku": "HOME-002",
+    },
+    {
+        "name": "Bed Sheets Set",
+        "description": "100% cotton sheet set",
+        "price": 39.99,
+        "sku": "HOME-003",
+    },
+    {
+        "name": "Cookware Set",
+        "description": "Non-stick cooking set",
+        "price": 129.99,
+        "sku": "HOME-004",
+    },
+    {
+        "name": "Table Lamp",
+        "description": "Modern desk lamp with LED bulb",
+        "price": 34.99,
+        "sku": "HOME-005",
+    },
+]
+
+BOOKS_PRODUCTS = [
+    {
+        "name": "Fiction Bestseller",
+        "description": "Top-selling novel",
+        "price": 14.99,
+        "sku": "BOOK-001",
+    },
+    {
+        "name": "Cookbook",
+        "description": "Recipe collection for home cooks",
+        "price": 24.99,
+        "sku": "BOOK-002",
+    },
+    {
+        "name": "Self-Help Guide",
+        "description": "Personal development book",
+        "price": 19.99,
+        "sku": "BOOK-003",
+    },
+    {
+        "name": "Children's Story",
+        "description": "Illustrated children's book",
+        "price": 9.99,
+        "sku": "BOOK-004",
+    },
+    {
+        "name": "Business Strategy",
+        "description": "Guide for entrepreneurs",
+        "price": 29.99,
+        "sku": "BOOK-005",
+    },
+]
+
+SPORTS_PRODUCTS = [
+    {
+        "name": "Yoga Mat",
+        "description": "Non-slip exercise mat",
+        "price": 29.99,
+        "sku": "SPRT-001",
+    },
+    {
+        "name": "Dumbbell Set",
+        "description": "Adjustable weight dumbbell pair",
+        "price": 119.99,
+        "sku": "SPRT-002",
+    },
+    {
+        "name": "Tennis Racket",
+        "description": "Professional tennis racket",
+        "price": 89.99,
+        "sku": "SPRT-003",
+    },
+    {
+        "name": "Basketball",
+        "description": "Official size basketball",
+        "price": 29.99,
+        "sku": "SPRT-004",
+    },
+    {
+        "name": "Hiking Backpack",
+        "description": "Durable outdoor backpack",
+        "price": 69.99,
+        "sku": "SPRT-005",
+    },
+]
+
+BEAUTY_PRODUCTS = [
+    {
+        "name": "Face Moisturizer",
+        "description": "Hydrating face cream",
+        "price": 24.99,
+        "sku": "BEAU-001",
+    },
+    {
+        "name": "Shampoo",
+        "description": "Volumizing hair shampoo",
+        "price": 12.99,
+        "sku": "BEAU-002",
+    },
+    {
+        "name": "Perfume",
+        "description": "Luxury fragrance",
+        "price": 79.99,
+        "sku": "BEAU-003",
+    },
+    {
+        "name": "Makeup Set",
+        "description": "Complete makeup collection",
+        "price": 49.99,
+        "sku": "BEAU-004",
+    },
+    {
+        "name": "Electric Razor",
+        "description": "Rechargeable grooming tool",
+        "price": 59.99,
+        "sku": "BEAU-005",
+    },
+]
+
+TOYS_PRODUCTS = [
+    {
+        "name": "Building Blocks",
+        "description": "Creative construction set",
+        "price": 24.99,
+        "sku": "TOYS-001",
+    },
+    {
+        "name": "Board Game",
+        "description": "Family strategy game",
+        "price": 34.99,
+        "sku": "TOYS-002",
+    },
+    {
+        "name": "Action Figure",
+        "description": "Collectible character figure",
+        "price": 19.99,
+        "sku": "TOYS-003",
+    },
+    {
+        "name": "Remote Control Car",
+        "description": "High-speed RC vehicle",
+        "price": 49.99,
+        "sku": "TOYS-004",
+    },
+    {
+        "name": "Stuffed Animal",
+        "description": "Soft plush toy",
+        "price": 14.99,
+        "sku": "TOYS-005",
+    },
+]
+
+GROCERY_PRODUCTS = [
+    {
+        "name": "Coffee Beans",
+        "description": "Premium roasted coffee",
+        "price": 14.99,
+        "sku": "GROC-001",
+    },
+    {
+        "name": "Olive Oil",
+        "description": "Extra virgin olive oil",
+        "price": 19.99,
+        "sku": "GROC-002",
+    },
+    {
+        "name": "Organic Honey",
+        "description": "Pure natural honey",
+        "price": 9.99,
+        "sku": "GROC-003",
+    },
+    {
+        "name": "Pasta Set",
+        "description": "Assorted Italian pasta",
+        "price": 12.99,
+        "sku": "GROC-004",
+    },
+    {
+        "name": "Chocolate Box",
+        "description": "Gourmet chocolate assortment",
+        "price": 24.99,
+        "sku": "GROC-005",
+    },
+]
+
+CATEGORY_PRODUCTS = {
+    "Electronics": ELECTRONICS_PRODUCTS,
+    "Clothing": CLOTHING_PRODUCTS,
+    "Home & Kitchen": HOME_PRODUCTS,
+    "Books": BOOKS_PRODUCTS,
+    "Sports & Outdoors": SPORTS_PRODUCTS,
+    "Beauty & Personal Care": BEAUTY_PRODUCTS,
+    "Toys & Games": TOYS_PRODUCTS,
+    "Grocery": GROCERY_PRODUCTS,
+}
+
+
+class ChunkSpec(NamedTuple):
+    db_url: Optional[str]
+    chunk_index: int
+    first_sale_id: int
+    count: int
+    seed: int
+    start: datetime
+    day_p: np.ndarray
+    day_month: np.ndarray
+    months: int
+    prices: np.ndarray
+    product_p: np.ndarray
+    customer_p: np.ndarray
+    batch_size: int
+
+
+def power_law(n: int, exponent: float, rng: np.random.Generator) -> np.ndarray:
+    """Zipf-like probabilities over ``n`` items in a random rank order."""
+    weights = 1.0 / np.arange(1, n + 1) ** exponent
+    rng.shuffle(weights)
+    return weights / weights.sum()
+
+
+def day_distribution(start: datetime, days: int):
+    """Probability of an order falling on each day, and that day's month index.
+
+    Combines a yearly cycle peaking in mid-December, a weekly cycle and a
+    linear growth trend over the whole window.
+    """
+    dates = [start + timedelta(days=d) for d in range(days)]
+    day_of_year = np.array([d.timetuple().tm_yday for d in dates])
+    weekday = np.array([d.weekday() for d in dates])
+    yearly = 1 + 0.3 * np.cos(2 * np.pi * (day_of_year - 350) / 365.25)
+    growth = 1 + 0.5 * np.arange(days) / days
+    weights = yearly * WEEKDAY_FACTORS[weekday] * growth
+
+    month_keys = [(d.year, d.month) for d in dates]
+    first = month_keys[0]
+    day_month = np.array([(y - first[0]) * 12 + m - first[1] for y, m in month_keys])
+    return weights / weights.sum(), day_month
+
+
+def insert_rows(conn, table, rows: List[dict], batch_size: int) -> None:
+    for start in range(0, len(rows), batch_size):
+        conn.execute(insert(table), rows[start : start + batch_size])
+
+
+def generate_chunk(spec: ChunkSpec):
+    """Generate (and, with ``spec.db_url``, insert) one chunk of sales.
+
+    Returns the number of sales and lines, the units sold as a flattened
+    (product, month) matrix, and the rows when they still need inserting.
+    """
+    rng = np.random.default_rng([spec.seed, spec.chunk_index])
+    n = spec.count
+    n_products = len(spec.prices)
+
+    sale_ids = np.arange(spec.first_sale_id, spec.first_sale_id + n)
+    day = rng.choice(len(spec.day_p), size=n, p=spec.day_p)
+    seconds = rng.choice(24, size=n, p=HOUR_WEIGHTS) * 3600 + rng.integers(0, 3600, n)
+    order_dates = (
+        np.datetime64(spec.start, "s")
+        + (day * 86400 + seconds).astype("timedelta64[s]")
+    ).tolist()
+    customer_ids = rng.choice(len(spec.customer_p), size=n, p=spec.customer_p) + 1
+    platforms = rng.choice(len(PLATFORMS), size=n, p=PLATFORM_WEIGHTS)
+    statuses = rng.choice(len(STATUSES), size=n, p=STATUS_WEIGHTS)
+
+    lines = rng.choice(len(ITEM_COUNT_WEIGHTS), size=n, p=ITEM_COUNT_WEIGHTS) + 1
+    line_sale = np.repeat(np.arange(n), lines)
+    n_lines = len(line_sale)
+    product_idx = rng.choice(n_products, size=n_lines, p=spec.product_p)
+    quantity = rng.choice(len(QUANTITY_WEIGHTS), size=n_lines, p=QUANTITY_WEIGHTS) + 1
+    unit_price = spec.prices[product_idx]
+    discount = np.round(unit_price * rng.uniform(0, 0.2, n_lines), 2)
+    totals = np.round(
+        np.bincount(line_sale, weights=quantity * (unit_price - discount), minlength=n),
+        2,
+    )
+
+    line_month = spec.day_month[day[line_sale]]
+    sold = np.bincount(
+        product_idx * spec.months + line_month,
+        weights=quantity,
+        minlength=n_products * spec.months,
+    ).astype(np.int64)
+
+    sale_rows = [
+        {
+            "id": sale_id,
+            "order_number": f"ORD-{sale_id:09d}",
+            "order_date": order_date,
+            "customer_id": customer_id,
+            "total_amount": total,
+            "platform": PLATFORMS[platform],
+            "status": STATUSES[status],
+        }
+        for sale_id, order_date, customer_id, total, platform, status in zip(
+            sale_ids.tolist(),
+            order_dates,
+            customer_ids.tolist(),
+            totals.tolist(),
+            platforms.tolist(),
+            statuses.tolist(),
+        )
     ]
-
-    db_categories = []
-    db = SessionLocal()
-
-    try:
-        for cat_data in categories:
-            category = Category(**cat_data)
-            db.add(category)
-            db_categories.append(category)
-        db.commit()
-
-        for cat in db_categories:
-            db.refresh(cat)
-    finally:
-        db.close()
-
-    return db_categories
-
-
-def create_products(categories: list) -> list:
-    db_products = []
-    db = SessionLocal()
-
-    electronics_products = [
-        {
-            "name": "Smartphone X",
-            "description": "Latest smartphone with advanced features",
-            "price": 999.99,
-            "sku": "ELEC-001",
-        },
-        {
-            "name": "Laptop Pro",
-            "description": "High-performance laptop for professionals",
-            "price": 1299.99,
-            "sku": "ELEC-002",
-        },
-        {
-            "name": "Wireless Earbuds",
-            "description": "True wireless earbuds with noise cancellation",
-            "price": 149.99,
-            "sku": "ELEC-003",
-        },
-        {
-            "name": "Smart Watch",
-            "description": "Fitness and health tracking smartwatch",
-            "price": 249.99,
-            "sku": "ELEC-004",
-        },
-        {
-            "name": "4K Smart TV",
-            "description": "Ultra HD smart television with streaming capabilities",
-            "price": 799.99,
-            "sku": "ELEC-005",
-        },
+    item_rows = [
+        {
+            "sale_id": sale_id,
+            "product_id": product_id,
+            "quantity": qty,
+            "unit_price": price,
+            "discount": disc,
+        }
+        for sale_id, product_id, qty, price, disc in zip(
+            sale_ids[line_sale].tolist(),
+            (product_idx + 1).tolist(),
+            quantity.tolist(),
+            unit_price.tolist(),
+            discount.tolist(),
+        )
     ]
 
-    clothing_products = [
-        {
-            "name": "Men's T-Shirt",
-            "description": "Cotton crew neck t-shirt",
-            "price": 19.99,
-            "sku": "CLTH-001",
-        },
-        {
-            "name": "Women's Jeans",
-            "description": "Slim fit denim jeans",
-            "price": 49.99,
-            "sku": "CLTH-002",
-        },
-        {
-            "name": "Winter Jacket",
-            "description": "Insulated water-resistant jacket",
-            "price": 89.99,
-            "sku": "CLTH-003",
-        },
-        {
-            "name": "Athletic Shoes",
-            "description": "High-performance running shoes",
-            "price": 79.99,
-            "sku": "CLTH-004",
-        },
-        {
-            "name": "Casual Dress",
-            "description": "Everyday casual dress",
-            "price": 59.99,
-            "sku": "CLTH-005",
-        },
-    ]
+    if spec.db_url is None:
+        return n, n_lines, sold, (sale_rows, item_rows)
 
-    home_products = [
-        {
-            "name": "Coffee Maker",
-            "description": "Programmable coffee machine",
-            "price": 69.99,
-            "sku": "HOME-001",
-        },
-        {
-            "name": "Blender",
-            "description": "High-speed countertop blender",
-            "price": 49.99,
-            "sku": "HOME-002",
-        },
-        {
-            "name": "Bed Sheets Set",
-            "description": "100% cotton sheet set",
-            "price": 39.99,
-            "sku": "HOME-003",
-        },
-        {
-            "name": "Cookware Set",
-            "description": "Non-stick cooking set",
-            "price": 129.99,
-            "sku": "HOME-004",
-        },
-        {
-            "name": "Table Lamp",
-            "description": "Modern desk lamp with LED bulb",
-            "price": 34.99,
-            "sku": "HOME-005",
-        },
-    ]
+    worker_engine = create_engine(spec.db_url, poolclass=NullPool)
+    with worker_engine.begin() as conn:
+        insert_rows(conn, Sale.__table__, sale_rows, spec.batch_size)
+        insert_rows(conn, SaleItem.__table__, item_rows, spec.batch_size)
+    worker_engine.dispose()
+    return n, n_lines, sold, None
 
-    books_products = [
-        {
-            "name": "Fiction Bestseller",
-            "description": "Top-selling novel",
-            "price": 14.99,
-            "sku": "BOOK-001",
-        },
-        {
-            "name": "Cookbook",
-            "description": "Recipe collection for home cooks",
-            "price": 24.99,
-            "sku": "BOOK-002",
-        },
-        {
-            "name": "Self-Help Guide",
-            "description": "Personal development book",
-            "price": 19.99,
-            "sku": "BOOK-003",
-        },
-        {
-            "name": "Children's Story",
-            "description": "Illustrated children's book",
-            "price": 9.99,
-            "sku": "BOOK-004",
-        },
-        {
-            "name": "Business Strategy",
-            "description": "Guide for entrepreneurs",
-            "price": 29.99,
-            "sku": "BOOK-005",
-        },
-    ]
 
-    sports_products = [
-        {
-            "name": "Yoga Mat",
-            "description": "Non-slip exercise mat",
-            "price": 29.99,
-            "sku": "SPRT-001",
-        },
-        {
-            "name": "Dumbbell Set",
-            "description": "Adjustable weight dumbbell pair",
-            "price": 119.99,
-            "sku": "SPRT-002",
-        },
-        {
-            "name": "Tennis Racket",
-            "description": "Professional tennis racket",
-            "price": 89.99,
-            "sku": "SPRT-003",
-        },
-        {
-            "name": "Basketball",
-            "description": "Official size basketball",
-            "price": 29.99,
-            "sku": "SPRT-004",
-        },
-        {
-            "name": "Hiking Backpack",
-            "description": "Durable outdoor backpack",
-            "price": 69.99,
-            "sku": "SPRT-005",
-        },
-    ]
+def create_categories(conn) -> None:
+    conn.execute(
+        insert(Category.__table__),
+        [{"id": i, **category} for i, category in enumerate(CATEGORIES, start=1)],
+    )
 
-    beauty_products = [
-        {
-            "name": "Face Moisturizer",
-            "description": "Hydrating face cream",
-            "price": 24.99,
-            "sku": "BEAU-001",
-        },
-        {
-            "name": "Shampoo",
-            "description": "Volumizing hair shampoo",
-            "price": 12.99,
-            "sku": "BEAU-002",
-        },
-        {
-            "name": "Perfume",
-            "description": "Luxury fragrance",
-            "price": 79.99,
-            "sku": "BEAU-003",
-        },
-        {
-            "name": "Makeup Set",
-            "description": "Complete makeup collection",
-            "price": 49.99,
-            "sku": "BEAU-004",
-        },
-        {
-            "name": "Electric Razor",
-            "description": "Rechargeable grooming tool",
-            "price": 59.99,
-            "sku": "BEAU-005",
-        },
-    ]
 
-    toys_products = [
-        {
-            "name": "Building Blocks",
-            "description": "Creative construction set",
-            "price": 24.99,
-            "sku": "TOYS-001",
-        },
-        {
-            "name": "Board Game",
-            "description": "Family strategy game",
-            "price": 34.99,
-            "sku": "TOYS-002",
-        },
-        {
-            "name": "Action Figure",
-            "description": "Collectible character figure",
-            "price": 19.99,
-            "sku": "TOYS-003",
-        },
-        {
-            "name": "Remote Control Car",
-            "description": "High-speed RC vehicle",
-            "price": 49.99,
-            "sku": "TOYS-004",
-        },
-        {
-            "name": "Stuffed Animal",
-            "description": "Soft plush toy",
-            "price": 14.99,
-            "sku": "TOYS-005",
-        },
+def create_products(conn, count: int, rng: np.random.Generator) -> np.ndarray:
+    """Insert the curated catalog, padded with variants up to ``count``."""
+    category_ids = {category["name"]: i for i, category in enumerate(CATEGORIES, 1)}
+    catalog = [
+        {**product, "category_id": category_ids[category_name]}
+        for category_name, products in CATEGORY_PRODUCTS.items()
+        for product in products
     ]
-
-    grocery_products = [
-        {
-            "name": "Coffee Beans",
-            "description": "Premium roasted coffee",
-            "price": 14.99,
-            "sku": "GROC-001",
-        },
-        {
-            "name": "Olive Oil",
-            "description": "Extra virgin olive oil",
-            "price": 19.99,
-            "sku": "GROC-002",
-        },
-        {
-            "name": "Organic Honey",
-            "description": "Pure natural honey",
-            "price": 9.99,
-            "sku": "GROC-003",
-        },
-        {
-            "name": "Pasta Set",
-            "description": "Assorted Italian pasta",
-            "price": 12.99,
-            "sku": "GROC-004",
-        },
-        {
-            "name": "Chocolate Box",
-            "description": "Gourmet chocolate assortment",
-            "price": 24.99,
-            "sku": "GROC-005",
-        },
+    count = max(count, len(catalog))
+
+    rows = []
+    for i in range(count):
+        base = catalog[i % len(catalog)]
+        variant = i // len(catalog)
+        row = {**base, "id": i + 1}
+        if variant:
+            row["name"] = f"{base['name']} #{variant}"
+            row["sku"] = f"{base['sku']}-{variant:05d}"
+            row["price"] = round(base["price"] * rng.uniform(0.8, 1.25), 2)
+        rows.append(row)
+    insert_rows(conn, Product.__table__, rows, 10_000)
+    return np.array([row["price"] for row in rows])
+
+
+def create_customers(conn, count: int, fake: Faker, rng: np.random.Generator) -> None:
+    first_names = np.array([fake.first_name() for _ in range(500)])
+    last_names = np.array([fake.last_name() for _ in range(500)])
+    cities = [fake.city() for _ in range(200)]
+    first = rng.choice(first_names, count).tolist()
+    last = rng.choice(last_names, count).tolist()
+    city = rng.choice(len(cities), count).tolist()
+    phone = rng.integers(2_000_000_000, 9_999_999_999, count).tolist()
+
+    rows = [
+        {
+            "id": i + 1,
+            "name": f"{first[i]} {last[i]}",
+            "email": f"{first[i].lower()}.{last[i].lower()}{i + 1}@example.com",
+            "phone": f"{phone[i] // 10**7}-{phone[i] // 10**4 % 1000:03d}-"
+            f"{phone[i] % 10**4:04d}",
+            "address": f"{(i * 37) % 9999 + 1} Main Street, {cities[city[i]]}",
+        }
+        for i in range(count)
     ]
-
-    category_products = {
-        "Electronics": electronics_products,
-        "Clothing": clothing_products,
-        "Home & Kitchen": home_products,
-        "Books": books_products,
-        "Sports & Outdoors": sports_products,
-        "Beauty & Personal Care": beauty_products,
-        "Toys & Games": toys_products,
-        "Grocery": grocery_products,
-    }
-
-    try:
-        cat_dict = {cat.name: cat for cat in categories}
-
-        for cat_name, products_list in category_products.items():
-            category_id = cat_dict[cat_name].id
-
-            for product_data in products_list:
-                product = Product(**product_data, category_id=category_id)
-                db.add(product)
-                db_products.append(product)
-
-        db.commit()
-
-        for product in db_products:
-            db.refresh(product)
-    finally:
-        db.close()
-
-    return db_products
-
-
-def create_inventory(products: list) -> list:
-    db_inventories = []
-    db = SessionLocal()
-
-    try:
-        for product in products:
-            quantity = random.randint(5, 100)
-            threshold = max(5, int(quantity * random.uniform(0.1, 0.2)))
-            inventory = Inventory(
-                product_id=product.id,
-                quantity=quantity,
-                location="Main Warehouse",
-                low_stock_threshold=threshold,
-                last_restock_date=datetime.now()
-                - timedelta(days=random.randint(1, 30)),
-            )
-            db.add(inventory)
-            db_inventories.append(inventory)
-
-        db.commit()
-
-        for inventory in db_inventories:
-            db.refresh(inventory)
-    finally:
-        db.close()
-
-    return db_inventories
-
-
-def create_customers(count: int = 20) -> list:
-    db_customers = []
-    db = SessionLocal()
-
-    try:
-        for _ in range(count):
-            customer = Customer(
-                name=fake.name(),
-                email=fake.unique.email(),
-                phone=fake.phone_number(),
-                address=fake.address(),
-            )
-            db.add(customer)
-            db_customers.append(customer)
-
-        db.commit()
-
-        for customer in db_customers:
-            db.refresh(customer)
-    finally:
-        db.close()
-
-    return db_customers
-
-
-def create_sales(customers: list, products: list, count: int = 100) -> list:
-    db_sales = []
-    db = SessionLocal()
-
-    platforms = ["Amazon", "Walmart", "Website", "eBay", "Etsy"]
-
-    statuses = ["completed", "pending", "cancelled", "refunded"]
-
-    try:
-        for i in range(1, count + 1):
-            sale_date = datetime.now() - timedelta(days=random.randint(1, 365))
-            customer = random.choice(customers)
-            platform = random.choice(platforms)
-
-            status = random.choices(statuses, weights=[0.8, 0.1, 0.05, 0.05], k=1)[0]
-
-            sale = Sale(
-                order_number=f"ORD-{(sale_date.year % 100):02d}{sale_date.month:02d}-{i:04d}",
-                order_date=sale_date,
-                customer_id=customer.id,
-                total_amount=0,
-                platform=platform,
-                status=status,
+    for row in rows:
+        row.update(customer_search_keys(row["name"], row["email"], row["phone"]))
+    insert_rows(conn, Customer.__table__, rows, 10_000)
+
+
+def create_inventory(
+    conn,
+    sold: np.ndarray,
+    start: datetime,
+    months: int,
+    rng: np.random.Generator,
+) -> int:
+    """Insert inventory and a history chain consistent with ``sold``.
+
+    Each product starts with enough stock to cover everything it sold plus a
+    random remainder; the history has one restock row followed by one row per
+    month with sales, ending at the current quantity.
+    """
+    n_products = sold.shape[0]
+    total_sold = sold.sum(axis=1)
+    remaining = rng.integers(0, 150, n_products)
+    initial = total_sold + remaining
+    thresholds = np.maximum(5, np.ceil(sold[:, -3:].mean(axis=1))).astype(int)
+
+    inventory_rows = [
+        {
+            "id": i + 1,
+            "product_id": i + 1,
+            "quantity": int(remaining[i]),
+            "location": "Main Warehouse",
+            "low_stock_threshold": int(thresholds[i]),
+            "last_restock_date": start,
+        }
+        for i in range(n_products)
+    ]
+    insert_rows(conn, Inventory.__table__, inventory_rows, 10_000)
+
+    month_ends = []
+    for m in range(months):
+        year, month = divmod(start.month - 1 + m + 1, 12)
+        month_ends.append(
+            datetime(start.year + year, month + 1, 1) - timedelta(seconds=1)
+        )
+
+    history_rows = []
+    for i in range(n_products):
+        quantity = int(initial[i])
+        history_rows.append(
+            {
+                "inventory_id": i + 1,
+                "previous_quantity": 0,
+                "new_quantity": quantity,
+                "change_reason": "Initial stock",
+                "created_at": start,
+            }
+        )
+        for m in np.flatnonzero(sold[i]).tolist():
+            new_quantity = quantity - int(sold[i, m])
+            history_rows.append(
+                {
+                    "inventory_id": i + 1,
+                    "previous_quantity": quantity,
+                    "new_quantity": new_quantity,
+                    "change_reason": f"Sales {month_ends[m]:%Y-%m}",
+                    "created_at": month_ends[m],
+                }
             )
-            db.add(sale)
-            db.flush()
-            item_count = random.randint(1, 5)
-            sale_products = random.sample(products, item_count)
-
-            total_amount = 0
-            for product in sale_products:
-                quantity = random.choices([1, 2, 3], weights=[0.6, 0.3, 0.1], k=1)[0]
-                discount_percent = random.uniform(0, 0.2)
-                discount = round(product.price * discount_percent, 2)
-
-                sale_item = SaleItem(
-                    sale_id=sale.id,
-                    product_id=product.id,
-                    quantity=quantity,
-                    unit_price=product.price,
-                    discount=discount,
-                )
-                db.add(sale_item)
-                item_total = quantity * (product.price - discount)
-                total_amount += item_total
-
-            sale.total_amount = round(total_amount, 2)
-            db_sales.append(sale)
-
-        db.commit()
-
-        for sale in db_sales:
-            db.refresh(sale)
-    finally:
-        db.close()
-
-    return db_sales
+            quantity = new_quantity
+    insert_rows(conn, InventoryHistory.__table__, history_rows, 10_000)
+    return len(history_rows)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Generate demo data.")
+    parser.add_argument("--sales", type=int, default=200)
+    parser.add_argument("--customers", type=int, help="Defaults to sales / 10")
+    parser.add_argument("--products", type=int, default=40)
+    parser.add_argument("--days", type=int, default=365, help="History window")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-size", type=int, default=50_000)
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument(
+        "--reset", action="store_true", help="Drop and recreate all tables first"
+    )
+    return parser.parse_args()
 
 
 def main():
+    args = parse_args()
+    customers = args.customers or max(20, args.sales // 10)
     print("Creating demo data...")
 
+    if args.reset:
+        Base.metadata.drop_all(bind=engine)
     Base.metadata.create_all(bind=engine)
+    with engine.connect() as conn:
+        if conn.execute(select(func.count()).select_from(Product)).scalar():
+            sys.exit("Database already contains data; rerun with --reset.")
+
+    started = time.perf_counter()
+    fake = Faker()
+    fake.seed_instance(args.seed)
+    rng = np.random.default_rng(args.seed)
+    end = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    start = end - timedelta(days=args.days)
+    day_p, day_month = day_distribution(start, args.days)
+    months = int(day_month[-1]) + 1
+
+    with engine.begin() as conn:
+        print("Creating categories...")
+        create_categories(conn)
+        print("Creating products...")
+        prices = create_products(conn, args.products, rng)
+        print(f"Created {len(prices)} products.")
+        print("Creating customers...")
+        create_customers(conn, customers, fake, rng)
+        print(f"Created {customers} customers.")
+
+    # SQLite allows one writer at a time, so the parent does the inserts.
+    parallel_insert = engine.dialect.name != "sqlite"
+    db_url = engine.url.render_as_string(hide_password=False)
+    product_p = power_law(len(prices), 1.1, rng)
+    customer_p = power_law(customers, 0.7, rng)
+    specs = [
+        ChunkSpec(
+            db_url=db_url if parallel_insert else None,
+            chunk_index=index,
+            first_sale_id=first + 1,
+            count=min(args.chunk_size, args.sales - first),
+            seed=args.seed,
+            start=start,
+            day_p=day_p,
+            day_month=day_month,
+            months=months,
+            prices=prices,
+            product_p=product_p,
+            customer_p=customer_p,
+            batch_size=args.batch_size,
+        )
+        for index, first in enumerate(range(0, args.sales, args.chunk_size))
+    ]
 
-    print("Creating categories...")
-    categories = create_categories()
-    print(f"Created {len(categories)} categories.")
-
-    print("Creating products...")
-    products = create_products(categories)
-    print(f"Created {len(products)} products.")
+    print(f"Creating {args.sales} sales with {args.workers} workers...")
+    sold = np.zeros(len(prices) * months, dtype=np.int64)
+    sales_done = lines_done = 0
+    with multiprocessing.Pool(args.workers) as pool:
+        for count, lines, chunk_sold, rows in pool.imap_unordered(
+            generate_chunk, specs
+        ):
+            if rows is not None:
+                with engine.begin() as conn:
+                    insert_rows(conn, Sale.__table__, rows[0], args.batch_size)
+                    insert_rows(conn, SaleItem.__table__, rows[1], args.batch_size)
+            sold += chunk_sold
+            sales_done += count
+            lines_done += lines
+            elapsed = time.perf_counter() - started
+            print(
+                f"  {sales_done}/{args.sales} sales, {lines_done} lines "
+                f"({sales_done / elapsed * 60:,.0f} sales/min)"
+            )
 
     print("Creating inventory...")
-    inventories = create_inventory(products)
-    print(f"Created {len(inventories)} inventory entries.")
-
-    print("Creating customers...")
-    customers = create_customers(20)
-    print(f"Created {len(customers)} customers.")
-
-    print("Creating sales...")
-    sales = create_sales(customers, products, 200)
-    print(f"Created {len(sales)} sales.")
-
-    print("Demo data creation completed!")
+    with engine.begin() as conn:
+        history = create_inventory(
+            conn, sold.reshape(len(prices), months), start, months, rng
+        )
+    print(f"Created {len(prices)} inventory entries and {history} history rows.")
+
+    print("Computing customer stats and daily rollups...")
+    with engine.begin() as conn:
+        rebuild_customer_stats(conn)
+        rebuild_product_daily_sales(conn)
+        rebuild_daily_sales_rollups(conn)
+
+    print(f"Demo data creation completed in {time.perf_counter() - started:.1f}s!")
 
 
 if __name__ == "__main__":
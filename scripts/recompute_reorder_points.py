@@ -0,0 +1,61 @@
+"""Recompute every inventory row's reorder point from recent demand.
+
+Usage:
+    python scripts/recompute_reorder_points.py
+    python scripts/recompute_reorder_points.py --lead-time-days 10
+
+Sets ``low_stock_threshold`` and ``reorder_quantity`` on every stocked product
+that sold in the demand window and records the change in the inventory
+history. Meant to run nightly from cron.
+"""
+
+import os
+import sys
+import argparse
+from datetime import date
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.core.config import settings
+from app.db.session import engine
+from app.analytics.inventory import recompute_reorder_points
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Recompute reorder points.")
+    parser.add_argument(
+        "--as-of", type=date.fromisoformat, help="Last day of demand history (today)"
+    )
+    parser.add_argument(
+        "--window-days", type=int, default=settings.REORDER_DEMAND_WINDOW_DAYS
+    )
+    parser.add_argument(
+        "--lead-time-days", type=float, default=settings.REORDER_LEAD_TIME_DAYS
+    )
+    parser.add_argument(
+        "--service-level", type=float, default=settings.REORDER_SERVICE_LEVEL
+    )
+    parser.add_argument(
+        "--review-days", type=float, default=settings.REORDER_REVIEW_DAYS
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    result = recompute_reorder_points(
+        engine,
+        as_of=args.as_of,
+        window_days=args.window_days,
+        lead_time_days=args.lead_time_days,
+        service_level=args.service_level,
+        review_days=args.review_days,
+    )
+    print(
+        f"Updated {result['updated']} of {result['inventory_rows']} inventory rows "
+        f"in {result['seconds']:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
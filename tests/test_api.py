@@ -1,14 +1,23 @@
+import time
+from datetime import date, datetime, timedelta, timezone
+
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, update
 from sqlalchemy.orm import sessionmaker
 
+from app.analytics.dashboard import dashboard_snapshots
+from app.core.cache import entity_cache
+from app.core.rate_limit import default_limiter
+from app.crud import crud
 from app.db.session import Base, get_db
-from app.models.models import Category, Product
+from app.db.instrumentation import instrument_engine
+from app.models.models import Category, DashboardSnapshot, PendingSaleSketch, Product
 from main import app
 
 SQLALCHEMY_TEST_DATABASE_URL = "sqlite:///./test.db"
 engine = create_engine(SQLALCHEMY_TEST_DATABASE_URL)
+instrument_engine(engine)
 
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -30,6 +39,8 @@ def setup_database():
     Base.metadata.create_all(bind=engine)
     yield
     Base.metadata.drop_all(bind=engine)
+    entity_cache.clear()
+    default_limiter.reset()
 
 
 def test_read_root(setup_database):
@@ -70,3 +81,438 @@ def test_create_product(setup_database):
     assert data["name"] == product_data["name"]
     assert data["sku"] == product_data["sku"]
     assert data["category"]["id"] == category_id
+
+
+def test_metrics_use_route_templates(setup_database):
+    category_data = {"name": "Metrics", "description": "Metrics category"}
+    category_id = client.post("/api/v1/categories/", json=category_data).json()["id"]
+    response = client.get(f"/api/v1/categories/{category_id}")
+    assert "x-request-id" in response.headers
+    assert "x-process-time" in response.headers
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert (
+        'http_requests_total{method="GET",route="/api/v1/categories/{category_id}",'
+        'status="200"}' in response.text
+    )
+    assert "http_request_duration_seconds_bucket" in response.text
+
+
+def test_db_query_headers(setup_database):
+    category_data = {"name": "Timed", "description": "Timed category"}
+    response = client.post("/api/v1/categories/", json=category_data)
+    assert response.status_code == 201
+    assert int(response.headers["x-db-queries"]) >= 2
+    assert response.headers["server-timing"].startswith("db;dur=")
+
+    response = client.get("/")
+    assert response.headers["x-db-queries"] == "0"
+
+
+def test_health_probes_use_cached_state():
+    from app.core.health import health_monitor
+
+    assert client.get("/health/live").json()["status"] == "ok"
+
+    health_monitor.ping()
+    response = client.get("/health/ready")
+    assert response.status_code == 200
+    assert response.json()["checks"] == {
+        "database": True,
+        "pool": True,
+        "event_loop": True,
+    }
+    assert client.get("/health").json()["database"] == "connected"
+
+
+def test_sale_validation_uses_entity_cache(setup_database):
+    category_id = client.post("/api/v1/categories/", json={"name": "Cached"}).json()[
+        "id"
+    ]
+    product = {"name": "P", "sku": "CACHE-1", "price": 5.0, "category_id": category_id}
+    product_id = client.post("/api/v1/products/", json=product).json()["id"]
+    client.post("/api/v1/inventory/", json={"product_id": product_id, "quantity": 50})
+    customer_id = client.post("/api/v1/customers/", json={"name": "Ada"}).json()["id"]
+
+    def create_sale(number):
+        sale = {
+            "order_number": f"CACHE-{number}",
+            "order_date": "2024-01-01T10:00:00",
+            "customer_id": customer_id,
+            "total_amount": 5.0,
+            "items": [{"product_id": product_id, "quantity": 1, "unit_price": 5.0}],
+        }
+        response = client.post("/api/v1/sales/", json=sale)
+        assert response.status_code == 201
+        return int(response.headers["x-db-queries"])
+
+    first, second = create_sale(1), create_sale(2)
+    assert second < first
+    stats = entity_cache.stats()
+    assert stats["customer"]["hits"] >= 1
+    assert stats["product"]["hits"] >= 2
+
+    response = client.put(f"/api/v1/products/{product_id}", json={"price": 7.5})
+    assert response.json()["price"] == 7.5
+    assert client.get(f"/api/v1/products/{product_id}").json()["price"] == 7.5
+
+
+def test_product_search_route(setup_database):
+    category_id = client.post("/api/v1/categories/", json={"name": "Tools"}).json()[
+        "id"
+    ]
+    product = {"name": "Claw hammer", "sku": "HAM-1", "price": 9.0}
+    client.post("/api/v1/products/", json={**product, "category_id": category_id})
+
+    response = client.get("/api/v1/products/search", params={"q": "hammer"})
+    assert response.status_code == 200
+    assert [p["sku"] for p in response.json()] == ["HAM-1"]
+    assert response.json()[0]["category"]["name"] == "Tools"
+    assert client.get("/api/v1/products/search", params={"q": ""}).status_code == 422
+
+
+def test_create_customer_flags_near_duplicates(setup_database):
+    first = client.post(
+        "/api/v1/customers/", json={"name": "Ada", "phone": "+1 555 010 0000"}
+    ).json()
+    response = client.post(
+        "/api/v1/customers/", json={"name": "Ada L.", "phone": "1-555-010-0000"}
+    )
+    assert response.status_code == 409
+    assert response.json()["detail"]["duplicate_ids"] == [first["id"]]
+
+    response = client.post(
+        "/api/v1/customers/",
+        params={"force": True},
+        json={"name": "Ada L.", "phone": "1-555-010-0000"},
+    )
+    assert response.status_code == 201
+
+    response = client.get("/api/v1/customers/search", params={"q": "1 555 010"})
+    assert response.status_code == 200
+    assert len(response.json()) == 2
+
+
+def test_customer_stats_follow_sales(setup_database):
+    category_id = client.post("/api/v1/categories/", json={"name": "Stats"}).json()[
+        "id"
+    ]
+    product = {"name": "P", "sku": "STAT-1", "price": 5.0, "category_id": category_id}
+    product_id = client.post("/api/v1/products/", json=product).json()["id"]
+    client.post("/api/v1/inventory/", json={"product_id": product_id, "quantity": 50})
+    ada = client.post("/api/v1/customers/", json={"name": "Ada"}).json()["id"]
+    bob = client.post("/api/v1/customers/", json={"name": "Bob"}).json()["id"]
+
+    def create_sale(number, customer_id, day, total):
+        sale = {
+            "order_number": f"STAT-{number}",
+            "order_date": f"2024-01-{day:02d}T10:00:00",
+            "customer_id": customer_id,
+            "total_amount": total,
+            "items": [{"product_id": product_id, "quantity": 1, "unit_price": total}],
+        }
+        return client.post("/api/v1/sales/", json=sale).json()["id"]
+
+    create_sale(1, ada, 10, 20.0)
+    create_sale(2, ada, 3, 10.0)
+    sale_id = create_sale(3, bob, 5, 25.0)
+
+    stats = client.get(f"/api/v1/customers/{ada}/stats").json()
+    assert stats["order_count"] == 2
+    assert stats["total_revenue"] == 30.0
+    assert stats["average_order_value"] == 15.0
+    assert stats["first_order_date"].startswith("2024-01-03")
+    assert stats["last_order_date"].startswith("2024-01-10")
+
+    top = client.get("/api/v1/customers/top").json()
+    assert [c["name"] for c in top] == ["Ada", "Bob"]
+    client.put(f"/api/v1/sales/{sale_id}", json={"total_amount": 40.0})
+    top = client.get("/api/v1/customers/top", params={"limit": 1}).json()
+    assert [(c["name"], c["total_revenue"]) for c in top] == [("Bob", 40.0)]
+    by_orders = client.get("/api/v1/customers/top", params={"by": "orders"}).json()
+    assert by_orders[0]["name"] == "Ada"
+    assert client.get("/api/v1/customers/top", params={"by": "x"}).status_code == 400
+    assert client.get("/api/v1/customers/999/stats").status_code == 404
+
+    db = TestingSessionLocal()
+    try:
+        before = [client.get(f"/api/v1/customers/{c}/stats").json() for c in (ada, bob)]
+        crud.rebuild_customer_stats(db)
+        db.commit()
+        after = [client.get(f"/api/v1/customers/{c}/stats").json() for c in (ada, bob)]
+    finally:
+        db.close()
+    assert before == after
+
+
+def test_top_products_follow_new_sales(setup_database):
+    category_id = client.post("/api/v1/categories/", json={"name": "Top"}).json()["id"]
+    products = []
+    for sku, price in (("TOP-1", 10.0), ("TOP-2", 100.0)):
+        product = {"name": sku, "sku": sku, "price": price, "category_id": category_id}
+        products.append(client.post("/api/v1/products/", json=product).json()["id"])
+        client.post(
+            "/api/v1/inventory/", json={"product_id": products[-1], "quantity": 100}
+        )
+    customer_id = client.post("/api/v1/customers/", json={"name": "Top"}).json()["id"]
+
+    def create_sale(number, platform, lines):
+        sale = {
+            "order_number": f"TOP-{number}",
+            "order_date": "2024-03-05T10:00:00",
+            "customer_id": customer_id,
+            "platform": platform,
+            "total_amount": sum(q * p for _, q, p in lines),
+            "items": [
+                {"product_id": product_id, "quantity": q, "unit_price": p}
+                for product_id, q, p in lines
+            ],
+        }
+        assert client.post("/api/v1/sales/", json=sale).status_code == 201
+
+    create_sale(1, "website", [(products[0], 5, 10.0), (products[1], 1, 100.0)])
+    create_sale(2, "Amazon", [(products[0], 2, 10.0)])
+
+    window = {"start_date": "2024-03-01", "end_date": "2024-03-31"}
+    top = client.get("/api/v1/analytics/top-products", params=window).json()
+    assert [(p["product_name"], p["units"]) for p in top] == [
+        ("TOP-1", 7),
+        ("TOP-2", 1),
+    ]
+    top = client.get(
+        "/api/v1/analytics/top-products", params={**window, "by": "revenue", "k": 1}
+    ).json()
+    assert [(p["product_name"], p["revenue"]) for p in top] == [("TOP-2", 100.0)]
+    top = client.get(
+        "/api/v1/analytics/top-products", params={**window, "platform": "Amazon"}
+    ).json()
+    assert [(p["product_name"], p["units"]) for p in top] == [("TOP-1", 2)]
+
+    # The dashboard ends at today's midnight, top products included.
+    with TestingSessionLocal() as db:
+        for today, orders, top_products in (
+            (date(2024, 3, 5), 0, []),
+            (date(2024, 3, 6), 2, ["TOP-1", "TOP-2"]),
+        ):
+            summary = crud.get_dashboard_summary(db, 30, today)
+            assert summary["sales_summary"]["total_orders"] == orders
+            assert [p["name"] for p in summary["top_products"]] == top_products
+
+
+def test_unique_customers_follow_new_sales(setup_database):
+    category_id = client.post("/api/v1/categories/", json={"name": "HLL"}).json()["id"]
+    product = {"name": "P", "sku": "HLL-1", "price": 5.0, "category_id": category_id}
+    product_id = client.post("/api/v1/products/", json=product).json()["id"]
+    client.post("/api/v1/inventory/", json={"product_id": product_id, "quantity": 50})
+    customers = [
+        client.post("/api/v1/customers/", json={"name": f"C{i}"}).json()["id"]
+        for i in range(3)
+    ]
+    for number, (customer_id, day) in enumerate(
+        [(customers[0], 4), (customers[0], 5), (customers[1], 5), (customers[2], 12)]
+    ):
+        sale = {
+            "order_number": f"HLL-{number}",
+            "order_date": f"2024-03-{day:02d}T10:00:00",
+            "customer_id": customer_id,
+            "total_amount": 5.0,
+            "items": [{"product_id": product_id, "quantity": 1, "unit_price": 5.0}],
+        }
+        assert client.post("/api/v1/sales/", json=sale).status_code == 201
+
+    response = client.get(
+        "/api/v1/analytics/unique-customers",
+        params={
+            "start_date": "2024-03-01",
+            "end_date": "2024-03-31",
+            "group_by": "week",
+        },
+    ).json()
+    assert response["total"] == {"unique_customers": 3, "orders": 4, "revenue": 20.0}
+    assert {k: v["unique_customers"] for k, v in response["periods"].items()} == {
+        "2024-03-04": 2,
+        "2024-03-11": 1,
+    }
+
+    sale_id = client.get("/api/v1/sales/", params={"limit": 1}).json()[0]["id"]
+    response = client.put(f"/api/v1/sales/{sale_id}", json={"total_amount": 8.0})
+    assert response.status_code == 200
+    response = client.get(
+        "/api/v1/analytics/unique-customers",
+        params={"start_date": "2024-03-01", "end_date": "2024-03-31"},
+    ).json()
+    assert response["total"]["revenue"] == 23.0
+
+
+def test_order_value_percentiles_follow_new_sales(setup_database):
+    category_id = client.post("/api/v1/categories/", json={"name": "P99"}).json()["id"]
+    product = {"name": "P", "sku": "P99-1", "price": 5.0, "category_id": category_id}
+    product_id = client.post("/api/v1/products/", json=product).json()["id"]
+    client.post("/api/v1/inventory/", json={"product_id": product_id, "quantity": 500})
+    customer_id = client.post("/api/v1/customers/", json={"name": "P99"}).json()["id"]
+    totals = [10.0] * 9 + [1000.0]
+    for number, total in enumerate(totals):
+        sale = {
+            "order_number": f"P99-{number}",
+            "order_date": f"2024-03-0{1 + number % 2}T10:00:00",
+            "customer_id": customer_id,
+            "platform": "B2B" if total > 100 else "website",
+            "total_amount": total,
+            "items": [{"product_id": product_id, "quantity": 1, "unit_price": total}],
+        }
+        assert client.post("/api/v1/sales/", json=sale).status_code == 201
+
+    response = client.get(
+        "/api/v1/analytics/order-values",
+        params={"start_date": "2024-03-01", "end_date": "2024-03-31"},
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"]["orders"] == 10
+    assert data["total"]["average_order_value"] == 109.0
+    assert data["total"]["p50"] == 10.0
+    assert data["total"]["p99"] == 1000.0
+    assert set(data["periods"]) == {"2024-03-01", "2024-03-02"}
+    assert data["platforms"]["website"]["p99"] == 10.0
+    assert data["platforms"]["B2B"]["orders"] == 1
+
+    # Sales are queued for the sketches; merging them changes nothing.
+    with TestingSessionLocal() as db:
+        assert db.query(PendingSaleSketch).count() == 10
+    assert crud.merge_pending_sketches(engine, chunk_size=3) == 10
+    with TestingSessionLocal() as db:
+        assert db.query(PendingSaleSketch).count() == 0
+    response = client.get(
+        "/api/v1/analytics/order-values",
+        params={"start_date": "2024-03-01", "end_date": "2024-03-31"},
+    )
+    assert response.json() == data
+    response = client.get("/api/v1/analytics/order-values", params={"group_by": "x"})
+    assert response.status_code == 400
+
+
+def test_stock_forecast_and_low_stock_routes(setup_database):
+    category_id = client.post("/api/v1/categories/", json={"name": "Stock"}).json()[
+        "id"
+    ]
+    customer_id = client.post("/api/v1/customers/", json={"name": "Stock"}).json()["id"]
+    today = date.today().isoformat()
+    products = {}
+    for sku, quantity, sold in (("FAST", 33, 28), ("SLOW", 100, 14), ("IDLE", 8, 0)):
+        product = {"name": sku, "sku": sku, "price": 1.0, "category_id": category_id}
+        products[sku] = client.post("/api/v1/products/", json=product).json()["id"]
+        client.post(
+            "/api/v1/inventory/",
+            json={"product_id": products[sku], "quantity": quantity},
+        )
+        if sold:
+            sale = {
+                "order_number": f"STOCK-{sku}",
+                "order_date": f"{today}T10:00:00",
+                "customer_id": customer_id,
+                "total_amount": float(sold),
+                "items": [
+                    {"product_id": products[sku], "quantity": sold, "unit_price": 1.0}
+                ],
+            }
+            assert client.post("/api/v1/sales/", json=sale).status_code == 201
+
+    response = client.get("/api/v1/inventory/forecast")
+    assert response.status_code == 200
+    forecast = response.json()["products"]
+    assert [p["sku"] for p in forecast] == ["FAST", "SLOW", "IDLE"]
+    assert forecast[0]["quantity"] == 5
+    assert forecast[0]["daily_velocity"] == 1.0
+    assert (
+        forecast[0]["stockout_date"] == (date.today() + timedelta(days=5)).isoformat()
+    )
+    assert forecast[2]["days_of_cover"] is None
+    soon = client.get("/api/v1/inventory/forecast", params={"horizon_days": 7}).json()
+    assert [p["sku"] for p in soon["products"]] == ["FAST"]
+
+    # Declared before /inventory/{inventory_id}, so it is not parsed as an id.
+    response = client.get("/api/v1/inventory/low-stock")
+    assert response.status_code == 200
+    assert {a["product_name"] for a in response.json()} == {"FAST", "IDLE"}
+
+
+def test_dashboard_summary_served_from_snapshots(setup_database, monkeypatch):
+    # Without a scheduler, reads refresh the snapshots in a background thread.
+    monkeypatch.setattr(dashboard_snapshots, "scheduled", False)
+    category_id = client.post("/api/v1/categories/", json={"name": "Dash"}).json()["id"]
+    product = {"name": "D", "sku": "DASH-1", "price": 2.0, "category_id": category_id}
+    product_id = client.post("/api/v1/products/", json=product).json()["id"]
+    client.post("/api/v1/inventory/", json={"product_id": product_id, "quantity": 50})
+    customer_id = client.post("/api/v1/customers/", json={"name": "Dash"}).json()["id"]
+    yesterday = date.today() - timedelta(days=1)
+
+    def add_sale(number):
+        sale = {
+            "order_number": f"DASH-{number}",
+            "order_date": f"{yesterday.isoformat()}T10:00:00",
+            "customer_id": customer_id,
+            "total_amount": 2.0,
+            "items": [{"product_id": product_id, "quantity": 1, "unit_price": 2.0}],
+        }
+        assert client.post("/api/v1/sales/", json=sale).status_code == 201
+
+    def summary(period_days=30):
+        response = client.get(
+            "/api/v1/dashboard/summary", params={"period_days": period_days}
+        )
+        assert response.status_code == 200
+        return response
+
+    def wait_for_refresh():
+        deadline = time.time() + 10
+        while dashboard_snapshots.refreshing and time.time() < deadline:
+            time.sleep(0.01)
+        assert not dashboard_snapshots.refreshing
+
+    def set_snapshots(**values):
+        with engine.begin() as conn:
+            conn.execute(update(DashboardSnapshot).values(**values))
+
+    add_sale(1)
+    # Without a snapshot the summary is computed in the request.
+    response = summary()
+    assert response.headers["X-Snapshot"] == "miss"
+    assert "Age" not in response.headers
+    assert response.json()["sales_summary"]["total_orders"] == 1
+
+    wait_for_refresh()
+    response = summary()
+    assert response.headers["X-Snapshot"] == "fresh"
+    assert int(response.headers["Age"]) >= 0
+    add_sale(2)
+    assert summary().json()["sales_summary"]["total_orders"] == 1
+
+    # Past the TTL the old snapshot is served once more and replaced.
+    set_snapshots(computed_at=datetime.now(timezone.utc) - timedelta(seconds=400))
+    response = summary()
+    assert response.headers["X-Snapshot"] == "stale"
+    assert int(response.headers["Age"]) >= 400
+    assert response.json()["sales_summary"]["total_orders"] == 1
+    wait_for_refresh()
+    response = summary()
+    assert response.headers["X-Snapshot"] == "fresh"
+    assert response.json()["sales_summary"]["total_orders"] == 2
+
+    # Too old, or from an earlier day: computed in the request instead.
+    add_sale(3)
+    for values in (
+        {"computed_at": datetime(2020, 1, 1)},
+        {"end_date": yesterday},
+    ):
+        set_snapshots(**values)
+        response = summary()
+        assert response.headers["X-Snapshot"] == "live"
+        assert "Age" not in response.headers
+        assert response.json()["sales_summary"]["total_orders"] == 3
+        wait_for_refresh()
+        assert summary().headers["X-Snapshot"] == "fresh"
+
+    response = summary(period_days=14)
+    assert response.headers["X-Snapshot"] == "live"
+    assert response.json()["period"]["days"] == 14
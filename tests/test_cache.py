@@ -0,0 +1,38 @@
+from app.core.cache import EntityCache
+
+
+def test_namespaces_are_bounded_lru():
+    cache = EntityCache(max_entries=2)
+    for key in ("a", "b"):
+        cache.set("product", key, {"id": key}, cache.generation("product"))
+    cache.get("product", "a")
+    cache.set("product", "c", {"id": "c"}, cache.generation("product"))
+
+    assert cache.get("product", "b") is None
+    assert cache.get("product", "a") == {"id": "a"}
+    assert cache.stats()["product"] == {
+        "entries": 2,
+        "hits": 2,
+        "misses": 1,
+        "hit_rate": 0.6667,
+    }
+
+
+def test_invalidation_drops_namespace_and_rejects_racing_fill():
+    cache = EntityCache()
+    cache.set("product", 1, {"price": 1.0}, cache.generation("product"))
+    cache.set("customer", 1, {"name": "Ada"}, cache.generation("customer"))
+
+    # A reader loaded the old row before the update invalidated the namespace.
+    generation = cache.generation("product")
+    cache.invalidate("product")
+    assert not cache.set("product", 1, {"price": 1.0}, generation)
+
+    assert cache.get("product", 1) is None
+    assert cache.get("customer", 1) == {"name": "Ada"}
+
+
+def test_zero_entries_disables_caching():
+    cache = EntityCache(max_entries=0)
+    cache.set("product", 1, {"price": 1.0}, cache.generation("product"))
+    assert cache.get("product", 1) is None
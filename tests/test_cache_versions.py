@@ -0,0 +1,55 @@
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from app.core.cache import EntityCache
+from app.db.cache_versions import CacheVersionPoller, track_cache_versions
+from app.db.session import Base
+from app.models.models import CacheVersion, Category, Customer
+
+
+def _setup(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'versions.db'}")
+    Base.metadata.create_all(bind=engine)
+    track_cache_versions()
+    return engine, sessionmaker(bind=engine)
+
+
+def _versions(engine):
+    with engine.connect() as conn:
+        return dict(
+            conn.execute(select(CacheVersion.namespace, CacheVersion.version)).all()
+        )
+
+
+def test_other_workers_drop_only_written_namespaces(tmp_path):
+    engine, Session = _setup(tmp_path)
+    cache = EntityCache()
+    poller = CacheVersionPoller(engine, cache)
+    poller.ensure_rows()
+    poller.poll()
+
+    cache.set("category", ("id", 1), {"name": "Old"}, cache.generation("category"))
+    cache.set("customer", ("id", 1), {"name": "Ada"}, cache.generation("customer"))
+
+    # Another worker writes a category.
+    with Session() as db:
+        db.add(Category(name="Books"))
+        db.commit()
+
+    assert _versions(engine)["category"] == 1
+    assert poller.poll() == {"category"}
+    assert cache.get("category", ("id", 1)) is None
+    assert cache.get("customer", ("id", 1)) == {"name": "Ada"}
+    assert poller.poll() == set()
+
+
+def test_rolled_back_writes_do_not_bump(tmp_path):
+    engine, Session = _setup(tmp_path)
+    CacheVersionPoller(engine, EntityCache()).ensure_rows()
+
+    with Session() as db:
+        db.add(Customer(name="Ada"))
+        db.flush()
+        db.rollback()
+
+    assert set(_versions(engine).values()) == {0}
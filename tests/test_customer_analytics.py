@@ -0,0 +1,116 @@
+import random
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+
+import numpy as np
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.analytics.customers import (
+    cohort_matrix,
+    load_order_aggregates,
+    quintile_scores,
+    refresh_customer_analytics,
+    rfm_scores,
+)
+from app.crud import crud
+from app.db.session import Base
+from app.models.models import Customer, Sale
+
+AS_OF = date(2024, 7, 1)
+
+
+def _database(tmp_path, sales=300):
+    engine = create_engine(f"sqlite:///{tmp_path / 'rfm.db'}")
+    Base.metadata.create_all(bind=engine)
+    rng = random.Random(3)
+    orders = []
+    with engine.begin() as conn:
+        conn.execute(
+            insert(Customer), [{"id": i, "name": f"C{i}"} for i in range(1, 41)]
+        )
+        for i in range(1, sales + 1):
+            order = (
+                rng.randint(1, 40),
+                datetime(2024, 1, 1) + timedelta(minutes=rng.randint(0, 60 * 24 * 180)),
+                round(rng.uniform(5, 200), 2),
+            )
+            orders.append(order)
+            conn.execute(
+                insert(Sale),
+                {
+                    "order_number": f"RFM-{i}",
+                    "customer_id": order[0],
+                    "order_date": order[1],
+                    "total_amount": order[2],
+                },
+            )
+    return engine, orders
+
+
+def test_chunked_aggregates_match_row_by_row(tmp_path):
+    engine, orders = _database(tmp_path)
+    with engine.connect() as conn:
+        aggregates = load_order_aggregates(conn, chunk_size=17)
+
+    last, count, revenue = {}, defaultdict(int), defaultdict(float)
+    first_month, active = {}, set()
+    for customer_id, order_date, amount in orders:
+        month = (order_date.year - 1970) * 12 + order_date.month - 1
+        last[customer_id] = max(last.get(customer_id, order_date), order_date)
+        count[customer_id] += 1
+        revenue[customer_id] += amount
+        first_month[customer_id] = min(first_month.get(customer_id, month), month)
+        active.add((customer_id, month))
+
+    rfm = rfm_scores(aggregates, AS_OF)
+    assert rfm["customer_id"].tolist() == sorted(count)
+    for i, customer_id in enumerate(rfm["customer_id"].tolist()):
+        assert rfm["recency_days"][i] == (AS_OF - last[customer_id].date()).days
+        assert rfm["frequency"][i] == count[customer_id]
+        assert abs(rfm["monetary"][i] - revenue[customer_id]) < 1e-6
+
+    cells = defaultdict(int)
+    for customer_id, month in active:
+        cells[(first_month[customer_id], month - first_month[customer_id])] += 1
+    cohorts = cohort_matrix(aggregates)
+    got = zip(cohorts["cohort"], cohorts["months_since"], cohorts["customers"])
+    assert {(int(c), int(m)): int(n) for c, m, n in got} == dict(cells)
+    assert all(
+        r == 1.0
+        for r, m in zip(cohorts["retention"], cohorts["months_since"])
+        if m == 0
+    )
+
+
+def test_quintile_scores_keep_ties_together():
+    scores = quintile_scores(np.array([1, 1, 1, 1, 1, 1, 2, 3, 5, 8]))
+    assert scores.tolist()[:6] == [1] * 6
+    assert scores.tolist()[6:] == sorted(scores.tolist()[6:])
+    assert scores.max() == 5
+
+
+def test_results_are_cached_and_served(tmp_path):
+    engine, orders = _database(tmp_path, sales=120)
+    db = sessionmaker(bind=engine)()
+    # The first read computes the tables.
+    assert crud.get_rfm_summary(db)["computed_at"] is not None
+
+    result = refresh_customer_analytics(engine, as_of=AS_OF, chunk_size=50)
+    assert result["customers"] == len({order[0] for order in orders})
+    summary = crud.get_rfm_summary(db)
+    assert summary["as_of"] == AS_OF
+    assert sum(s["customers"] for s in summary["segments"]) == result["customers"]
+    assert abs(sum(s["share"] for s in summary["segments"]) - 1) < 1e-9
+
+    segment = summary["segments"][0]["segment"]
+    members = crud.get_rfm_segment(db, segment, limit=5)
+    assert members and all(m.segment == segment for m in members)
+
+    retention = crud.get_cohort_retention(db, cohorts=3)
+    assert [c["cohort"] for c in retention["cohorts"]] == [
+        "2024-04",
+        "2024-05",
+        "2024-06",
+    ]
+    assert all(c["retention"][0] == 1.0 for c in retention["cohorts"])
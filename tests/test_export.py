@@ -0,0 +1,163 @@
+import os
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, delete, insert, update
+
+from app.db.session import Base
+from app.models.models import Category, Customer, Product, Sale, SaleItem
+
+pq = pytest.importorskip("pyarrow.parquet")
+
+from app.analytics.export import ParquetExporter, RUN_COLUMN
+
+
+def _sale(sale_id, order_date):
+    return {
+        "id": sale_id,
+        "order_number": f"ORD-{sale_id}",
+        "order_date": order_date,
+        "customer_id": 1,
+        "total_amount": 10.0 * sale_id,
+        "platform": "Amazon",
+        "status": "completed",
+        "created_at": order_date,
+    }
+
+
+def test_export_is_partitioned_and_incremental(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'export.db'}")
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(insert(Category), [{"id": 1, "name": "Books"}])
+        conn.execute(
+            insert(Product),
+            [{"id": 1, "name": "Book", "sku": "BK-1", "price": 10.0, "category_id": 1}],
+        )
+        conn.execute(insert(Customer), [{"id": 1, "name": "Ada"}])
+        conn.execute(
+            insert(Sale),
+            [_sale(1, datetime(2024, 1, 5)), _sale(2, datetime(2024, 2, 9))],
+        )
+        conn.execute(
+            insert(SaleItem),
+            [
+                {
+                    "id": i,
+                    "sale_id": i,
+                    "product_id": 1,
+                    "quantity": 1,
+                    "unit_price": 10.0,
+                    "created_at": datetime(2024, 2, 9),
+                }
+                for i in (1, 2)
+            ],
+        )
+
+    output = tmp_path / "parquet"
+    exporter = ParquetExporter(engine, str(output), chunk_size=1)
+    assert exporter.export(["sales", "sale_items"]) == {"sales": 2, "sale_items": 2}
+    assert (output / "sale_items" / "month=2024-01" / "part-000001.parquet").exists()
+    assert (output / "sale_items" / "month=2024-02" / "part-000001.parquet").exists()
+
+    # Nothing changed recently: the second run reads nothing past the watermarks.
+    assert exporter.export(["sales", "sale_items"]) == {"sales": 0, "sale_items": 0}
+
+    with engine.begin() as conn:
+        conn.execute(insert(Sale), [_sale(3, datetime(2024, 2, 20))])
+        conn.execute(
+            update(Sale)
+            .where(Sale.id == 1)
+            .values(status="refunded", updated_at=datetime(2100, 1, 1))
+        )
+    written = exporter.export(["sales"])
+    assert written == {"sales": 2}
+
+    table = pq.read_table(output / "sales").to_pylist()
+    latest = {}
+    for row in sorted(table, key=lambda r: r[RUN_COLUMN]):
+        latest[row["id"]] = row
+    assert sorted(latest) == [1, 2, 3]
+    assert latest[1]["status"] == "refunded"
+
+
+def test_rows_committed_late_are_exported_by_the_next_run(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'export.db'}")
+    Base.metadata.create_all(bind=engine)
+
+    def recent_sale(sale_id):
+        sale = _sale(sale_id, datetime(2024, 1, 6))
+        del sale["created_at"]  # created now
+        return sale
+
+    with engine.begin() as conn:
+        conn.execute(insert(Customer), [{"id": 1, "name": "Ada"}])
+        conn.execute(insert(Sale), [_sale(1, datetime(2024, 1, 5))])
+        conn.execute(insert(Sale), [recent_sale(3)])
+
+    output = tmp_path / "parquet"
+    exporter = ParquetExporter(engine, str(output))
+    assert exporter.export(["sales"]) == {"sales": 2}
+
+    # Sale 2 got its id before sale 3 was exported but committed after it.
+    with engine.begin() as conn:
+        conn.execute(insert(Sale), [recent_sale(2)])
+    exporter.export(["sales"])
+    ids = {row["id"] for row in pq.read_table(output / "sales").to_pylist()}
+    assert ids == {1, 2, 3}
+
+    # Rows older than the rescan window are not read again.
+    exporter.rescan_seconds = -60
+    exporter.export(["sales"])
+    assert exporter.export(["sales"]) == {"sales": 0}
+
+
+def test_unfinished_run_files_are_removed(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'export.db'}")
+    Base.metadata.create_all(bind=engine)
+    output = tmp_path / "parquet"
+    exporter = ParquetExporter(engine, str(output))
+    exporter.export(["products"])
+
+    orphan = output / "products" / "part-000009.parquet"
+    orphan.parent.mkdir(parents=True, exist_ok=True)
+    orphan.write_bytes(b"partial")
+    exporter.export(["products"])
+    assert not orphan.exists()
+
+
+def test_deleted_rows_are_exported_as_tombstones(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'export.db'}")
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(insert(Category), [{"id": 1, "name": "Books"}])
+        conn.execute(
+            insert(Product),
+            [
+                {
+                    "id": i,
+                    "name": f"B{i}",
+                    "sku": f"BK-{i}",
+                    "price": 1.0,
+                    "category_id": 1,
+                    "created_at": datetime(2024, 1, 1),
+                }
+                for i in (1, 2, 3)
+            ],
+        )
+
+    output = tmp_path / "parquet"
+    exporter = ParquetExporter(engine, str(output))
+    assert exporter.export(["products"]) == {"products": 3}
+
+    # Products are exported incrementally; only the deleted ids are written.
+    with engine.begin() as conn:
+        conn.execute(delete(Product).where(Product.id.in_([1, 3])))
+    assert exporter.export(["products"]) == {"products": 0}
+    tombstones = pq.read_table(output / "_deleted" / "products").to_pylist()
+    assert tombstones == [{"id": 1, RUN_COLUMN: 2}, {"id": 3, RUN_COLUMN: 2}]
+    assert exporter.load_state()["tables"]["products"]["last_run_deleted"] == 2
+
+    exporter.export(["products"])
+    assert exporter.load_state()["tables"]["products"]["last_run_deleted"] == 0
+    assert sorted(os.listdir(output / "_ids" / "products")) == ["ids-000003.parquet"]
@@ -0,0 +1,54 @@
+import asyncio
+import time
+
+from sqlalchemy import create_engine
+
+from app.core.health import HealthMonitor
+
+
+def test_ready_after_successful_ping(tmp_path):
+    monitor = HealthMonitor(create_engine(f"sqlite:///{tmp_path / 'health.db'}"))
+    assert monitor.readiness()["status"] == "unavailable"
+
+    monitor.ping()
+    readiness = monitor.readiness()
+    assert readiness["status"] == "ok"
+    assert readiness["database"]["latency_ms"] is not None
+    assert readiness["pool"]["capacity"] == 5 + 10
+
+    unlimited = HealthMonitor(
+        create_engine(f"sqlite:///{tmp_path / 'health.db'}"), max_overflow=-1
+    )
+    unlimited.ping()
+    assert unlimited.readiness()["checks"]["pool"] is True
+    assert unlimited.readiness()["pool"]["capacity"] is None
+
+
+def test_not_ready_when_database_fails_or_ping_is_stale(tmp_path):
+    monitor = HealthMonitor(
+        create_engine(f"sqlite:///{tmp_path / 'missing' / 'health.db'}")
+    )
+    monitor.ping()
+    readiness = monitor.readiness()
+    assert readiness["checks"]["database"] is False
+    assert readiness["database"]["error"]
+
+    monitor = HealthMonitor(create_engine("sqlite://"), interval=1)
+    monitor.ping()
+    monitor.db_checked_at = time.time() - 10
+    assert monitor.readiness()["checks"]["database"] is False
+
+
+def test_event_loop_lag_is_measured():
+    monitor = HealthMonitor(create_engine("sqlite://"), interval=0.05, max_loop_lag=0.1)
+
+    async def block_loop():
+        task = asyncio.get_running_loop().create_task(monitor._lag_loop())
+        await asyncio.sleep(0.01)
+        time.sleep(0.3)  # blocks the event loop
+        await asyncio.sleep(0.01)  # the probe wakes up late once
+        task.cancel()
+
+    asyncio.run(block_loop())
+    assert monitor.loop_lag > 0.1
+    assert monitor.readiness()["checks"]["event_loop"] is False
@@ -0,0 +1,43 @@
+import json
+import logging
+
+from sqlalchemy import create_engine, text
+
+from app.db.instrumentation import N_PLUS_ONE_THRESHOLD, QueryStats, instrument_engine
+from app.db.slow_query import SlowQueryLog
+
+
+def test_warns_once_when_statement_repeats_past_threshold(caplog):
+    stats = QueryStats(lambda: "/api/v1/sales/{sale_id}")
+    statement = "SELECT * FROM products WHERE products.id = ?"
+
+    with caplog.at_level(logging.WARNING, logger="sql"):
+        for _ in range(N_PLUS_ONE_THRESHOLD * 2):
+            stats.record(statement, 0.001)
+        stats.record("SELECT 1", 0.001)
+
+    assert stats.count == N_PLUS_ONE_THRESHOLD * 2 + 1
+    warnings = [
+        r for r in caplog.records if r.getMessage() == "possible N+1 query pattern"
+    ]
+    assert len(warnings) == 1
+    assert warnings[0].route == "/api/v1/sales/{sale_id}"
+    assert warnings[0].statement == statement
+
+
+def test_slow_queries_are_logged_with_plan(tmp_path):
+    path = tmp_path / "slow.log"
+    slow_log = SlowQueryLog(threshold_ms=0.000001, path=str(path))
+    engine = create_engine("sqlite://")
+    instrument_engine(engine, slow_log=slow_log)
+
+    with engine.connect() as conn:
+        conn.execute(text("CREATE TABLE t (id INTEGER PRIMARY KEY, name TEXT)"))
+        conn.execute(text("SELECT name FROM t WHERE id IN (1, 2, 3)")).all()
+    slow_log.flush()
+
+    entries = [json.loads(line) for line in path.read_text().splitlines()]
+    select = next(e for e in entries if e["statement"].startswith("SELECT"))
+    assert select["normalized"] == "SELECT name FROM t WHERE id IN (?)"
+    assert select["plan"]
+    assert not any(e["statement"].startswith("EXPLAIN") for e in entries)
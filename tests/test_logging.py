@@ -0,0 +1,35 @@
+import json
+import logging
+
+from app.core.logging_config import JSONFormatter, SuccessSamplingFilter
+
+
+def _record(status=None, level=logging.INFO):
+    record = logging.makeLogRecord(
+        {
+            "name": "api",
+            "levelno": level,
+            "levelname": logging.getLevelName(level),
+            "msg": "request completed",
+        }
+    )
+    if status is not None:
+        record.status = status
+        record.route = "/api/v1/products/{product_id}"
+    return record
+
+
+def test_json_formatter_includes_extra_fields():
+    payload = json.loads(JSONFormatter().format(_record(status=200)))
+    assert payload["message"] == "request completed"
+    assert payload["status"] == 200
+    assert payload["route"] == "/api/v1/products/{product_id}"
+    assert payload["level"] == "INFO"
+
+
+def test_sampling_drops_successes_but_keeps_errors():
+    sampler = SuccessSamplingFilter(rate=0.0)
+    assert not sampler.filter(_record(status=200))
+    assert sampler.filter(_record(status=404))
+    assert sampler.filter(_record(status=500, level=logging.ERROR))
+    assert sampler.filter(_record())
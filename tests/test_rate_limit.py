@@ -0,0 +1,137 @@
+import math
+import multiprocessing
+import threading
+
+import pytest
+from fastapi import HTTPException
+
+from app.core import rate_limit
+from app.core.rate_limit import MemoryBackend, RateLimiter, SharedMemoryBackend
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_allows_burst_then_blocks():
+    clock = FakeClock()
+    limiter = RateLimiter(calls=5, period=10, backend=MemoryBackend(clock=clock))
+
+    assert all(limiter.is_allowed("a") for _ in range(5))
+    allowed, retry_after = limiter.acquire("a")
+    assert not allowed
+    assert retry_after == 2.0
+
+    clock.now += 2
+    assert limiter.is_allowed("a")
+    assert not limiter.is_allowed("a")
+
+
+def test_cost_consumes_quota():
+    limiter = RateLimiter(calls=10, period=10, backend=MemoryBackend(clock=FakeClock()))
+
+    assert limiter.is_allowed("a", cost=5)
+    assert limiter.is_allowed("a", cost=5)
+    assert not limiter.is_allowed("a", cost=1)
+    assert not limiter.is_allowed("b", cost=11)
+
+
+def test_cost_above_the_limit_is_never_allowed(monkeypatch):
+    limiter = RateLimiter(calls=10, period=10, backend=MemoryBackend(clock=FakeClock()))
+
+    assert limiter.acquire("a", cost=11) == (False, math.inf)
+    # The rejected request spent nothing.
+    assert limiter.is_allowed("a", cost=10)
+
+    monkeypatch.setattr(rate_limit, "RATE_LIMIT_ENABLED", True)
+    dependency = rate_limit.rate_limit(limiter, key_func=lambda r: "b", cost=11)
+    with pytest.raises(HTTPException) as error:
+        dependency.dependency(None)
+    assert error.value.status_code == 429
+    assert "never" in error.value.detail
+    assert not error.value.headers
+
+
+def test_evicts_least_recently_used_keys():
+    backend = MemoryBackend(max_keys=3, clock=FakeClock())
+    limiter = RateLimiter(calls=1, period=60, backend=backend)
+
+    for key in ("a", "b", "c"):
+        assert limiter.is_allowed(key)
+    assert not limiter.is_allowed("a")
+
+    assert limiter.is_allowed("d")
+    assert list(backend.cache) == ["b", "c", "d"]
+    assert limiter.is_allowed("a")
+
+
+def test_shared_backend_matches_memory_semantics(tmp_path):
+    clock = FakeClock()
+    backend = SharedMemoryBackend(str(tmp_path / "rl"), slots=64, clock=clock)
+    limiter = RateLimiter(calls=5, period=10, backend=backend)
+
+    assert all(limiter.is_allowed("a") for _ in range(5))
+    assert limiter.acquire("a") == (False, 2.0)
+    assert limiter.is_allowed("b")
+
+    clock.now += 2
+    assert limiter.is_allowed("a")
+
+    limiter.reset()
+    assert all(limiter.is_allowed("a") for _ in range(5))
+
+
+def test_shared_backend_reuses_oldest_slot_when_bucket_is_full(tmp_path):
+    clock = FakeClock()
+    backend = SharedMemoryBackend(
+        str(tmp_path / "rl"), slots=4, bucket_size=4, clock=clock
+    )
+    limiter = RateLimiter(calls=1, period=60, backend=backend)
+
+    for key in ("a", "b", "c", "d"):
+        assert limiter.is_allowed(key)
+        clock.now += 1
+    assert limiter.is_allowed("e")
+
+    assert limiter.is_allowed("a")
+    assert not limiter.is_allowed("c")
+
+
+def _spend(path, results):
+    limiter = RateLimiter(calls=60, period=3600, backend=SharedMemoryBackend(path))
+    results.put(sum(limiter.is_allowed("client") for _ in range(50)))
+
+
+def test_shared_backend_enforces_one_quota_across_processes(tmp_path):
+    path = str(tmp_path / "rl")
+    ctx = multiprocessing.get_context("spawn")
+    results = ctx.Queue()
+    workers = [ctx.Process(target=_spend, args=(path, results)) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    allowed = sum(results.get(timeout=30) for _ in workers)
+    for worker in workers:
+        worker.join()
+
+    assert allowed == 60
+
+
+def test_shared_backend_is_thread_safe(tmp_path):
+    backend = SharedMemoryBackend(str(tmp_path / "rl"))
+    limiter = RateLimiter(calls=100, period=3600, backend=backend)
+    allowed = []
+
+    def spend():
+        allowed.append(sum(limiter.is_allowed("client") for _ in range(50)))
+
+    threads = [threading.Thread(target=spend) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sum(allowed) == 100
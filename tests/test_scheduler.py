@@ -0,0 +1,126 @@
+import threading
+import time
+
+from sqlalchemy import create_engine, select
+
+from app.core.metrics import registry
+from app.core.scheduler import JobLock, Scheduler
+from app.db.session import Base
+from app.models.models import ScheduledJob
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _workers(tmp_path, clock, count=2, **kwargs):
+    engine = create_engine(f"sqlite:///{tmp_path / 'jobs.db'}")
+    Base.metadata.create_all(bind=engine, tables=[ScheduledJob.__table__])
+    return [Scheduler(engine, clock=clock, **kwargs) for _ in range(count)]
+
+
+def test_each_run_is_claimed_by_one_worker(tmp_path):
+    clock = Clock()
+    runs = []
+    workers = _workers(tmp_path, clock)
+    for index, worker in enumerate(workers):
+        worker.register("rollup", 60, lambda index=index: runs.append(index))
+
+    assert [w.run_pending() for w in workers] == [[], []]
+    clock.now += 60
+    assert [w.run_pending() for w in workers] == [["rollup"], []]
+    clock.now += 30
+    assert [w.run_pending() for w in workers] == [[], []]
+    clock.now += 30
+    assert workers[1].run_pending() == ["rollup"]
+    assert workers[0].run_pending() == []
+    assert runs == [0, 1]
+
+    (status,) = workers[0].status()
+    assert status["running"] is False
+    assert status["last_error"] is None
+    assert status["owner"] == workers[1].owner
+
+
+def test_run_soon_makes_a_job_due_for_one_worker(tmp_path):
+    clock = Clock()
+    runs = []
+    workers = _workers(tmp_path, clock)
+    for index, worker in enumerate(workers):
+        worker.register("snapshots", 300, lambda index=index: runs.append(index))
+
+    assert [w.run_pending() for w in workers] == [[], []]
+    workers[1].run_soon("snapshots")
+    assert [w.run_pending() for w in workers] == [["snapshots"], []]
+    assert runs == [0]
+
+
+def test_failures_are_recorded_and_leases_expire(tmp_path):
+    clock = Clock()
+    first, second = _workers(tmp_path, clock, lease_seconds=300)
+
+    def fail():
+        raise RuntimeError("boom")
+
+    first.register("broken", 3600, fail, delay=0)
+    assert first.run_pending() == ["broken"]
+    (status,) = first.status()
+    assert status["last_error"] == "RuntimeError: boom"
+    assert 'scheduler_job_runs_total{job="broken",status="failure"} 1' in (
+        registry.render()
+    )
+
+    # A worker that dies holding the lease blocks the job until it lapses.
+    second.register("stuck", 60, lambda: None, delay=0)
+    second.ensure_rows()
+    assert second.lock.acquire("stuck") is not None
+    clock.now += 120
+    first.register("stuck", 60, lambda: None)
+    assert first.run_pending() == []
+    clock.now += 300
+    assert first.run_pending() == ["stuck"]
+
+
+def test_session_lock_takes_over_a_dead_workers_lease(tmp_path, monkeypatch):
+    # As on MySQL, where holding GET_LOCK proves the lease holder is gone.
+    monkeypatch.setattr(JobLock, "lease_only", False)
+    clock = Clock()
+    first, second = _workers(tmp_path, clock, lease_seconds=300)
+    second.register("stuck", 60, lambda: None, delay=0)
+    second.ensure_rows()
+    assert second.lock.acquire("stuck") is not None
+    first.register("stuck", 60, lambda: None)
+    assert first.run_pending() == ["stuck"]
+
+
+def test_stop_gives_up_runs_that_never_started(tmp_path):
+    clock = Clock()
+    (worker,) = _workers(tmp_path, clock, count=1, max_workers=1, tick=0.01)
+    started, release = threading.Event(), threading.Event()
+
+    def slow():
+        started.set()
+        release.wait(5)
+
+    worker.register("a_slow", 60, slow, delay=0)
+    worker.register("b_queued", 60, lambda: None, delay=0)
+    worker.start()
+    assert started.wait(5)
+    deadline = time.monotonic() + 5
+    while not worker.jobs["b_queued"].running and time.monotonic() < deadline:
+        time.sleep(0.01)
+    worker.stop()
+    release.set()
+
+    with worker.engine.connect() as conn:
+        leases = dict(
+            conn.execute(select(ScheduledJob.name, ScheduledJob.locked_until)).all()
+        )
+    assert leases["b_queued"] is None
+    assert worker.jobs["b_queued"].running is False
+    # It was never run, so it is due again at once.
+    assert worker.run_pending() == ["b_queued"]
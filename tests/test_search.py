@@ -0,0 +1,103 @@
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.crud import crud
+from app.db.session import Base
+from app.models.models import Category, Customer, Product
+from app.schemas import schemas
+
+
+def _session(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'search.db'}")
+    Base.metadata.create_all(bind=engine)
+    return engine, sessionmaker(bind=engine)()
+
+
+def _add(db, sku, name, description=None):
+    product = Product(
+        sku=sku, name=name, description=description, price=1.0, category_id=1
+    )
+    db.add(product)
+    db.commit()
+    return product
+
+
+def _skus(db, q, limit=20):
+    return [product.sku for product in crud.search_products(db, q, limit=limit)]
+
+
+def test_sku_prefix_then_ranked_full_text(tmp_path):
+    _, db = _session(tmp_path)
+    db.add(Category(id=1, name="Apparel"))
+    _add(db, "TS-200", "Red T-Shirt")
+    _add(db, "TS-100", "Blue T-Shirt")
+    _add(db, "HAT-1", "Sun hat", "Goes with any blue shirt")
+    _add(db, "SHO-1", "Running shoes", "Lightweight")
+
+    assert _skus(db, "TS-") == ["TS-100", "TS-200"]
+    assert _skus(db, "TS-1") == ["TS-100"]
+    # Name matches outrank description matches; words match as prefixes.
+    assert _skus(db, "blue shir") == ["TS-100", "HAT-1"]
+    assert len(_skus(db, "shirt", limit=1)) == 1
+    # FTS5 operators in user input are treated as plain words.
+    assert _skus(db, 'shoes OR "hat') == []
+    assert _skus(db, "  ") == []
+
+
+def test_index_follows_updates_deletes_and_recreation(tmp_path):
+    engine, db = _session(tmp_path)
+    db.add(Category(id=1, name="Apparel"))
+    shirt = _add(db, "TS-100", "Blue T-Shirt")
+    hat = _add(db, "HAT-1", "Sun hat")
+
+    shirt.name = "Green polo"
+    db.commit()
+    assert _skus(db, "blue") == []
+    assert _skus(db, "polo") == ["TS-100"]
+
+    db.delete(hat)
+    db.commit()
+    assert _skus(db, "hat") == []
+
+    db.close()
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    db.add(Category(id=1, name="Apparel"))
+    _add(db, "MUG-1", "Coffee mug")
+    assert _skus(db, "polo") == []
+    assert _skus(db, "mug") == ["MUG-1"]
+
+
+def test_customer_search_keys_and_duplicates(tmp_path):
+    _, db = _session(tmp_path)
+    ada = Customer(
+        name="  Ada  Lovelace", email="Ada@Example.com", phone="+44 20 7946 0018"
+    )
+    db.add_all([ada, Customer(name="Adam Smith"), Customer(name="Zoë Ångström")])
+    db.commit()
+
+    assert (ada.name_normalized, ada.email_normalized, ada.phone_digits) == (
+        "ada lovelace",
+        "ada@example.com",
+        "442079460018",
+    )
+    assert [c.name for c in crud.search_customers(db, "ADA")] == [
+        "  Ada  Lovelace",
+        "Adam Smith",
+    ]
+    assert [c.id for c in crud.search_customers(db, "ada l")] == [ada.id]
+    assert [c.id for c in crud.search_customers(db, "ada@ex")] == [ada.id]
+    assert [c.id for c in crud.search_customers(db, "(44) 20-79")] == [ada.id]
+    assert crud.search_customers(db, "zoe")[0].name == "Zoë Ångström"
+    assert len(crud.search_customers(db, "a", limit=1)) == 1
+
+    duplicate = schemas.CustomerCreate(name="A. Lovelace", email=" ada@EXAMPLE.com ")
+    assert crud.find_duplicate_customers(db, duplicate) == [ada]
+    same_phone = schemas.CustomerCreate(name="Someone", phone="442079460018")
+    assert crud.find_duplicate_customers(db, same_phone) == [ada]
+    assert crud.find_duplicate_customers(db, schemas.CustomerCreate(name="Ada")) == []
+
+    ada.phone = "555 0100"
+    db.commit()
+    assert crud.find_duplicate_customers(db, same_phone) == []
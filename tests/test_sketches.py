@@ -0,0 +1,100 @@
+import random
+from bisect import bisect_left, bisect_right
+from datetime import date, timedelta
+
+from sqlalchemy import create_engine, func
+from sqlalchemy.orm import sessionmaker
+
+from app.analytics.sketches import HLL_STANDARD_ERROR, HyperLogLog, TDigest
+from app.crud import crud
+from app.models.models import Sale
+from benchmarks.seed import seed
+
+
+def test_hyperloglog_error_and_merge():
+    for n in (10, 1_000, 50_000):
+        sketch = HyperLogLog()
+        for value in range(n):
+            sketch.add(value)
+        assert abs(sketch.count() - n) <= max(3 * HLL_STANDARD_ERROR * n, 1)
+
+    a, b = HyperLogLog(), HyperLogLog()
+    for value in range(20_000):
+        a.add(value)
+    for value in range(10_000, 30_000):
+        b.add(value)
+    union = HyperLogLog.merge_all([a.to_bytes(), b.to_bytes()])
+    assert abs(union.count() - 30_000) <= 3 * HLL_STANDARD_ERROR * 30_000
+    a.merge(b)
+    assert a.to_bytes() == union.to_bytes()
+    # Adding a value twice changes nothing.
+    assert not a.add(5)
+
+
+def _rank_range(ordered, value):
+    """Fractions of ``ordered`` below and up to ``value``."""
+    n = len(ordered)
+    return bisect_left(ordered, value) / n, bisect_right(ordered, value) / n
+
+
+def test_tdigest_quantiles_and_merge():
+    rng = random.Random(7)
+    values = [rng.lognormvariate(4, 1) for _ in range(50_000)]
+    ordered = sorted(values)
+    days = [TDigest() for _ in range(30)]
+    for i, value in enumerate(values):
+        days[i % len(days)].add(value)
+    stored = [d.to_bytes() for d in days]
+    merged = TDigest.merge_all(stored)
+    assert merged.count == len(values)
+    assert (merged.minimum, merged.maximum) == (ordered[0], ordered[-1])
+    for q, tolerance in ((0.5, 0.01), (0.9, 0.005), (0.99, 0.002)):
+        low, high = _rank_range(ordered, merged.quantile(q))
+        assert low - tolerance <= q <= high + tolerance
+
+    one = TDigest(stored[0])
+    for data in stored[1:]:
+        one.merge(TDigest(data))
+    assert abs(one.quantile(0.99) - merged.quantile(0.99)) < 0.01 * ordered[-1]
+
+    small = TDigest()
+    for value in (5, 1, 3):
+        small.add(value)
+    assert [small.quantile(q) for q in (0, 0.5, 1)] == [1, 3, 5]
+    assert TDigest().quantile(0.5) is None
+
+
+def test_unique_customers_from_rollups(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'hll.db'}")
+    seed(engine, 5000, days=90)
+    db = sessionmaker(bind=engine)()
+    end = date.today()
+    start = end - timedelta(days=90)
+
+    result = crud.get_unique_customers(db, start, end, group_by="month")
+    exact = (
+        db.query(func.count(func.distinct(Sale.customer_id)))
+        .filter(func.date(Sale.order_date) >= start.isoformat())
+        .scalar()
+    )
+    estimate = result["total"]["unique_customers"]
+    assert abs(estimate - exact) <= 3 * HLL_STANDARD_ERROR * exact
+    assert result["total"]["orders"] == 5000
+    assert sum(p["orders"] for p in result["periods"].values()) == 5000
+
+    amazon = crud.get_unique_customers(db, start, end, platform="Amazon")
+    assert 0 < amazon["total"]["orders"] < 5000
+
+    percentiles = crud.get_order_value_percentiles(db, start, end, group_by="week")
+    totals = sorted(
+        t
+        for (t,) in db.query(Sale.total_amount).filter(
+            func.date(Sale.order_date) >= start.isoformat()
+        )
+    )
+    assert percentiles["total"]["orders"] == len(totals)
+    for key, q in (("p50", 0.5), ("p90", 0.9), ("p99", 0.99)):
+        low, high = _rank_range(totals, percentiles["total"][key])
+        assert low - 0.01 <= q <= high + 0.01
+    assert sum(p["orders"] for p in percentiles["platforms"].values()) == len(totals)
+    assert percentiles["platforms"]["Amazon"]["orders"] == amazon["total"]["orders"]
@@ -0,0 +1,137 @@
+import itertools
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import create_engine, delete, insert, update
+from sqlalchemy.orm import sessionmaker
+
+from app.crud import crud
+from app.db.session import Base
+from app.models.models import Category, Customer, Product, Sale, SaleItem
+from app.schemas import schemas
+
+pytest.importorskip("duckdb")
+pytest.importorskip("pyarrow")
+
+from app.analytics.snapshot import SnapshotBackend
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'snapshot.db'}")
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(insert(Category), [{"id": 1, "name": "A"}, {"id": 2, "name": "B"}])
+        conn.execute(
+            insert(Product),
+            [
+                {
+                    "id": i,
+                    "name": f"P{i}",
+                    "sku": f"P-{i}",
+                    "price": 1.1 * i,
+                    "category_id": 1 + i % 2,
+                }
+                for i in range(1, 5)
+            ],
+        )
+        conn.execute(insert(Customer), [{"id": 1, "name": "Ada"}])
+        conn.execute(
+            insert(Sale),
+            [
+                {
+                    "id": i,
+                    "order_number": f"ORD-{i}",
+                    "order_date": datetime(2024, 1 + i % 3, 1 + i % 27, i % 24, 17),
+                    "customer_id": 1,
+                    "total_amount": round(19.99 * (i % 7) + 0.37 * i, 2),
+                    "platform": ("Amazon", "Walmart")[i % 2],
+                    "status": "completed",
+                }
+                for i in range(1, 61)
+            ],
+        )
+        conn.execute(
+            insert(SaleItem),
+            [
+                {
+                    "sale_id": i,
+                    "product_id": 1 + (i + j) % 4,
+                    "quantity": 1,
+                    "unit_price": 1.0,
+                }
+                for i in range(1, 61)
+                for j in range(i % 3)
+            ],
+        )
+    return engine
+
+
+def _results(db, group_by, **filters):
+    window = {"start_date": date(2024, 1, 1), "end_date": date(2024, 3, 20)}
+    revenue = schemas.RevenueAnalyticsParams(group_by=group_by, **window, **filters)
+    sales = schemas.SalesAnalyticsParams(**window, **filters)
+    return (
+        crud.get_sales_analytics(db, sales),
+        crud.get_revenue_analytics(db, revenue),
+        crud.compare_revenue_periods(
+            db,
+            date(2024, 2, 1),
+            date(2024, 3, 1),
+            date(2024, 1, 1),
+            date(2024, 2, 1),
+            group_by=group_by,
+            **filters,
+        ),
+    )
+
+
+def test_snapshot_results_match_sql(engine, tmp_path, monkeypatch):
+    db = sessionmaker(bind=engine)()
+    sql = SnapshotBackend(engine, str(tmp_path / "unused"), enabled=False)
+    snapshot = SnapshotBackend(engine, str(tmp_path / "parquet"))
+    snapshot._worker = object()  # refreshed explicitly below
+    snapshot.refresh()
+
+    def compare():
+        for platform, product_id, category_id, group_by in itertools.product(
+            (None, "Amazon"), (None, 2), (None, 1), ("day", "week", "month", "year")
+        ):
+            filters = dict(
+                platform=platform, product_id=product_id, category_id=category_id
+            )
+            monkeypatch.setattr(crud, "snapshot_backend", sql)
+            expected = _results(db, group_by, **filters)
+            monkeypatch.setattr(crud, "snapshot_backend", snapshot)
+            assert _results(db, group_by, **filters) == expected
+
+    compare()
+
+    # Updated and new rows are picked up by the next incremental refresh.
+    with engine.begin() as conn:
+        conn.execute(
+            update(Sale)
+            .where(Sale.id == 5)
+            .values(total_amount=1234.56, updated_at=datetime(2100, 1, 1))
+        )
+        conn.execute(
+            insert(SaleItem),
+            [{"sale_id": 7, "product_id": 2, "quantity": 1, "unit_price": 1.0}],
+        )
+    assert snapshot.refresh() == 2
+    compare()
+
+    # Deleted products disappear from the snapshot too.
+    with engine.begin() as conn:
+        conn.execute(delete(SaleItem).where(SaleItem.product_id == 4))
+        conn.execute(delete(Product).where(Product.id == 4))
+    assert snapshot.refresh() == 3
+    products = snapshot._connection().execute("SELECT id FROM products ORDER BY id")
+    assert products.fetchall() == [(1,), (2,), (3,)]
+    compare()
+
+
+def test_disabled_backend_never_serves(engine, tmp_path):
+    backend = SnapshotBackend(engine, str(tmp_path), enabled=False)
+    assert not backend.serves("sales_analytics")
+    assert backend._worker is None
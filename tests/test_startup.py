@@ -0,0 +1,57 @@
+import os
+import subprocess
+import sys
+
+from benchmarks.bench_import import PROBE
+
+
+def test_importing_app_skips_heavy_modules_and_database(tmp_path):
+    db_path = tmp_path / "startup.db"
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        env={**os.environ, "DATABASE_URL": f"sqlite:///{db_path}"},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout.strip() == ""
+    assert not db_path.exists()
+
+
+def test_tables_are_created_on_startup_when_enabled(tmp_path):
+    db_path = tmp_path / "startup.db"
+    subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "from fastapi.testclient import TestClient; import main\n"
+            "with TestClient(main.app): pass",
+        ],
+        env={
+            **os.environ,
+            "DATABASE_URL": f"sqlite:///{db_path}",
+            "CREATE_TABLES_ON_STARTUP": "true",
+        },
+        check=True,
+    )
+    assert db_path.exists()
+
+
+def test_logging_is_set_up_by_the_lifespan_not_the_import(tmp_path):
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "from fastapi.testclient import TestClient; import main\n"
+            "from app.core import logging_config\n"
+            "print(logging_config._listener is None)\n"
+            "with TestClient(main.app):\n"
+            "    print(logging_config._listener is None)\n"
+            "print(logging_config._listener is None)",
+        ],
+        env={**os.environ, "DATABASE_URL": f"sqlite:///{tmp_path / 'startup.db'}"},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout.split() == ["True", "False", "True"]
@@ -0,0 +1,142 @@
+from datetime import date, timedelta
+
+import numpy as np
+from sqlalchemy import create_engine, func
+from sqlalchemy.orm import sessionmaker
+
+from app.analytics.inventory import (
+    STOCK_FORECASTS,
+    forecast_stockouts,
+    recompute_reorder_points,
+    refresh_stock_forecasts,
+    reorder_points,
+)
+from app.analytics.refresh import CachedAnalytics
+from app.crud import crud
+from app.db.session import Base
+from app.models.models import CacheVersion, Inventory, InventoryHistory, Sale, SaleItem
+from benchmarks.seed import seed
+
+
+def test_forecast_stockouts():
+    forecast = forecast_stockouts(
+        np.array([10, 10, 0, -3, 10]), np.array([28.0, 0.0, 5.0, 5.0, 6.0]), 28
+    )
+    assert forecast["daily_velocity"].tolist() == [1.0, 0.0, 5 / 28, 5 / 28, 6 / 28]
+    assert forecast["days_until_stockout"].tolist() == [10, -1, 0, 0, 46]
+    assert np.isinf(forecast["days_of_cover"][1])
+
+
+def test_forecast_matches_per_product_velocity(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'forecast.db'}")
+    seed(engine, 3000, days=90)
+    as_of = date.today()
+    result = refresh_stock_forecasts(engine, as_of=as_of, window_days=28)
+    db = sessionmaker(bind=engine)()
+    assert result["products"] == db.query(Inventory.product_id).distinct().count()
+
+    forecast = crud.get_stock_forecast(db, limit=1000)
+    products = forecast["products"]
+    covers = [p["days_of_cover"] for p in products if p["days_of_cover"] is not None]
+    assert covers == sorted(covers)
+    assert all(p["stockout_date"] is None for p in products[len(covers) :])
+
+    first = as_of - timedelta(days=27)
+    for product in products[:5]:
+        sold = (
+            db.query(func.sum(SaleItem.quantity))
+            .join(Sale, Sale.id == SaleItem.sale_id)
+            .filter(
+                SaleItem.product_id == product["product_id"],
+                func.date(Sale.order_date) >= first.isoformat(),
+            )
+            .scalar()
+        )
+        assert product["daily_velocity"] == sold / 28
+        days = int(max(product["quantity"], 0) / (sold / 28))
+        assert product["stockout_date"] == as_of + timedelta(days=days)
+
+    soon = crud.get_stock_forecast(db, horizon_days=7, limit=1000)["products"]
+    assert all(p["stockout_date"] <= as_of + timedelta(days=7) for p in soon)
+
+
+def test_empty_forecast_is_computed_once(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'empty.db'}")
+    Base.metadata.create_all(bind=engine)
+    runs = []
+
+    def compute(engine):
+        runs.append(refresh_stock_forecasts(engine))
+
+    cached = CachedAnalytics(STOCK_FORECASTS, compute, engine, max_age_seconds=900)
+    cached.ensure_fresh(engine)
+    cached.ensure_fresh(engine)
+    assert [run["products"] for run in runs] == [0]
+    assert cached.computed_at(engine) is not None
+
+
+def test_reorder_points():
+    points = reorder_points(
+        np.array([2.0, 2.0, 0.0]), np.array([0.0, 1.0, 0.0]), 4, 0.95, 7
+    )
+    # 2 * 4, plus 1.645 * 1 * sqrt(4) of safety stock, rounded up.
+    assert points["reorder_point"].tolist() == [8, 12, 0]
+    assert points["reorder_quantity"].tolist() == [14, 14, 0]
+
+
+def test_recompute_reorder_points(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'reorder.db'}")
+    seed(engine, 3000, days=90)
+    db = sessionmaker(bind=engine)()
+    db.add(CacheVersion(namespace="inventory", version=0))
+    db.commit()
+    as_of = date.today()
+
+    result = recompute_reorder_points(
+        engine,
+        as_of=as_of,
+        window_days=30,
+        lead_time_days=7,
+        review_days=14,
+        chunk_size=7,
+    )
+    assert 0 < result["updated"] <= result["inventory_rows"]
+    assert result["inventory_rows"] == db.query(Inventory).count()
+    # Inventory rows are not cached, so no cache version is bumped.
+    assert db.get(CacheVersion, "inventory").version == 0
+    history = db.query(InventoryHistory).all()
+    assert len(history) == result["updated"]
+    assert all(h.previous_quantity == h.new_quantity for h in history)
+
+    inventory = db.get(Inventory, history[0].inventory_id)
+    assert inventory.low_stock_threshold == history[0].new_threshold
+    day = func.date(Sale.order_date)
+    daily = dict(
+        db.query(day, func.sum(SaleItem.quantity))
+        .join(Sale, Sale.id == SaleItem.sale_id)
+        .filter(
+            SaleItem.product_id == inventory.product_id,
+            day > (as_of - timedelta(days=30)).isoformat(),
+        )
+        .group_by(day)
+    )
+    # Days without sales count as zero demand.
+    units = np.zeros(30)
+    units[: len(daily)] = list(daily.values())
+    expected = reorder_points(
+        np.array([units.mean()]), np.array([units.std(ddof=1)]), 7, 0.95, 14
+    )
+    assert inventory.low_stock_threshold == expected["reorder_point"][0]
+    assert inventory.reorder_quantity == expected["reorder_quantity"][0]
+
+    alerts = crud.get_low_stock_alerts(db, threshold_override=10_000)
+    alert = next(a for a in alerts if a["product_id"] == inventory.product_id)
+    assert alert["suggested_order_quantity"] == max(
+        inventory.low_stock_threshold + inventory.reorder_quantity - inventory.quantity,
+        0,
+    )
+
+    again = recompute_reorder_points(
+        engine, as_of=as_of, window_days=30, lead_time_days=7, review_days=14
+    )
+    assert again["updated"] == 0
@@ -0,0 +1,51 @@
+from datetime import date, timedelta
+
+from sqlalchemy import create_engine, func
+from sqlalchemy.orm import sessionmaker
+
+from app.crud import crud
+from app.models.models import Product, Sale, SaleItem
+from benchmarks.seed import seed
+
+
+def _direct_top(db, start, end, by, k, platform=None, category_id=None):
+    units = func.sum(SaleItem.quantity)
+    revenue = func.sum(SaleItem.unit_price * SaleItem.quantity - SaleItem.discount)
+    query = (
+        db.query(SaleItem.product_id, units, revenue)
+        .join(Sale, Sale.id == SaleItem.sale_id)
+        .join(Product, Product.id == SaleItem.product_id)
+        .filter(
+            func.date(Sale.order_date) >= start.isoformat(),
+            func.date(Sale.order_date) <= end.isoformat(),
+        )
+        .group_by(SaleItem.product_id)
+    )
+    if platform:
+        query = query.filter(Sale.platform == platform)
+    if category_id:
+        query = query.filter(Product.category_id == category_id)
+    column = 1 if by == "units" else 2
+    rows = sorted(query, key=lambda row: (-row[column], row[0]))[:k]
+    return [(row[0], int(row[1]), round(float(row[2]), 6)) for row in rows]
+
+
+def test_daily_partials_match_grouping_every_sale_line(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'top.db'}")
+    seed(engine, 3000, days=120)
+    db = sessionmaker(bind=engine)()
+    end = date.today()
+    cases = [
+        dict(start=end - timedelta(days=119), by="units", k=10),
+        dict(start=end - timedelta(days=29), by="revenue", k=5),
+        dict(start=end - timedelta(days=59), by="units", k=3, platform="Amazon"),
+        dict(start=end - timedelta(days=89), by="revenue", k=7, category_id=2),
+    ]
+    for case in cases:
+        start = case.pop("start")
+        expected = _direct_top(db, start, end, **case)
+        top = crud.get_top_products(db, start, end, **case)
+        assert [(p["product_id"], p["units"], round(p["revenue"], 6)) for p in top] == (
+            expected
+        )
+        assert [p["rank"] for p in top] == list(range(1, len(expected) + 1))